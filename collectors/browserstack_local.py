@@ -0,0 +1,392 @@
+"""
+BrowserStack Local tunnel manager
+- Download BrowserStackLocal binary on first use
+- Start/stop tunnel for IP consistency (cookie reuse)
+- Readiness detection from the binary's output (no fixed wait)
+- Pidfile-based reuse of kept-alive tunnels across runs
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import TIMEOUTS
+
+# BrowserStack Local binary path
+BSLOCAL_PATH = Path(__file__).parent.parent / 'tools' / 'BrowserStackLocal.exe'
+
+# Output lines printed by the binary once the tunnel is usable
+CONNECTED_MARKERS = (
+    'You can now access your local server(s) in our remote browser',
+    'Press Ctrl-C to exit',
+    '"state":"connected"',
+)
+
+# Output lines that mean the tunnel will never come up
+ERROR_MARKERS = (
+    '*** Error',
+    '"state":"disconnected"',
+    'Either another browserstack local client is running',
+)
+
+
+def _pid_alive(pid):
+    """Check whether a process with this PID is running"""
+    if not pid:
+        return False
+
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+
+    if os.name == 'nt':
+        # os.kill(pid, 0) would terminate the process on Windows
+        try:
+            result = subprocess.run(
+                ['tasklist', '/FI', f'PID eq {pid}', '/NH'],
+                capture_output=True,
+                text=True,
+                timeout=3,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+            return str(pid) in result.stdout
+        except Exception:
+            return False
+
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+class BrowserStackLocalManager:
+    """BrowserStack Local tunnel manager"""
+
+    def __init__(self, access_key, binary_path=None, keep_alive=False):
+        """
+        Args:
+            access_key: BrowserStack access key
+            binary_path: Path to BrowserStackLocal binary (default: tools/BrowserStackLocal.exe)
+            keep_alive: Leave the tunnel running on stop() so the next run reuses it
+        """
+        self.access_key = access_key
+        self.binary_path = binary_path or BSLOCAL_PATH
+        self.keep_alive = keep_alive
+        self.process = None
+        self.pid = None
+        self.reused = False
+
+        tools_dir = self.binary_path.parent
+        self.pid_file = tools_dir / 'BrowserStackLocal.pid'
+        # One log per starting process: concurrent runs never truncate each
+        # other's log; the pidfile records which log a kept-alive tunnel writes
+        self.log_file = tools_dir / f'BrowserStackLocal-{os.getpid()}.log'
+        self.legacy_log_file = tools_dir / 'BrowserStackLocal.log'
+
+    @property
+    def key_id(self):
+        """Short hash of the access key (pidfile must match the account)"""
+        return hashlib.sha256(self.access_key.encode()).hexdigest()[:12]
+
+    def download_binary(self):
+        """Download BrowserStack Local binary for Windows"""
+        print("\n[BrowserStack Local] Downloading binary...")
+
+        # Create tools directory
+        tools_dir = self.binary_path.parent
+        tools_dir.mkdir(parents=True, exist_ok=True)
+
+        # Download URL for Windows
+        download_url = "https://www.browserstack.com/browserstack-local/BrowserStackLocal-win32.zip"
+
+        try:
+            import urllib.request
+            import zipfile
+
+            zip_path = tools_dir / 'BrowserStackLocal.zip'
+
+            print(f"  Downloading from: {download_url}")
+            urllib.request.urlretrieve(download_url, zip_path)
+
+            print(f"  Extracting to: {tools_dir}")
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                zip_ref.extractall(tools_dir)
+
+            # Remove zip file
+            zip_path.unlink()
+
+            print(f"  ✅ Binary downloaded: {self.binary_path}")
+            return True
+
+        except Exception as e:
+            print(f"  ❌ Download failed: {e}")
+            return False
+
+    def _read_pid_file(self):
+        """Read pidfile, or None if missing/corrupt"""
+        try:
+            with open(self.pid_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_pid_file(self):
+        """Record a kept-alive tunnel for reuse by later runs"""
+        with open(self.pid_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'pid': self.pid,
+                'keep_alive': True,
+                'key_id': self.key_id,
+                'started_at': datetime.now().isoformat(),
+                'log_file': str(self.log_file)
+            }, f, indent=2)
+
+    def _remove_pid_file(self):
+        try:
+            self.pid_file.unlink()
+        except OSError:
+            pass
+
+    def _pid_file_log(self, info):
+        """Log file of the tunnel recorded in a pidfile"""
+        return Path(info['log_file']) if info.get('log_file') else self.legacy_log_file
+
+    def _prune_logs(self):
+        """Delete logs of finished runs (kept: running runs, the pidfile's tunnel)"""
+        info = self._read_pid_file()
+        keep = self._pid_file_log(info) if info else None
+        for log_file in self.log_file.parent.glob('BrowserStackLocal-*.log'):
+            pid = log_file.stem.rsplit('-', 1)[-1]
+            if log_file == keep or not pid.isdigit() or _pid_alive(int(pid)):
+                continue
+            try:
+                log_file.unlink()
+            except OSError:
+                pass
+
+    def _scan_log(self, log_file=None):
+        """
+        Scan tunnel log for readiness/error markers
+
+        Args:
+            log_file: Log to scan (default: this run's log)
+
+        Returns:
+            tuple: (state, text) where state is 'connected', 'error' or None
+        """
+        try:
+            with open(log_file or self.log_file, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        except OSError:
+            return None, ''
+
+        if any(marker in text for marker in ERROR_MARKERS):
+            return 'error', text
+        if any(marker in text for marker in CONNECTED_MARKERS):
+            return 'connected', text
+        return None, text
+
+    def check_status(self):
+        """
+        Probe tunnel status (pidfile + process liveness + log markers)
+
+        Returns:
+            dict: {'running': bool, 'connected': bool, 'pid': int, 'reused': bool}
+        """
+        info = self._read_pid_file()
+        pid = self.pid or (info or {}).get('pid')
+        running = _pid_alive(pid)
+
+        connected = False
+        if running:
+            # Not started or reused here: the pidfile's tunnel and its log
+            log_file = self._pid_file_log(info) if not self.pid and info else None
+            state, _ = self._scan_log(log_file)
+            connected = state == 'connected'
+
+        return {
+            'running': running,
+            'connected': connected,
+            'pid': pid if running else None,
+            'reused': self.reused
+        }
+
+    def _try_reuse(self):
+        """Attach to a tunnel started by a previous run, if still connected"""
+        info = self._read_pid_file()
+        if not info:
+            return False
+
+        if not _pid_alive(info.get('pid')):
+            # Stale pidfile (process gone)
+            self._remove_pid_file()
+            return False
+
+        if not info.get('keep_alive'):
+            # Owned by a run that stops it on exit
+            return False
+
+        if info.get('key_id') != self.key_id:
+            print(f"  ⚠️ Running tunnel (PID {info.get('pid')}) belongs to another account")
+            return False
+
+        log_file = self._pid_file_log(info)
+        state, _ = self._scan_log(log_file)
+        if state != 'connected':
+            return False
+
+        self.pid = info['pid']
+        self.log_file = log_file
+        self.reused = True
+        print(f"  ✅ Reusing running tunnel (PID {self.pid}, started {info.get('started_at', '?')})")
+        return True
+
+    def start(self, force_local=True, verbose=False, timeout=None):
+        """
+        Start BrowserStack Local tunnel (or reuse a running one)
+
+        Args:
+            force_local: Route all traffic through the local machine
+            verbose: Pass --verbose to the binary
+            timeout: Max seconds to wait for the connected message
+                     (default: TIMEOUTS['tunnel_start'])
+
+        Returns:
+            bool: True when the tunnel is connected
+        """
+        print(f"\n[BrowserStack Local] Starting tunnel...")
+
+        if self._try_reuse():
+            return True
+
+        # Check if binary exists
+        if not self.binary_path.exists():
+            print(f"[ERROR] BrowserStack Local binary not found: {self.binary_path}")
+            print("\nDownloading binary automatically...")
+            if not self.download_binary():
+                print("\n[ERROR] Failed to download binary. Please download manually from:")
+                print("        https://www.browserstack.com/local-testing/automate")
+                return False
+
+        print(f"  Binary: {self.binary_path}")
+
+        # Build command
+        cmd = [
+            str(self.binary_path),
+            '--key', self.access_key,
+        ]
+
+        if force_local:
+            cmd.append('--force-local')
+
+        if verbose:
+            cmd.append('--verbose')
+
+        # Detach so a kept-alive tunnel survives this process
+        popen_kwargs = {}
+        if self.keep_alive:
+            if os.name == 'nt':
+                popen_kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                popen_kwargs['start_new_session'] = True
+
+        timeout = timeout or TIMEOUTS['tunnel_start']
+        self._prune_logs()
+
+        try:
+            # Output goes to a log file so readiness can be detected
+            # here and by later runs that reuse the tunnel
+            with open(self.log_file, 'w', encoding='utf-8') as log:
+                self.process = subprocess.Popen(
+                    cmd,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    **popen_kwargs
+                )
+            self.pid = self.process.pid
+
+            # Wait for tunnel to be ready
+            print("  Waiting for tunnel connection...")
+            start_time = time.time()
+            while time.time() - start_time < timeout:
+                state, text = self._scan_log()
+
+                if state == 'connected':
+                    # Only kept-alive tunnels are shared: a run without
+                    # keep_alive terminates its tunnel in stop()
+                    if self.keep_alive:
+                        self._write_pid_file()
+                    print(f"  ✅ Tunnel connected ({time.time() - start_time:.1f}s)")
+                    return True
+
+                if state == 'error' or self.process.poll() is not None:
+                    print(f"\n[ERROR] Tunnel failed to start:")
+                    print(text.strip()[-2000:])
+                    self.stop(force=True)
+                    return False
+
+                time.sleep(0.2)
+
+            print(f"  ❌ Tunnel connection timeout ({timeout}s)")
+            self.stop(force=True)
+            return False
+
+        except Exception as e:
+            print(f"  ❌ Failed to start tunnel: {e}")
+            return False
+
+    def stop(self, force=False):
+        """
+        Stop BrowserStack Local tunnel
+
+        Args:
+            force: Stop even if keep_alive is set (or the tunnel was reused)
+        """
+        if (self.keep_alive or self.reused) and not force:
+            if self.pid:
+                print(f"\n[BrowserStack Local] Keeping tunnel alive (PID {self.pid})")
+            return
+
+        if self.process:
+            print("\n[BrowserStack Local] Stopping tunnel...")
+            try:
+                self.process.terminate()
+                self.process.wait(timeout=5)
+                print("  ✅ Tunnel stopped")
+            except subprocess.TimeoutExpired:
+                print("  ⚠️ Force killing tunnel...")
+                self.process.kill()
+                self.process.wait()
+            except Exception as e:
+                print(f"  ⚠️ Error stopping tunnel: {e}")
+            finally:
+                self.process = None
+
+        elif self.pid and _pid_alive(self.pid):
+            # Tunnel started by an earlier run (reused via pidfile)
+            print(f"\n[BrowserStack Local] Stopping tunnel (PID {self.pid})...")
+            try:
+                import signal
+                os.kill(self.pid, signal.SIGTERM)
+                print("  ✅ Tunnel stopped")
+            except Exception as e:
+                print(f"  ⚠️ Error stopping tunnel: {e}")
+
+        # Leave the pidfile of another run's kept-alive tunnel alone
+        info = self._read_pid_file()
+        if info and info.get('pid') == self.pid:
+            self._remove_pid_file()
+        self.pid = None
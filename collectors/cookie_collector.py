@@ -17,7 +17,8 @@ import os
 
 # Load config
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import TIMEOUTS, WAIT_TIMES
+from config import TIMEOUTS, WAIT_TIMES, PROFILE_FARM
+from modules.block_signatures import check_blocked
 
 # Suppress ResourceWarning and RuntimeError for subprocess cleanup on Windows
 if sys.platform == 'win32':
@@ -28,7 +29,7 @@ class CookieCollector:
     def __init__(self, chrome_path, user_data_dir, headless=False, search_keyword=None, max_pages=1):
         """
         Args:
-            chrome_path: Path to chrome.exe
+            chrome_path: Path to chrome.exe (Linux: chrome)
             user_data_dir: User data directory for Chrome profile
             headless: Run in headless mode
             search_keyword: Optional search keyword
@@ -51,6 +52,14 @@ class CookieCollector:
         config = uc.Config()
         config.browser_executable_path = self.chrome_path
         config.user_data_dir = str(self.user_data_dir)
+        config.headless = self.headless
+
+        if sys.platform.startswith('linux'):
+            # Crawl hosts run as root in containers: no sandbox, small /dev/shm
+            if os.geteuid() == 0:
+                config.sandbox = False
+            for arg in PROFILE_FARM['linux_args']:
+                config.add_argument(arg)
 
         # Launch browser
         self.browser = await uc.start(config)
@@ -83,26 +92,12 @@ class CookieCollector:
                 timeout=TIMEOUTS['blocking_check']
             )
 
-            # Check blocking indicators
-            if not html or len(html) < 5000:
+            # Size limit + known blocking patterns in one pass (BLOCK_SIGNATURES 'browser')
+            blocked, rule = check_blocked(html, 'browser')
+            if blocked:
+                print(f"[CookieCollector] Block signature: {rule}")
                 return True
 
-            # Check for known blocking patterns
-            blocking_patterns = [
-                'location.reload',
-                'captcha',
-                'blocked',
-                'Access Denied',
-                'ERR_HTTP2_PROTOCOL_ERROR',  # Chrome 131+ HTTP/2 issue
-                'ERR_',
-                'bot detection',
-                'error-code'  # Chrome error page
-            ]
-
-            for pattern in blocking_patterns:
-                if pattern.lower() in html.lower():
-                    return True
-
             # Check if search results exist (for search page)
             if 'np/search' in self.page.url:
                 if 'product-list' not in html:
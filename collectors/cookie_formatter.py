@@ -3,8 +3,14 @@ Cookie Formatter - Common cookie format conversion utilities
 Shared by PC (nodriver) and Mobile (Appium) collectors
 """
 
+import sys
+from pathlib import Path
 from typing import List, Dict, Set, Optional, Any
 
+# Load shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from modules.cookie_handler import CookieSet
+
 
 class CookieFormatter:
     """Format cookies to standardized structure for database storage"""
@@ -108,38 +114,21 @@ class CookieFormatter:
         """
         Merge new cookies into existing list, updating or adding as needed
 
+        Cookies are matched by (name, domain, path); updated ones keep their
+        position, new ones are appended. Pass a CookieSet as existing_cookies
+        to merge repeatedly without rebuilding the index.
+
         Args:
-            existing_cookies: Current cookie list
+            existing_cookies: Current cookie list or CookieSet (updated in place)
             new_cookies: New cookies to merge
-            cookie_names: Optional set of existing cookie names (for efficiency)
+            cookie_names: Unused, kept for compatibility (names come from the index)
 
         Returns:
             tuple: (merged_cookies, updated_cookie_names)
         """
-        if cookie_names is None:
-            cookie_names = {c['name'] for c in existing_cookies}
-
-        merged = existing_cookies.copy()
-
-        for new_cookie in new_cookies:
-            cookie_name = new_cookie['name']
-
-            # Find existing cookie
-            existing_idx = None
-            for idx, existing in enumerate(merged):
-                if existing['name'] == cookie_name:
-                    existing_idx = idx
-                    break
-
-            if existing_idx is not None:
-                # Update existing
-                merged[existing_idx] = new_cookie
-            else:
-                # Add new
-                merged.append(new_cookie)
-                cookie_names.add(cookie_name)
-
-        return merged, cookie_names
+        cookie_set = existing_cookies if isinstance(existing_cookies, CookieSet) else CookieSet(existing_cookies)
+        cookie_set.update(new_cookies)
+        return cookie_set.to_list(), cookie_set.names()
 
     @staticmethod
     def collect_webdriver_cookies(driver, js_cookie_string: Optional[str] = None) -> List[Dict]:
@@ -153,28 +142,29 @@ class CookieFormatter:
         Returns:
             list: Standardized cookie list
         """
-        cookies_data = []
-        cookie_names = set()
+        return CookieFormatter.collect_webdriver_cookie_set(driver, js_cookie_string).to_list()
+
+    @staticmethod
+    def collect_webdriver_cookie_set(driver, js_cookie_string: Optional[str] = None) -> CookieSet:
+        """
+        Collect WebDriver cookies into a CookieSet (see collect_webdriver_cookies)
+
+        Returns:
+            CookieSet: Standardized cookies
+        """
+        cookie_set = CookieSet()
 
         # 1. Get WebDriver cookies (full info)
         try:
-            cookies_wd = driver.get_cookies()
-            for cookie in cookies_wd:
-                formatted = CookieFormatter.format_webdriver_cookie(cookie)
-                cookies_data.append(formatted)
-                cookie_names.add(formatted['name'])
+            cookie_set.update(CookieFormatter.format_webdriver_cookie(c) for c in driver.get_cookies())
         except Exception as e:
             print(f"[CookieFormatter] Warning: Failed to get WebDriver cookies: {e}")
 
-        # 2. Parse JavaScript cookies (add missing only)
+        # 2. Parse JavaScript cookies (add missing names only; JS has no domain/path)
         if js_cookie_string:
-            js_cookies = CookieFormatter.parse_js_cookies(js_cookie_string)
-            for js_cookie in js_cookies:
-                if js_cookie['name'] not in cookie_names:
-                    cookies_data.append(js_cookie)
-                    cookie_names.add(js_cookie['name'])
+            cookie_set.add_missing(CookieFormatter.parse_js_cookies(js_cookie_string))
 
-        return cookies_data
+        return cookie_set
 
     @staticmethod
     def format_cookie_list(cookies: List[Any], formatter_type: str = 'nodriver') -> List[Dict]:
@@ -0,0 +1,441 @@
+"""
+Mobile Collector using Appium (BrowserStack real devices)
+- Create Appium WebDriver session
+- Collect TLS fingerprint from browserleaks.com
+- Collect cookies from Coupang mobile
+- Readiness polling instead of fixed sleeps
+- Session keeping: reuse one live driver for sequential tasks
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from datetime import datetime
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import TIMEOUTS, WAIT_TIMES, BROWSERSTACK
+
+
+class MobileCollector:
+    """Mobile device TLS and Cookie collector using Appium"""
+
+    def __init__(self, device_config, browserstack_hub, username=None, access_key=None,
+                 driver_factory=None, keep_session=False, max_session_age=None):
+        """
+        Args:
+            device_config: Device configuration (device, os, browser, os_version)
+            browserstack_hub: WebDriver hub URL (BrowserStack or local stand-in)
+            username: BrowserStack username (default: BROWSERSTACK_USERNAME env)
+            access_key: BrowserStack access key (default: BROWSERSTACK_ACCESS_KEY env)
+            driver_factory: Optional callable(hub, options) -> WebDriver.
+                            Used to run against a local WebDriver stand-in.
+            keep_session: Reuse the live driver across run_task() calls
+            max_session_age: Re-create the session after this many seconds
+                             (default: BROWSERSTACK['max_session_age'])
+        """
+        self.device_config = device_config
+        self.browserstack_hub = browserstack_hub
+        self.username = username or os.getenv("BROWSERSTACK_USERNAME", "bsuser_wHW2oU")
+        self.access_key = access_key or os.getenv("BROWSERSTACK_ACCESS_KEY", "fuymXXoQNhshiN5BsZhp")
+        self.driver_factory = driver_factory
+        self.keep_session = keep_session
+        self.max_session_age = max_session_age or BROWSERSTACK['max_session_age']
+        self.driver = None
+        self.session_started_at = None
+        self.session_count = 0
+
+    def _wait_until(self, condition, timeout, interval=None):
+        """
+        Poll condition() until it returns a truthy value or timeout expires
+
+        Returns:
+            Last condition() result (None on timeout)
+        """
+        interval = interval or WAIT_TIMES['poll_interval']
+        deadline = time.time() + timeout
+        while True:
+            try:
+                result = condition()
+                if result:
+                    return result
+            except Exception:
+                pass
+            if time.time() >= deadline:
+                return None
+            time.sleep(interval)
+
+    def _wait_for_document(self, timeout=None):
+        """Wait until document.readyState is 'complete'"""
+        return self._wait_until(
+            lambda: self.driver.execute_script('return document.readyState') == 'complete',
+            timeout or TIMEOUTS['page_load']
+        )
+
+    def build_options(self):
+        """Build Appium options with BrowserStack capabilities"""
+        from appium.options.android import UiAutomator2Options
+        from appium.options.ios import XCUITestOptions
+
+        device_name = self.device_config.get('device', self.device_config.get('deviceName', 'Unknown'))
+        os_name = self.device_config.get('os', 'Unknown')
+
+        # Determine platform
+        is_android = 'android' in os_name.lower()
+        is_ios = 'ios' in os_name.lower()
+
+        # Build capabilities based on platform
+        if is_android:
+            options = UiAutomator2Options()
+            options.platform_name = 'Android'
+        elif is_ios:
+            options = XCUITestOptions()
+            options.platform_name = 'iOS'
+        else:
+            print(f"  ⚠️ Unknown OS: {os_name}, assuming Android")
+            options = UiAutomator2Options()
+            options.platform_name = 'Android'
+
+        # Browser name
+        browser = self.device_config.get('browser', self.device_config.get('browserName', 'Chrome'))
+
+        # BrowserStack requires browser name at top level for mobile browser testing
+        if browser.lower() in ['chrome', 'safari', 'firefox', 'edge']:
+            options.browser_name = browser
+        # For native browser (e.g., "android"), use Chrome as fallback
+        elif 'android' in browser.lower():
+            options.browser_name = 'Chrome'
+        else:
+            options.browser_name = browser
+
+        # BrowserStack specific capabilities
+        bstack_options = {
+            'deviceName': device_name,  # ← 중요: device name은 bstack:options에!
+            'osVersion': self.device_config.get('os_version', '12.0'),  # ← OS version 필수!
+            'realMobile': 'true',
+            'local': 'true',  # ← 중요: BrowserStack Local 사용
+            'debug': 'true',
+            'networkLogs': 'true',
+            'consoleLogs': 'verbose',
+            'userName': self.username,
+            'accessKey': self.access_key,
+            'projectName': 'Coupang TLS Collection',
+            'buildName': f'Mobile TLS - {datetime.now().strftime("%Y%m%d_%H%M%S")}',
+            'sessionName': f'{device_name} - TLS & Cookie Collection'
+        }
+
+        if self.keep_session:
+            # Keep the remote session open between sequential tasks
+            bstack_options['idleTimeout'] = BROWSERSTACK['idle_timeout']
+
+        options.set_capability('bstack:options', bstack_options)
+        return options
+
+    def create_driver(self):
+        """Create Appium WebDriver session"""
+        device_name = self.device_config.get('device', self.device_config.get('deviceName', 'Unknown'))
+        os_name = self.device_config.get('os', 'Unknown')
+
+        print(f"\n[Appium] Creating session for {device_name} ({os_name})...")
+
+        try:
+            options = self.build_options()
+
+            if self.driver_factory:
+                self.driver = self.driver_factory(self.browserstack_hub, options)
+            else:
+                from appium import webdriver
+                self.driver = webdriver.Remote(
+                    command_executor=self.browserstack_hub,
+                    options=options
+                )
+            self.session_started_at = time.time()
+            self.session_count += 1
+            print(f"  ✅ Session created: {self.driver.session_id}")
+            return True
+
+        except Exception as e:
+            print(f"  ❌ Failed to create session: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+    def is_session_alive(self):
+        """Check that the remote session still answers commands"""
+        if not self.driver:
+            return False
+        try:
+            return self.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def session_age(self):
+        """Seconds since the current session was created (None if no session)"""
+        if not self.session_started_at:
+            return None
+        return time.time() - self.session_started_at
+
+    def ensure_driver(self):
+        """
+        Return a usable session, reusing the live one when possible
+
+        The session is re-created when it does not exist, has died,
+        or is older than max_session_age.
+
+        Returns:
+            bool: True if a session is available
+        """
+        if self.driver and self.keep_session:
+            age = self.session_age()
+            if age is not None and age >= self.max_session_age:
+                print(f"\n[Appium] Session age {age:.0f}s >= {self.max_session_age}s, re-creating...")
+            elif self.is_session_alive():
+                print(f"\n[Appium] Reusing session {self.driver.session_id} (age {age:.0f}s)")
+                return True
+            else:
+                print(f"\n[Appium] Session lost, re-creating...")
+            self.close()
+        elif self.driver:
+            return True
+
+        return self.create_driver()
+
+    def run_task(self, task, *args, **kwargs):
+        """
+        Run a collection step on the kept session
+
+        If the step fails and the session turns out to be dead,
+        the session is re-created and the step retried once.
+
+        Args:
+            task: Bound method, e.g. self.collect_tls_fingerprint
+            *args, **kwargs: Passed to task
+
+        Returns:
+            Task result, or None on failure
+        """
+        for attempt in range(2):
+            if not self.ensure_driver():
+                return None
+
+            result = task(*args, **kwargs)
+            if result is not None or self.is_session_alive():
+                return result
+
+            print(f"  ⚠️ Session died during {task.__name__} (attempt {attempt + 1}/2)")
+            self.close()
+
+        return None
+
+    def collect_tls_fingerprint(self):
+        """Collect TLS fingerprint from browserleaks.com"""
+        print("\n[TLS Collection] Accessing browserleaks.com...")
+
+        try:
+            # Navigate to TLS fingerprint page
+            self.driver.get('https://tls.browserleaks.com/')
+            print("  Page loaded, waiting for data...")
+
+            # Extract TLS data using JavaScript
+            tls_script = """
+                // Try to find TLS data in various places
+                var preElement = document.querySelector('pre');
+                if (preElement && preElement.textContent) {
+                    try {
+                        return JSON.parse(preElement.textContent);
+                    } catch (e) {
+                        console.log('Failed to parse pre element:', e);
+                    }
+                }
+
+                // Check for global TLS data variable
+                if (window.tlsData) {
+                    return window.tlsData;
+                }
+
+                return null;
+            """
+
+            start_time = time.time()
+            tls_data = self._wait_until(
+                lambda: self.driver.execute_script(tls_script),
+                TIMEOUTS['tls_extract']
+            )
+            if tls_data:
+                print(f"  ✅ TLS data collected ({time.time() - start_time:.1f}s)")
+
+            if not tls_data:
+                # Fallback: Get page source and try to extract
+                print("  ⚠️ JavaScript extraction failed, trying page source...")
+                page_source = self.driver.page_source
+
+                # Look for JSON data in page
+                import re
+                json_match = re.search(r'<pre[^>]*>(.*?)</pre>', page_source, re.DOTALL)
+                if json_match:
+                    try:
+                        tls_data = json.loads(json_match.group(1))
+                        print("  ✅ TLS data extracted from page source")
+                    except:
+                        pass
+
+            if not tls_data:
+                print("  ❌ Failed to extract TLS data")
+                return None
+
+            # Extract key fingerprints
+            ja3_hash = tls_data.get('ja3_hash', '')
+            akamai_hash = tls_data.get('akamai_hash', '')
+
+            print(f"  JA3: {ja3_hash}")
+            print(f"  Akamai: {akamai_hash}")
+
+            return {
+                'tls_data': tls_data.get('tls', {}),
+                'http2_data': tls_data.get('http2', []),
+                'ja3_hash': ja3_hash,
+                'akamai_fingerprint': akamai_hash
+            }
+
+        except Exception as e:
+            print(f"  ❌ TLS collection failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def collect_cookies(self, search_keyword=None):
+        """Collect cookies from Coupang"""
+        from collectors.cookie_formatter import CookieFormatter
+
+        print(f"\n[Cookie Collection] Accessing Coupang...")
+
+        try:
+            # Navigate to Coupang mobile
+            self.driver.get('https://m.coupang.com/')
+            self._wait_for_document()
+            print("  Coupang main page loaded")
+
+            # Get cookies using JavaScript
+            cookies_js = self.driver.execute_script('return document.cookie')
+            print(f"  JavaScript cookies: {cookies_js[:100]}..." if cookies_js else "  No JS cookies")
+
+            # Use CookieFormatter to collect and format cookies (indexed for merging)
+            cookie_set = CookieFormatter.collect_webdriver_cookie_set(self.driver, cookies_js)
+
+            print(f"  ✅ Total unique cookies: {len(cookie_set)}")
+
+            # Perform search if requested
+            if search_keyword:
+                print(f"\n  Searching for: {search_keyword}")
+                try:
+                    # Inject keyword into window object
+                    self.driver.execute_script(f'window.__searchKeyword = {json.dumps(search_keyword)};')
+
+                    # PC 버전과 동일한 React 검색 스크립트
+                    search_script = """
+const keyword = window.__searchKeyword;
+const input = document.querySelector('input.is-speech[name="q"]');
+
+// 헤더 버튼(참고용): 폼 밖일 수 있음
+const headerBtn = document.querySelector('button.headerSearchBtn[type="submit"]');
+
+if (!input) {
+  console.warn("검색 input을 못 찾았어.");
+} else {
+  // 1) 리액트 컨트롤드 인풋: 네이티브 세터 + 이벤트로 상태 반영
+  const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value')?.set;
+  setter?.call(input, keyword);
+  input.dispatchEvent(new Event('input',  { bubbles: true }));
+  input.dispatchEvent(new Event('change', { bubbles: true }));
+
+  // 2) form 찾기
+  let form = input.closest('form');
+  if (!form) form = document.querySelector('form[role="search"]') || document.querySelector('form');
+
+  // 3) 2초 지연 후 제출
+  setTimeout(() => {
+    if (form) {
+      const innerSubmit = form.querySelector('button[type="submit"], input[type="submit"]');
+
+      try {
+        if (form.requestSubmit) {
+          form.requestSubmit(innerSubmit || undefined);
+        } else {
+          form.dispatchEvent(new Event('submit', { bubbles: true, cancelable: true })) || form.submit();
+        }
+        console.log(`2초 후 폼 제출로 "${keyword}" 검색`);
+      } catch (e) {
+        console.warn("requestSubmit 실패 -> 버튼 클릭 폴백 시도:", e);
+        if (headerBtn) {
+          headerBtn.click();
+          console.log(`2초 후 헤더 버튼 클릭 폴백으로 "${keyword}" 검색`);
+        } else {
+          console.warn("제출 경로를 찾지 못했어.");
+        }
+      }
+    } else if (headerBtn) {
+      headerBtn.click();
+      console.log(`2초 후 헤더 버튼 클릭으로 "${keyword}" 검색`);
+    } else {
+      console.warn("form/버튼 모두 없음.");
+    }
+  }, 2000);
+}
+"""
+
+                    self.driver.execute_script(search_script)
+
+                    print(f"  Search script executed, waiting for results...")
+
+                    # 2초 스크립트 delay 후 검색 페이지로 이동할 때까지 대기
+                    has_results = self._wait_until(
+                        lambda: self.driver.execute_script(
+                            'return location.pathname.indexOf("search") !== -1 && document.readyState === "complete" && '
+                            '(document.querySelector(".search-product-list") !== null || document.querySelector("#productList") !== null || document.body.innerHTML.includes("search"))'
+                        ),
+                        TIMEOUTS['search_load']
+                    )
+                    if has_results:
+                        print(f"  ✅ Search results loaded")
+                    else:
+                        print(f"  ⚠️ Could not verify search results loaded")
+
+                    # Get updated cookies after search
+                    cookies_js_after = self.driver.execute_script('return document.cookie')
+                    new_cookies = CookieFormatter.collect_webdriver_cookies(self.driver, cookies_js_after)
+
+                    # Merge with existing cookies
+                    cookie_set.update(new_cookies)
+
+                    print(f"  ✅ Cookies after search: {len(cookie_set)}")
+
+                except Exception as e:
+                    print(f"  ⚠️ Search failed: {e}")
+                    import traceback
+                    traceback.print_exc()
+
+            cookies_data = cookie_set.to_list()
+            return {
+                'cookies': cookies_data,
+                'cookie_count': len(cookies_data),
+                'collected_at': datetime.now()
+            }
+
+        except Exception as e:
+            print(f"  ❌ Cookie collection failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def close(self):
+        """Close driver session"""
+        if self.driver:
+            try:
+                self.driver.quit()
+                print("\n[Appium] Session closed")
+            except:
+                pass
+            finally:
+                self.driver = None
@@ -5,6 +5,16 @@ Configuration settings
 # Database settings (loaded from .env)
 # DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME
 
+# Schema migrations (modules/schema.py)
+DATABASE = {
+    'auto_migrate': True,         # Apply pending migrations on first DB access per process
+    'backfill_batch': 10000,      # Rows per UPDATE when backfilling new columns
+    'migrate_lock_timeout': 600,  # Wait for another process's migration run (MySQL GET_LOCK)
+    'fingerprint_storage': 'json',  # 'json' | 'both' | 'blob' (compact encoding, modules/fingerprint_codec.py)
+    'cookie_deltas': True,        # Crawled cookies saved as diffs against the latest snapshot
+    'cookie_compact_every': 20,   # Deltas per snapshot before a new full snapshot is written
+}
+
 # Chrome versions path
 CHROME_VERSIONS_PATH = r'D:\dev\git\local-packet-coupang\chrome-versions\files'
 
@@ -16,6 +26,8 @@ TIMEOUTS = {
     'element_wait': 5,
     'blocking_check': 2,
     'cookie_collection': 5,
+    'tls_extract': 15,          # Mobile: wait for browserleaks JSON
+    'tunnel_start': 30,         # BrowserStack Local: wait for connected message
 }
 
 # Wait times (seconds)
@@ -34,6 +46,139 @@ WAIT_TIMES = {
     'button_find_attempts': 3,    # Max attempts to find next button (attempts * retry_interval = max wait)
     'button_retry_interval': 0.2, # Interval between button search attempts
     'after_click': 0.3,           # Wait after clicking next button
+
+    # Mobile readiness polling (main-mobile.py)
+    'poll_interval': 0.5,
+}
+
+# BrowserStack settings (main-mobile.py)
+BROWSERSTACK = {
+    'parallel_sessions': 2,       # Plan parallel-session limit (env: BROWSERSTACK_PARALLEL_SESSIONS)
+    'max_session_age': 600,       # Re-create a kept Appium session after this many seconds
+    'idle_timeout': 300,          # BrowserStack idleTimeout for kept sessions (max 300)
+}
+
+# Cookie expiry tracking and proactive refresh (modules/cookie_expiry.py)
+COOKIE_EXPIRY = {
+    'critical_cookies': ['_abck', 'bm_sz', 'ak_bmsc', 'PCID'],  # Identity is stale when any of these expires
+    'session_cookie_ttl': 1800,   # Assumed lifetime of a critical cookie without expires
+    'max_identity_age': 21600,    # Cookie sets older than this count as expired
+    'lookback': 604800,           # Only index snapshots collected within this many seconds
+    'refresh_margin': 900,        # Refresh a device this many seconds before expiry
+    'min_ttl': 300,               # Crawlers only pick identities valid at least this long
+    'prefer_fresh': True,         # 'freshest' policy: longest-lived identity instead of the newest
+    'retry_after': 1800,          # Wait before retrying a device whose refresh was attempted
+    'poll_interval': 60,          # Scheduler loop interval
+    'pc_headless': True,          # PC refreshes run Chrome headless
+}
+
+# Page outcome analytics (modules/analytics.py, table page_outcomes)
+ANALYTICS = {
+    'record': True,               # Store every crawled page with its identity
+    'windows': [3600, 21600, 86400],  # Rolling block-rate windows (seconds)
+    'age_bucket': 1800,           # Cookie age step of the survival curve (seconds)
+    'min_pages': 20,              # Pages before a fingerprint / age is judged
+    'steer_selection': True,      # Crawlers skip identities analytics rates poorly
+    'selection_window': 86400,    # Outcomes considered for selection (seconds)
+    'max_block_rate': 0.5,        # Skip fingerprints blocked more often than this
+    'min_survival': 0.5,          # Skip identities older than the age where survival drops below this
+}
+
+# Identity selection policy + local lease coordinator (modules/identity_policy.py)
+IDENTITY_POLICY = {
+    'policy': 'freshest',         # 'freshest' | 'round_robin' | 'lru' | 'weighted' | 'sticky'
+    'max_concurrent': 0,          # Crawls per identity at once (0 = unlimited)
+    'db_path': 'output/identities.db',  # Leases / usage shared by every worker on this machine
+    'lease_timeout': 1800,        # Leases of crashed workers expire after this
+    'wait_timeout': 60,           # Wait this long for a free identity, then the crawl fails
+    'poll_interval': 2,           # Retry interval while every identity is at its cap
+    'sticky_ttl': 21600,          # Keyword stays on its identity this long ('sticky')
+}
+
+# Identity buffer daemon (modules/harvester.py)
+HARVESTER = {
+    'targets': {'pc': 2, 'mobile': 2},         # Fresh identities to keep per platform
+    'min_ttl': 1800,                           # Identities expiring sooner do not count as fresh
+    'block_window': 1800,                      # Block rate over crawls in the last N seconds
+    'block_threshold': 0.3,                    # Block rate that raises the target
+    'block_boost': 2,                          # Extra identities kept while the block rate is high
+    'max_browsers': {'pc': 1, 'mobile': 2},    # Concurrent collections per platform
+    'pc_versions': ['system'],                 # Chrome versions harvested (ChromeDetector queries)
+    'pc_profiles': 4,                          # Rotating user folders harvest-1..N (wiped per run)
+    'mobile_devices': 3,                       # Most recent distinct devices in selection history
+    'pc_headless': True,                       # PC harvests run Chrome headless
+    'retry_after': 600,                        # Skip a device this long after a failed collection
+    'poll_interval': 60,                       # Daemon loop interval
+    'invalidate_blocked': True,                # Crawlers mark identities blocked on any page invalid
+}
+
+# Search response cache (modules/response_cache.py)
+RESPONSE_CACHE = {
+    'enabled': False,             # Crawlers serve repeated keyword/page fetches from the cache
+    'dir': 'output/cache',        # Compressed bodies + SQLite index
+    'ttl': 600,                   # Seconds a cached page stays valid
+    'max_bytes': 512 * 1024 * 1024,  # Compressed size limit (least recently used evicted)
+    'compress_level': 6,          # zlib level
+}
+
+# Output file writes (modules/file_manager.py, modules/async_writer.py)
+FILE_WRITER = {
+    'async': False,               # Hand page/JSON writes to a background thread
+    'max_pending_bytes': 64 * 1024 * 1024,  # Queued bytes before writers wait for the disk
+    'max_batch': 32,              # Files written per background wakeup
+}
+
+# Crawled page segment archive (modules/segment_archive.py)
+ARCHIVE = {
+    'enabled': False,             # Pages go to segment files instead of one file per page
+    'dir': 'output/archive',      # Segment directory (FileManager uses <base_dir>/archive)
+    'max_segment_bytes': 256 * 1024 * 1024,  # Rotate segments at this size
+    'compress': False,            # zlib bodies (smaller, but no zero-copy reads)
+}
+
+# Block detection rules (modules/block_signatures.py)
+# Contexts: 'browser' (CookieCollector page HTML), 'pc_html' (PC page 1),
+# 'pc_rsc' (PC page 2+ RSC payload), 'mobile' (mobile search HTML)
+BLOCK_SIGNATURES = {
+    # Bodies shorter than this are blocked regardless of content
+    'min_bytes': {'browser': 5000, 'pc_html': 5000, 'pc_rsc': 50000, 'mobile': 5000},
+    # Literal markers, earliest in the page wins (ties: first listed)
+    'rules': [
+        {'name': 'http2_protocol_error', 'pattern': 'ERR_HTTP2_PROTOCOL_ERROR',  # Chrome 131+ HTTP/2 issue
+         'contexts': ['browser', 'pc_html', 'mobile']},
+        {'name': 'chrome_error', 'pattern': 'ERR_', 'contexts': ['browser', 'pc_html', 'mobile']},
+        {'name': 'reload_loop', 'pattern': 'location.reload', 'contexts': ['browser', 'pc_html', 'mobile']},
+        {'name': 'captcha', 'pattern': 'captcha', 'ignore_case': True, 'contexts': ['browser']},
+        {'name': 'access_denied', 'pattern': 'Access Denied', 'ignore_case': True, 'contexts': ['browser']},
+        {'name': 'bot_detection', 'pattern': 'bot detection', 'ignore_case': True, 'contexts': ['browser']},
+        {'name': 'error_code', 'pattern': 'error-code', 'ignore_case': True, 'contexts': ['browser']},  # Chrome error page
+        {'name': 'blocked', 'pattern': 'blocked', 'ignore_case': True, 'contexts': ['browser']},
+    ],
+}
+
+# Bulk re-scoring of stored pages (modules/reprocessor.py)
+REPROCESSOR = {
+    'inputs': ['output/archive', 'output/html'],  # Default paths (segments and page files)
+    'workers': None,              # Worker processes (None = CPU count)
+    'chunk_files': 200,           # Loose page files per worker task
+}
+
+# Pipelined page prefetch (modules/crawler.py)
+PAGE_PIPELINE = {
+    'lookahead': 1,               # Pages in flight ahead of processing (1 = sequential with delays)
+    'request_gap': (0.3, 0.8),    # Random gap between pipelined request starts (seconds)
+}
+
+# Keyword crawl job queue (modules/job_scheduler.py)
+JOB_SCHEDULER = {
+    'db_path': 'output/jobs.db',  # SQLite queue file
+    'workers': 1,                 # Concurrent crawls per runner
+    'default_priority': 0,        # Higher runs first
+    'default_max_pages': 3,
+    'dedupe_window': 1800,        # Skip keywords completed within this many seconds
+    'lease_timeout': 1800,        # Re-queue running jobs without a heartbeat for this long (worker hung/died)
+    'heartbeat_interval': 60,     # Running workers renew their lease this often
+    'poll_interval': 5,           # Idle worker wait
 }
 
 # Output directories
@@ -46,3 +191,13 @@ OUTPUT_DIRS = {
 
 # User data directory (for main-pc.py)
 USER_DATA_DIR = 'user'
+
+# Isolated Chrome profiles for concurrent harvests (utils/profile_farm.py)
+PROFILE_FARM = {
+    'enabled': None,              # None = on Linux only; used for fresh-profile harvests
+    'root': None,                 # None = /dev/shm/coupang-profiles (tmpfs) if available, else user/farm
+    'tmpfs': True,                # Prefer /dev/shm for profile I/O
+    'template_dir': 'user/templates',  # <version>/ or <major>/ seed profiles (else a minimal one)
+    'max_age': 21600,             # GC: profiles of dead owners untouched this long are removed
+    'linux_args': ['--disable-dev-shm-usage'],  # Extra Chrome arguments on Linux hosts
+}
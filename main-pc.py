@@ -10,12 +10,8 @@ import argparse
 import sys
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 import warnings
 
-# Load .env file
-load_dotenv()
-
 # Suppress subprocess cleanup warnings on Windows
 if sys.platform == 'win32':
     warnings.filterwarnings('ignore', category=ResourceWarning)
@@ -24,9 +20,10 @@ if sys.platform == 'win32':
 sys.path.insert(0, str(Path(__file__).parent))
 
 from utils.chrome_detector import ChromeDetector
-from collectors.cookie_collector import collect_cookies
-from modules import DbManager, FileManager
-from config import TIMEOUTS
+from collectors.harvest import prepare_user_dir, collect_pc, save_pc_result
+
+# collectors.cookie_collector (nodriver) and modules.DbManager (pymysql)
+# are imported where they are used so --list and usage errors start fast
 
 
 def main():
@@ -96,6 +93,10 @@ Examples:
 
     args = parser.parse_args()
 
+    # Load .env file (CHROME_VERSIONS_PATH, DB) after parsing: --help needs neither
+    from dotenv import load_dotenv
+    load_dotenv()
+
     # Initialize detector
     try:
         detector = ChromeDetector()
@@ -159,11 +160,7 @@ Examples:
 
     # Setup user profile directory
     user_folder = args.user if args.user else chrome_info['version']
-    user_dir = Path(__file__).parent / 'user' / user_folder
-    user_dir.mkdir(parents=True, exist_ok=True)
-    (user_dir / 'cookies').mkdir(exist_ok=True)
-    (user_dir / 'logs').mkdir(exist_ok=True)
-    (user_dir / 'profile').mkdir(exist_ok=True)
+    user_dir = prepare_user_dir(user_folder)
 
     # Print configuration
     print("\n" + "=" * 60)
@@ -186,25 +183,8 @@ Examples:
         print("[1/3] Starting cookie and TLS collection...")
 
     try:
-        from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-
-        def run_collection():
-            max_pages = args.page if args.search else 1
-            return collect_cookies(
-                chrome_path=chrome_info['path'],
-                user_data_dir=str(user_dir / 'profile'),
-                headless=args.headless,
-                search_keyword=args.search,
-                max_pages=max_pages
-            )
-
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_collection)
-            try:
-                result = future.result(timeout=TIMEOUTS['total_collection'])
-            except FuturesTimeoutError:
-                print(f"\n[ERROR] Collection timeout ({TIMEOUTS['total_collection']}s)")
-                return 1
+        max_pages = args.page if args.search else 1
+        result = collect_pc(chrome_info, user_dir, args.headless, args.search, max_pages)
 
         print(f"\n[2/3] Collection successful!")
         print(f"  - Cookies: {result['cookie_count']}")
@@ -224,52 +204,12 @@ Examples:
     print(f"\n[3/3] Uploading to database...")
 
     try:
-        from datetime import datetime
+        from modules import DbManager, FileManager
 
         db = DbManager()
         file_manager = FileManager()
 
-        # Prepare device name
-        device_name = f"Chrome {chrome_info['version']}"
-        if user_folder != chrome_info['version']:
-            device_name += f" ({user_folder})"
-
-        # Convert ISO string to datetime if needed
-        collected_at = result['collected_at']
-        if isinstance(collected_at, str):
-            collected_at = datetime.fromisoformat(collected_at)
-
-        # Save TLS fingerprint
-        tls_fingerprint_id = db.save_tls_fingerprint(
-            device_name=device_name,
-            browser='chrome',
-            os_version='Windows 10',
-            tls_data=result['tls_data'],
-            http2_data=result['http2_data'],
-            ja3_hash=result['ja3_hash'],
-            akamai_fingerprint=result['akamai_fingerprint'],
-            collected_at=collected_at
-        )
-
-        print(f"  - TLS fingerprint saved (ID: {tls_fingerprint_id})")
-
-        # Save cookies (from browser)
-        cookie_id = db.save_cookies(
-            device_name=device_name,
-            browser='chrome',
-            os_version='Windows 10',
-            tls_fingerprint_id=tls_fingerprint_id,
-            cookie_data=result['cookies'],
-            collected_at=collected_at,
-            cookie_type='browser'
-        )
-
-        print(f"  - Cookies saved (ID: {cookie_id}, type: 'browser')")
-
-        # Save to local files (optional)
-        timestamp = collected_at.strftime('%Y%m%d_%H%M%S')
-        file_manager.save_cookies(result['cookies'], chrome_info['version'], timestamp)
-        file_manager.save_request_headers(result.get('all_request_headers', {}), chrome_info['version'], timestamp)
+        tls_fingerprint_id, cookie_id = save_pc_result(db, file_manager, chrome_info, user_folder, result)
 
         print(f"\n[SUCCESS] All data saved successfully!")
         print(f"  - TLS Fingerprint ID: {tls_fingerprint_id}")
@@ -2,14 +2,38 @@
 Shared modules for TLS fingerprint collection and curl-cffi crawling
 """
 
-from .db_manager import DbManager
-from .tls_config import TlsConfig
-from .cookie_handler import CookieHandler
-from .file_manager import FileManager
+import importlib
+
+# Exported name -> submodule. Submodules are imported on first access
+# so that importing one class does not pull in every dependency.
+_EXPORTS = {
+    'DbManager': 'db_manager',
+    'TlsConfig': 'tls_config',
+    'CookieHandler': 'cookie_handler',
+    'CookieSet': 'cookie_handler',
+    'FileManager': 'file_manager',
+    'Crawler': 'crawler',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(f'.{_EXPORTS[name]}', __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
+
 
 __all__ = [
     'DbManager',
     'TlsConfig',
     'CookieHandler',
+    'CookieSet',
     'FileManager',
+    'Crawler',
 ]
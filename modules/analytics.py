@@ -0,0 +1,320 @@
+"""
+Analytics - Page outcomes per identity and what they say about identities
+- Every crawled page is stored in page_outcomes (migration 009) with its
+  identity: TLS fingerprint, cookie snapshot, JA3 hash, Chrome version,
+  device and cookie age (seconds since the snapshot was collected)
+- Rolling block rates per platform over ANALYTICS['windows']
+- Success ratios per JA3 hash / fingerprint / Chrome version / device
+- Survival by cookie age: Kaplan-Meier estimate of an identity still being
+  unblocked at a given age (one cookie snapshot = one identity)
+- Crawlers use identity_filter() to skip fingerprints with a high block
+  rate and identities past the age where survival drops (fresh_candidates)
+
+Usage:
+  python -m modules.analytics report                 # All sections, both platforms
+  python -m modules.analytics report --platform pc --window 21600
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import ANALYTICS
+
+INSERT_QUERY = """
+    INSERT INTO page_outcomes
+        (platform, tls_fingerprint_id, cookie_id, ja3_hash, chrome_version, device_name,
+         cookie_age, page, status, success, blocked, block_rule, size, time_ms, crawled_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Columns outcome_rates() may group by (interpolated, so whitelisted)
+GROUP_COLUMNS = ('platform', 'ja3_hash', 'tls_fingerprint_id', 'chrome_version', 'device_name', 'block_rule')
+
+# idx_page_outcomes_platform_crawled
+RATES_QUERY = """
+    SELECT {column}, COUNT(*), SUM(success), SUM(blocked)
+    FROM page_outcomes
+    WHERE crawled_at >= %s AND (%s IS NULL OR platform = %s)
+    GROUP BY {column}
+    HAVING COUNT(*) >= %s
+    ORDER BY COUNT(*) DESC
+"""
+
+# Per identity: oldest age seen and age at its first block
+SURVIVAL_QUERY = """
+    SELECT cookie_id, MAX(cookie_age), MIN(CASE WHEN blocked = 1 THEN cookie_age END)
+    FROM page_outcomes
+    WHERE crawled_at >= %s AND platform = %s AND cookie_id IS NOT NULL AND cookie_age IS NOT NULL
+    GROUP BY cookie_id
+"""
+
+
+def record_outcomes(db, platform, data, page_results, crawled_at=None):
+    """
+    Store the pages of one crawl with the identity that fetched them
+
+    Cache hits and pages that failed before a response are skipped (they
+    say nothing about the identity).
+
+    Args:
+        db: DbManager
+        platform: 'pc' / 'mobile'
+        data: Loaded identity (Crawler.data)
+        page_results: Crawler page result dicts
+
+    Returns:
+        int: Rows stored (0 before migration 009)
+    """
+    rows = [r for r in page_results if 'status' in r and not r.get('cached')]
+    if not rows or not db.ensure_schema():
+        return 0
+
+    crawled_at = crawled_at or datetime.now()
+    conn = db._get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cookie_age = None
+        if data.get('cookie_id'):
+            # Snapshot time, not the last delta: the age of the identity itself
+            cursor.execute("SELECT collected_at FROM cookies WHERE id = %s", (data['cookie_id'],))
+            row = cursor.fetchone()
+            if row:
+                cookie_age = max(0, int((crawled_at - row[0]).total_seconds()))
+
+        identity = (
+            platform,
+            data.get('tls_fingerprint_id'),
+            data.get('cookie_id'),
+            data.get('ja3_hash'),
+            data.get('chrome_version') or data.get('browser'),
+            data.get('device_name'),
+            cookie_age,
+        )
+        cursor.executemany(INSERT_QUERY, [
+            identity + (r['page'], r['status'], r['success'], r.get('blocked', False),
+                        r.get('block_rule'), r.get('size'), r.get('time_ms'), crawled_at)
+            for r in rows
+        ])
+        conn.commit()
+        return len(rows)
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def outcome_rates(db, group, platform=None, window=None, min_pages=0):
+    """
+    Success / block ratios grouped by one identity attribute
+
+    Args:
+        db: DbManager
+        group: Column from GROUP_COLUMNS (e.g. 'ja3_hash')
+        platform: 'pc' / 'mobile' / None (all)
+        window: Seconds to look back (default: ANALYTICS['selection_window'])
+        min_pages: Drop groups with fewer pages
+
+    Returns:
+        list: [{'key', 'pages', 'success', 'blocked', 'success_ratio', 'block_rate'}], most pages first
+    """
+    if group not in GROUP_COLUMNS:
+        raise ValueError(f"Unknown group: {group} (choose from {', '.join(GROUP_COLUMNS)})")
+    window = ANALYTICS['selection_window'] if window is None else window
+    since = datetime.now() - timedelta(seconds=window)
+
+    conn = db._get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(RATES_QUERY.format(column=group), (since, platform, platform, min_pages))
+        return [{
+            'key': key,
+            'pages': pages,
+            'success': int(success),
+            'blocked': int(blocked),
+            'success_ratio': int(success) / pages,
+            'block_rate': int(blocked) / pages,
+        } for key, pages, success, blocked in cursor.fetchall()]
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def rolling_block_rates(db, windows=None):
+    """
+    Block rate per platform for each window
+
+    Returns:
+        dict: {window seconds: {platform: rates dict}}
+    """
+    return {
+        window: {r['key']: r for r in outcome_rates(db, 'platform', window=window)}
+        for window in (windows or ANALYTICS['windows'])
+    }
+
+
+def survival_curve(db, platform, window=None, bucket=None):
+    """
+    Kaplan-Meier survival of identities by cookie age
+
+    An identity is observed until its oldest crawled age; blocked at the
+    age of its first blocked page, otherwise censored.
+
+    Args:
+        db: DbManager
+        platform: 'pc' / 'mobile'
+        window: Seconds of outcomes to use (default: ANALYTICS['selection_window'])
+        bucket: Age step in seconds (default: ANALYTICS['age_bucket'])
+
+    Returns:
+        list: [{'age_from', 'age_to', 'at_risk', 'blocked', 'survival'}]
+    """
+    window = ANALYTICS['selection_window'] if window is None else window
+    bucket = bucket or ANALYTICS['age_bucket']
+    since = datetime.now() - timedelta(seconds=window)
+
+    conn = db._get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(SURVIVAL_QUERY, (since, platform))
+        identities = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    # (bucket of last observation, blocked?) per identity
+    observed = [((first_block if first_block is not None else max_age) // bucket, first_block is not None)
+                for _, max_age, first_block in identities]
+    if not observed:
+        return []
+
+    curve = []
+    survival = 1.0
+    for b in range(max(b for b, _ in observed) + 1):
+        at_risk = sum(1 for ob, _ in observed if ob >= b)
+        blocked = sum(1 for ob, event in observed if ob == b and event)
+        if at_risk:
+            survival *= 1 - blocked / at_risk
+        curve.append({
+            'age_from': b * bucket,
+            'age_to': (b + 1) * bucket,
+            'at_risk': at_risk,
+            'blocked': blocked,
+            'survival': survival,
+        })
+    return curve
+
+
+def survival_horizon(curve, min_survival=None, min_at_risk=None):
+    """
+    Cookie age at which survival first drops below min_survival
+
+    Buckets with fewer than min_at_risk identities are not trusted.
+
+    Returns:
+        int: Age in seconds, or None (no such age in the data)
+    """
+    min_survival = ANALYTICS['min_survival'] if min_survival is None else min_survival
+    min_at_risk = ANALYTICS['min_pages'] if min_at_risk is None else min_at_risk
+    for point in curve:
+        if point['at_risk'] >= min_at_risk and point['survival'] < min_survival:
+            return point['age_from']
+    return None
+
+
+def identity_filter(db, platform, settings=None):
+    """
+    Predicate for cookie expiry index entries, from recent outcomes
+
+    Rejects entries whose fingerprint was blocked more than max_block_rate
+    (over at least min_pages pages) and entries older than the survival horizon.
+
+    Returns:
+        callable: entry -> bool, or None when the data rejects nothing
+    """
+    settings = {**ANALYTICS, **(settings or {})}
+    if not db.ensure_schema():
+        return None
+
+    window = settings['selection_window']
+    bad_fingerprints = {
+        r['key'] for r in outcome_rates(db, 'tls_fingerprint_id', platform, window, settings['min_pages'])
+        if r['block_rate'] > settings['max_block_rate']
+    }
+    horizon = survival_horizon(survival_curve(db, platform, window, settings['age_bucket']),
+                               settings['min_survival'], settings['min_pages'])
+
+    if not bad_fingerprints and horizon is None:
+        return None
+
+    print(f"[Analytics] Steering {platform}: {len(bad_fingerprints)} fingerprint(s) skipped"
+          + (f", identities older than {horizon // 60}m skipped" if horizon is not None else ''))
+
+    def accept(entry):
+        if entry['tls_fingerprint_id'] in bad_fingerprints:
+            return False
+        age = (datetime.now() - entry['collected_at']).total_seconds()
+        return horizon is None or age < horizon
+
+    return accept
+
+
+def main():
+    import argparse
+    from .db_manager import DbManager
+
+    parser = argparse.ArgumentParser(description='Page outcome analytics')
+    parser.add_argument('command', choices=['report'])
+    parser.add_argument('--platform', choices=['pc', 'mobile'], default=None)
+    parser.add_argument('--window', type=int, default=None, help='Seconds to look back')
+    parser.add_argument('--min-pages', type=int, default=None)
+    args = parser.parse_args()
+
+    db = DbManager()
+    if not db.ensure_schema():
+        print("[Analytics] page_outcomes needs migration 009 (python -m modules.schema migrate)")
+        return 1
+
+    window = args.window or ANALYTICS['selection_window']
+    min_pages = ANALYTICS['min_pages'] if args.min_pages is None else args.min_pages
+    platforms = [args.platform] if args.platform else ['pc', 'mobile']
+
+    print("\n" + "=" * 60)
+    print("Rolling block rate")
+    print("=" * 60)
+    for seconds, by_platform in rolling_block_rates(db).items():
+        for platform in platforms:
+            r = by_platform.get(platform)
+            if r:
+                print(f"  {seconds // 3600:>3}h {platform:<7} {r['block_rate']:>6.1%} "
+                      f"({r['blocked']:,}/{r['pages']:,} pages)")
+
+    for title, group in [('Chrome version', 'chrome_version'), ('JA3 hash', 'ja3_hash')]:
+        print(f"\n{title} (last {window // 3600}h, >= {min_pages} pages)")
+        for r in outcome_rates(db, group, args.platform, window, min_pages):
+            print(f"  {str(r['key'])[:32]:<32} success {r['success_ratio']:>6.1%}  "
+                  f"blocked {r['block_rate']:>6.1%}  ({r['pages']:,} pages)")
+
+    for platform in platforms:
+        curve = survival_curve(db, platform, window)
+        if not curve:
+            continue
+        print(f"\nSurvival by cookie age ({platform})")
+        for point in curve:
+            print(f"  {point['age_from'] // 60:>5}-{point['age_to'] // 60:<5}m  "
+                  f"survival {point['survival']:>6.1%}  at risk {point['at_risk']:>5,}  blocked {point['blocked']:>4,}")
+        horizon = survival_horizon(curve)
+        if horizon is not None:
+            print(f"  Horizon: {horizon // 60}m (survival < {ANALYTICS['min_survival']:.0%})")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
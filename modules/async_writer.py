@@ -0,0 +1,134 @@
+"""
+Async Writer - Background file writes off the crawl loop
+- write() queues (path, data) and returns immediately; one daemon thread
+  writes queued files in batches
+- Pending data is bounded by max_pending_bytes: producers wait only when
+  the disk falls that far behind
+- flush() waits until everything queued so far is on disk; pending writes
+  are flushed at interpreter exit (atexit)
+"""
+
+import sys
+import atexit
+import threading
+from collections import deque
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import FILE_WRITER
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+class AsyncWriter:
+    """Bounded write-behind queue served by one thread"""
+
+    def __init__(self, max_pending_bytes=64 * 1024 * 1024, max_batch=32):
+        """
+        Args:
+            max_pending_bytes: Queued bytes before write() blocks
+            max_batch: Files written per wakeup
+        """
+        self.max_pending_bytes = max_pending_bytes
+        self.max_batch = max_batch
+
+        self._queue = deque()
+        self._pending_bytes = 0
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.written = 0
+        self.errors = []
+
+        self._thread = threading.Thread(target=self._run, name='async-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, path, data, mode='w'):
+        """
+        Queue a file write
+
+        Args:
+            path: Target file
+            data: str (written UTF-8), bytes or memoryview
+            mode: 'w' (replace) or 'a' (append)
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AsyncWriter is closed")
+            # Backpressure: an oversized item still goes through once the queue is empty
+            self._cond.wait_for(lambda: self._pending_bytes + len(data) <= self.max_pending_bytes
+                                or not self._queue)
+            self._queue.append((Path(path), data, mode))
+            self._pending_bytes += len(data)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue and self._closed:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                self._in_flight = len(batch)
+
+            written = 0
+            for path, data, mode in batch:
+                try:
+                    with open(path, mode + 'b') as f:
+                        f.write(data)
+                    written += 1
+                except OSError as e:
+                    self.errors.append((str(path), str(e)))
+                    print(f"[AsyncWriter] ⚠️ Write failed: {path}: {e}")
+
+            with self._cond:
+                self.written += written
+                self._pending_bytes -= sum(len(data) for _, data, _ in batch)
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def pending(self):
+        """Files queued or being written"""
+        with self._cond:
+            return len(self._queue) + self._in_flight
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued write is on disk
+
+        Returns:
+            bool: True if the queue drained within the timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+
+def get_writer():
+    """
+    Process-wide AsyncWriter (FILE_WRITER settings), created on first use
+
+    Returns:
+        AsyncWriter
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None or _shared._closed:
+            _shared = AsyncWriter(FILE_WRITER['max_pending_bytes'], FILE_WRITER['max_batch'])
+        return _shared
@@ -0,0 +1,152 @@
+"""
+Block Signatures - Shared block-page detection for collectors and crawlers
+- Rules (BLOCK_SIGNATURES in config.py) are literal markers, each enabled for
+  some contexts ('browser', 'pc_html', 'pc_rsc', 'mobile')
+- Per context all markers compile once into one alternation of named groups:
+  a single pass over the page, no lowered copies, and the match names the rule
+- Case-insensitive rules use inline (?i:...) groups; str and bytes-like
+  bodies (bytes, mmap, memoryview) are both supported
+
+Usage:
+  python -m modules.block_signatures                    # Rules per context
+  python -m modules.block_signatures check page.html --context pc_html
+"""
+
+import re
+import sys
+import threading
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import BLOCK_SIGNATURES
+
+# Rule name reported for bodies under the context's min_bytes
+TOO_SMALL = 'too_small'
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+class BlockSignatures:
+    """Compiled block markers per context"""
+
+    def __init__(self, rules=None, min_bytes=None):
+        """
+        Args:
+            rules: [{'name', 'pattern', 'contexts', 'ignore_case'}] (default: config)
+            min_bytes: {context: minimum body size} (default: config)
+        """
+        self.rules = BLOCK_SIGNATURES['rules'] if rules is None else rules
+        self.min_bytes = BLOCK_SIGNATURES['min_bytes'] if min_bytes is None else min_bytes
+        self._compiled = {}
+
+    def contexts(self):
+        """Every context named by a rule or a size limit"""
+        names = set(self.min_bytes)
+        for rule in self.rules:
+            names.update(rule['contexts'])
+        return sorted(names)
+
+    def rules_for(self, context):
+        return [rule for rule in self.rules if context in rule['contexts']]
+
+    def _matcher(self, context, binary):
+        """
+        Combined pattern for a context (compiled on first use)
+
+        Returns:
+            tuple: (compiled pattern or None, {group name: rule name})
+        """
+        key = (context, binary)
+        if key not in self._compiled:
+            names = {}
+            parts = []
+            for index, rule in enumerate(self.rules_for(context)):
+                literal = re.escape(rule['pattern'])
+                part = f"(?i:{literal})" if rule.get('ignore_case') else literal
+                names[f"r{index}"] = rule['name']
+                parts.append(f"(?P<r{index}>{part})")
+
+            pattern = None
+            if parts:
+                source = '|'.join(parts)
+                pattern = re.compile(source.encode('utf-8') if binary else source)
+            self._compiled[key] = (pattern, names)
+        return self._compiled[key]
+
+    def match(self, content, context):
+        """
+        First marker in the body
+
+        Args:
+            content: Page body (str or bytes-like)
+            context: Rule context
+
+        Returns:
+            str: Rule name, or None
+        """
+        pattern, names = self._matcher(context, not isinstance(content, str))
+        if pattern is None:
+            return None
+        found = pattern.search(content)
+        return names[found.lastgroup] if found else None
+
+    def check(self, content, context):
+        """
+        Block verdict: size limit, then markers
+
+        Returns:
+            tuple: (is_blocked, rule name or None)
+        """
+        if content is None or len(content) < self.min_bytes.get(context, 0):
+            return True, TOO_SMALL
+        rule = self.match(content, context)
+        return rule is not None, rule
+
+
+def get_signatures():
+    """
+    Process-wide BlockSignatures (config rules), created on first use
+
+    Returns:
+        BlockSignatures
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BlockSignatures()
+        return _shared
+
+
+def check_blocked(content, context):
+    """check() with the shared rule set"""
+    return get_signatures().check(content, context)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Block signature rules')
+    sub = parser.add_subparsers(dest='command')
+    check_parser = sub.add_parser('check', help='Check saved pages')
+    check_parser.add_argument('files', nargs='+')
+    check_parser.add_argument('--context', default='pc_html')
+    args = parser.parse_args()
+
+    signatures = get_signatures()
+
+    if args.command == 'check':
+        for path in args.files:
+            blocked, rule = signatures.check(Path(path).read_bytes(), args.context)
+            print(f"  {'BLOCKED' if blocked else 'ok':<8} {rule or '-':<22} {path}")
+        return 0
+
+    for context in signatures.contexts():
+        rules = ', '.join(rule['name'] for rule in signatures.rules_for(context)) or '-'
+        print(f"  {context:<10} min {signatures.min_bytes.get(context, 0):>6,} bytes  rules: {rules}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,360 @@
+"""
+Cookie Delta Storage - Per-crawl cookie diffs on top of full snapshots
+- A full snapshot is a cookies row (the base); each crawl after it only
+  stores the cookies added, changed or removed, keyed by cookie name
+- After DATABASE['cookie_compact_every'] deltas the next save writes a
+  new full snapshot, so materializing never replays a long chain
+- Latest state = base row + its deltas in seq order (one index range read)
+
+Usage:
+  python -m modules.cookie_delta stats              # Snapshot/delta counts and sizes
+  python -m modules.cookie_delta show 123           # Materialized cookies of cookies row 123
+  python -m modules.cookie_delta prune --days 30    # Drop deltas of superseded snapshots
+"""
+
+import sys
+import json
+from datetime import datetime, timedelta
+
+# Newest snapshot of a fingerprint (idx_cookies_fp_collected); the row lock
+# serializes concurrent saves on one snapshot until the delta is committed
+LATEST_BASE_QUERY = """
+    SELECT id, cookie_data
+    FROM cookies
+    WHERE tls_fingerprint_id = %s
+    ORDER BY collected_at DESC
+    LIMIT 1
+    FOR UPDATE
+"""
+
+# A specific snapshot (the identity a crawler loaded)
+BASE_BY_ID_QUERY = """
+    SELECT id, cookie_data
+    FROM cookies
+    WHERE id = %s
+    FOR UPDATE
+"""
+
+# uq_cookie_deltas_base_seq: the whole chain of one snapshot in order
+CHAIN_QUERY = """
+    SELECT delta_data, collected_at
+    FROM cookie_deltas
+    WHERE base_cookie_id = %s
+    ORDER BY seq
+"""
+
+# uq_cookie_deltas_base_seq: chains of many snapshots in one query
+CHAINS_QUERY = """
+    SELECT base_cookie_id, delta_data, collected_at
+    FROM cookie_deltas
+    WHERE base_cookie_id IN ({placeholders})
+    ORDER BY base_cookie_id, seq
+"""
+
+# Snapshot IDs per CHAINS_QUERY (bounded IN list)
+CHAINS_BATCH = 1000
+
+# idx_cookie_deltas_platform_collected
+LATEST_DELTA_QUERY = """
+    SELECT base_cookie_id, collected_at
+    FROM cookie_deltas
+    WHERE platform = %s
+    ORDER BY collected_at DESC
+    LIMIT 1
+"""
+
+
+def _by_name(cookies):
+    """{name: cookie}, or None if names are not unique (not diffable by name)"""
+    by_name = {}
+    for cookie in cookies or []:
+        if not isinstance(cookie, dict) or 'name' not in cookie or cookie['name'] in by_name:
+            return None
+        by_name[cookie['name']] = cookie
+    return by_name
+
+
+def diff_cookies(old, new):
+    """
+    Delta between two cookie lists, keyed by cookie name
+
+    Args:
+        old: Previous cookie list
+        new: Current cookie list
+
+    Returns:
+        dict: {'added': {name: cookie}, 'changed': {name: cookie}, 'removed': [name]},
+              or None if either list has duplicate names (store a full snapshot)
+    """
+    old_by_name = _by_name(old)
+    new_by_name = _by_name(new)
+    if old_by_name is None or new_by_name is None:
+        return None
+
+    return {
+        'added': {name: c for name, c in new_by_name.items() if name not in old_by_name},
+        'changed': {name: c for name, c in new_by_name.items()
+                    if name in old_by_name and old_by_name[name] != c},
+        'removed': [name for name in old_by_name if name not in new_by_name],
+    }
+
+
+def apply_delta(cookies, delta):
+    """
+    Apply a delta to a cookie list
+
+    Existing cookies keep their position, added ones are appended.
+
+    Returns:
+        list: New cookie list
+    """
+    removed = set(delta.get('removed', []))
+    changed = delta.get('changed', {})
+    result = [changed.get(c['name'], c) for c in cookies if c['name'] not in removed]
+    result.extend(delta.get('added', {}).values())
+    return result
+
+
+def is_empty(delta):
+    return not (delta['added'] or delta['changed'] or delta['removed'])
+
+
+class CookieDeltaStore:
+    """Read/write cookie deltas (tables from migration 007)"""
+
+    def __init__(self, compact_every=None):
+        """
+        Args:
+            compact_every: Deltas per snapshot before a new full snapshot
+                           (default: config DATABASE['cookie_compact_every'])
+        """
+        if compact_every is None:
+            from config import DATABASE
+            compact_every = DATABASE['cookie_compact_every']
+        self.compact_every = compact_every
+
+    def _chain(self, cursor, base_cookie_id):
+        cursor.execute(CHAIN_QUERY, (base_cookie_id,))
+        return [(json.loads(delta_json), collected_at) for delta_json, collected_at in cursor.fetchall()]
+
+    def materialize(self, conn, base_cookie_id, base_cookies):
+        """
+        Latest cookies of a snapshot
+
+        Args:
+            conn: Open DB connection
+            base_cookie_id: cookies row ID
+            base_cookies: That row's cookie list
+
+        Returns:
+            tuple: (cookies, last_delta_at or None)
+        """
+        cursor = conn.cursor()
+
+        try:
+            cookies = base_cookies
+            last_delta_at = None
+            for delta, collected_at in self._chain(cursor, base_cookie_id):
+                cookies = apply_delta(cookies, delta)
+                last_delta_at = collected_at
+            return cookies, last_delta_at
+
+        finally:
+            cursor.close()
+
+    def materialize_many(self, conn, snapshots):
+        """
+        Latest cookies of many snapshots (chains read in batches, not per snapshot)
+
+        Args:
+            conn: Open DB connection
+            snapshots: {base_cookie_id: that row's cookie list}
+
+        Returns:
+            dict: {base_cookie_id: (cookies, last_delta_at or None)}
+        """
+        result = {cookie_id: (cookies, None) for cookie_id, cookies in snapshots.items()}
+        ids = list(snapshots)
+        cursor = conn.cursor()
+
+        try:
+            for i in range(0, len(ids), CHAINS_BATCH):
+                batch = ids[i:i + CHAINS_BATCH]
+                cursor.execute(CHAINS_QUERY.format(placeholders=', '.join(['%s'] * len(batch))), batch)
+                for cookie_id, delta_json, collected_at in cursor.fetchall():
+                    cookies, _ = result[cookie_id]
+                    result[cookie_id] = (apply_delta(cookies, json.loads(delta_json)), collected_at)
+            return result
+
+        finally:
+            cursor.close()
+
+    def latest_delta(self, conn, platform):
+        """
+        Newest delta of a platform
+
+        Returns:
+            tuple: (base_cookie_id, collected_at), or None
+        """
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(LATEST_DELTA_QUERY, (platform,))
+            return cursor.fetchone()
+
+        finally:
+            cursor.close()
+
+    def save(self, conn, tls_fingerprint_id, platform, cookies, collected_at, base_cookie_id=None):
+        """
+        Store cookies as a delta against the fingerprint's latest snapshot
+
+        Args:
+            base_cookie_id: Snapshot to diff against instead of the latest one
+                            (a crawl continues the identity it loaded)
+
+        Returns:
+            int: Base cookies row ID, or None when a full snapshot should be
+                 written instead (no snapshot yet, chain full, cookie
+                 names not unique, or seq conflict)
+        """
+        from pymysql.err import IntegrityError
+
+        cursor = conn.cursor()
+
+        try:
+            # Base row locked: a concurrent crawl of the same identity waits
+            # here and then reads the chain including this crawl's delta
+            if base_cookie_id:
+                cursor.execute(BASE_BY_ID_QUERY, (base_cookie_id,))
+            else:
+                cursor.execute(LATEST_BASE_QUERY, (tls_fingerprint_id,))
+            row = cursor.fetchone()
+            if not row:
+                conn.rollback()
+                return None
+
+            base_cookie_id, base_json = row
+            chain = self._chain(cursor, base_cookie_id)
+            if len(chain) >= self.compact_every:
+                conn.rollback()
+                return None
+
+            current = json.loads(base_json)
+            for delta, _ in chain:
+                current = apply_delta(current, delta)
+
+            delta = diff_cookies(current, cookies)
+            if delta is None:
+                conn.rollback()
+                return None
+
+            # Unchanged crawls still get a (tiny) row so the crawl time is kept
+            try:
+                cursor.execute("""
+                    INSERT INTO cookie_deltas (
+                        base_cookie_id, tls_fingerprint_id, platform, seq, delta_data, collected_at
+                    ) VALUES (%s, %s, %s, %s, %s, %s)
+                """, (base_cookie_id, tls_fingerprint_id, platform, len(chain) + 1,
+                      json.dumps(delta), collected_at))
+            except IntegrityError:
+                # seq taken by a writer that bypassed the lock: keep these
+                # cookies as a full snapshot instead of losing them
+                conn.rollback()
+                return None
+            conn.commit()
+            return base_cookie_id
+
+        finally:
+            cursor.close()
+
+
+def prune(db, days=30):
+    """
+    Delete deltas of snapshots that have a newer snapshot (same fingerprint)
+
+    Args:
+        db: DbManager
+        days: Keep deltas newer than this many days
+
+    Returns:
+        int: Rows deleted
+    """
+    conn = db._get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            DELETE d FROM cookie_deltas d
+            JOIN cookies b ON b.id = d.base_cookie_id
+            WHERE d.collected_at < %s
+              AND EXISTS (
+                  SELECT 1 FROM cookies n
+                  WHERE n.tls_fingerprint_id = b.tls_fingerprint_id
+                    AND n.collected_at > b.collected_at
+              )
+        """, (datetime.now() - timedelta(days=days),))
+        conn.commit()
+        return cursor.rowcount
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description='Cookie delta storage')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='Snapshot/delta counts and sizes')
+    show_parser = sub.add_parser('show', help='Materialized cookies of a snapshot')
+    show_parser.add_argument('cookie_id', type=int)
+    prune_parser = sub.add_parser('prune', help='Delete deltas of superseded snapshots')
+    prune_parser.add_argument('--days', type=int, default=30, help='Keep deltas newer than N days (default: 30)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from modules.db_manager import DbManager
+
+    db = DbManager()
+
+    if args.command == 'prune':
+        deleted = prune(db, args.days)
+        print(f"[CookieDelta] {deleted} delta row(s) deleted")
+        return 0
+
+    conn = db._get_connection()
+    cursor = conn.cursor()
+
+    try:
+        if args.command == 'stats':
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(cookie_data)), 0) FROM cookies")
+            snapshots, snapshot_bytes = cursor.fetchone()
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(delta_data)), 0) FROM cookie_deltas")
+            deltas, delta_bytes = cursor.fetchone()
+            print(f"Snapshots: {snapshots:,} rows, {int(snapshot_bytes):,} bytes")
+            print(f"Deltas:    {deltas:,} rows, {int(delta_bytes):,} bytes")
+            if deltas:
+                print(f"Avg delta: {int(delta_bytes) / deltas:,.0f} bytes "
+                      f"(avg snapshot {int(snapshot_bytes) / max(snapshots, 1):,.0f} bytes)")
+            return 0
+
+        cursor.execute("SELECT cookie_data FROM cookies WHERE id = %s", (args.cookie_id,))
+        row = cursor.fetchone()
+        if not row:
+            print(f"[CookieDelta] Cookie row #{args.cookie_id} not found")
+            return 1
+        cookies, last_delta_at = CookieDeltaStore().materialize(conn, args.cookie_id, json.loads(row[0]))
+        print(json.dumps(cookies, indent=2, ensure_ascii=False, default=str))
+        print(f"\n{len(cookies)} cookies (last delta: {last_delta_at or 'none'})")
+        return 0
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,448 @@
+"""
+Cookie Expiry - Expiry index over stored cookie sets + proactive refresh
+- An identity (valid cookie snapshot + its fingerprint, deltas applied)
+  expires with its earliest critical cookie (COOKIE_EXPIRY['critical_cookies']);
+  critical session cookies and old sets are capped by configured lifetimes
+- ExpiryIndex: min-heap keyed by that expiry
+- RefreshScheduler: re-collects devices (collectors/harvest.py) before
+  their freshest identity expires
+- Crawlers start from the longest-lived identity (load_fresh_identity),
+  skipping identities rated poorly by page outcomes (modules/analytics.py)
+
+Usage:
+  python -m modules.cookie_expiry status                 # Identities by expiry
+  python -m modules.cookie_expiry run                    # Refresh loop
+  python -m modules.cookie_expiry run --once --dry-run   # Show what would be refreshed
+"""
+
+import sys
+import json
+import time
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import COOKIE_EXPIRY
+
+# Every valid snapshot of a platform in the lookback window: each one is a
+# usable identity (one fingerprint is shared by many collections)
+# idx_cookies_platform_valid_collected (migration 010)
+INDEX_QUERY = """
+    SELECT id, tls_fingerprint_id, device_name, platform, cookie_data, collected_at
+    FROM cookies
+    WHERE platform = %s AND is_valid = 1 AND collected_at >= %s
+"""
+
+# Pre-migration fallback: platform derived from os_version in Python
+LEGACY_INDEX_QUERY = """
+    SELECT id, tls_fingerprint_id, device_name, os_version, cookie_data, collected_at
+    FROM cookies
+    WHERE is_valid = 1 AND collected_at >= %s
+"""
+
+PLATFORMS = ('pc', 'mobile')
+
+
+def _to_datetime(expires):
+    """Cookie 'expires' (epoch seconds; None/-1 = session cookie) -> datetime or None"""
+    try:
+        expires = float(expires)
+    except (TypeError, ValueError):
+        return None
+    return datetime.fromtimestamp(expires) if expires > 0 else None
+
+
+def identity_expiry(cookies, collected_at, updated_at=None, settings=None):
+    """
+    When a cookie set stops being usable
+
+    Args:
+        cookies: Cookie list
+        collected_at: Snapshot collection time (caps the identity age)
+        updated_at: Last crawl update (session cookies live from here)
+        settings: COOKIE_EXPIRY overrides
+
+    Returns:
+        tuple: (expires_at, cookie_name) - cookie_name is None when the age cap wins
+    """
+    settings = {**COOKIE_EXPIRY, **(settings or {})}
+    critical = set(settings['critical_cookies'])
+    session_expiry = (updated_at or collected_at) + timedelta(seconds=settings['session_cookie_ttl'])
+
+    expires_at = collected_at + timedelta(seconds=settings['max_identity_age'])
+    cookie_name = None
+
+    for cookie in cookies:
+        if cookie.get('name') not in critical:
+            continue
+        cookie_expiry = _to_datetime(cookie.get('expires')) or session_expiry
+        if cookie_expiry < expires_at:
+            expires_at, cookie_name = cookie_expiry, cookie['name']
+
+    return expires_at, cookie_name
+
+
+class ExpiryIndex:
+    """Min-heap of identities keyed by expiry"""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, entry):
+        """
+        Args:
+            entry: dict with at least 'expires_at' (datetime)
+        """
+        heapq.heappush(self._heap, (entry['expires_at'], next(self._counter), entry))
+
+    def peek(self):
+        """Soonest-expiring entry (or None)"""
+        return self._heap[0][2] if self._heap else None
+
+    def pop(self):
+        return heapq.heappop(self._heap)[2]
+
+    def pop_due(self, before):
+        """
+        Pop every entry expiring before a time
+
+        Returns:
+            list: Entries, soonest first
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= before:
+            due.append(self.pop())
+        return due
+
+    def entries(self):
+        """All entries, soonest first (index unchanged)"""
+        return [item[2] for item in sorted(self._heap)]
+
+    def valid(self, platform=None, min_ttl=0, now=None, accept=None):
+        """
+        Entries valid at least min_ttl seconds, longest-lived first
+
+        Args:
+            accept: Optional entry predicate (e.g. analytics.identity_filter())
+
+        Returns:
+            list: Entries
+        """
+        limit = (now or datetime.now()) + timedelta(seconds=min_ttl)
+        candidates = [entry for _, _, entry in self._heap
+                      if entry['expires_at'] > limit and (platform is None or entry['platform'] == platform)
+                      and (accept is None or accept(entry))]
+        return sorted(candidates, key=lambda e: e['expires_at'], reverse=True)
+
+    def freshest(self, platform=None, min_ttl=0, now=None, accept=None):
+        """
+        Longest-lived entry valid at least min_ttl seconds
+
+        Returns:
+            dict: Entry, or None
+        """
+        candidates = self.valid(platform, min_ttl, now, accept)
+        return candidates[0] if candidates else None
+
+    def __len__(self):
+        return len(self._heap)
+
+    @classmethod
+    def load(cls, db, platform=None, settings=None):
+        """
+        Build the index from every valid snapshot in the lookback window
+
+        One index range read per platform and one delta query per
+        batch of snapshots (cookie_delta.CHAINS_BATCH), however many identities are stored.
+
+        Args:
+            db: DbManager
+            platform: 'pc' / 'mobile' / None (all)
+            settings: COOKIE_EXPIRY overrides
+
+        Returns:
+            ExpiryIndex
+        """
+        from .schema import platform_for
+        from .cookie_delta import CookieDeltaStore
+
+        settings = {**COOKIE_EXPIRY, **(settings or {})}
+        since = datetime.now() - timedelta(seconds=settings['lookback'])
+        index = cls()
+
+        conn = db._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            if db.ensure_schema():
+                rows = []
+                for row_platform in ([platform] if platform else PLATFORMS):
+                    cursor.execute(INDEX_QUERY, (row_platform, since))
+                    rows.extend(cursor.fetchall())
+                snapshots = {row[0]: json.loads(row[4]) for row in rows}
+                materialized = CookieDeltaStore().materialize_many(conn, snapshots)
+            else:
+                cursor.execute(LEGACY_INDEX_QUERY, (since,))
+                rows = [(cookie_id, fp_id, device_name, platform_for(os_version), cookie_json, collected_at)
+                        for cookie_id, fp_id, device_name, os_version, cookie_json, collected_at
+                        in cursor.fetchall()
+                        if platform is None or platform_for(os_version) == platform]
+                materialized = {row[0]: (json.loads(row[4]), None) for row in rows}
+
+            for cookie_id, fp_id, device_name, row_platform, _, collected_at in rows:
+                cookies, updated_at = materialized[cookie_id]
+                expires_at, cookie_name = identity_expiry(cookies, collected_at, updated_at, settings)
+                index.push({
+                    'cookie_id': cookie_id,
+                    'tls_fingerprint_id': fp_id,
+                    'device_name': device_name,
+                    'platform': row_platform,
+                    'collected_at': collected_at,
+                    'expires_at': expires_at,
+                    'expiring_cookie': cookie_name,
+                })
+
+            return index
+
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def _analytics_filter(db, platform):
+    """analytics.identity_filter() when steering is enabled (None on errors)"""
+    from config import ANALYTICS
+    if not ANALYTICS['steer_selection']:
+        return None
+    try:
+        from .analytics import identity_filter
+        return identity_filter(db, platform)
+    except Exception as e:
+        print(f"[CookieExpiry] ⚠️ Analytics unavailable, selection not steered: {e}")
+        return None
+
+
+def fresh_candidates(db, platform, min_ttl=None):
+    """
+    Identities valid at least min_ttl, longest-lived first
+
+    Analytics only narrows the list, never leaves the crawler without one.
+
+    Returns:
+        list: ExpiryIndex entries
+    """
+    min_ttl = COOKIE_EXPIRY['min_ttl'] if min_ttl is None else min_ttl
+    index = ExpiryIndex.load(db, platform)
+    accept = _analytics_filter(db, platform)
+    candidates = index.valid(platform, min_ttl, accept=accept) if accept else []
+    return candidates or index.valid(platform, min_ttl)
+
+
+def load_fresh_identity(db, platform, min_ttl=None):
+    """
+    Load the longest-lived identity of a platform for crawling
+
+    Returns:
+        dict: DbManager.get_fingerprint_by_cookie() data (+ 'expires_at'),
+              or None (caller falls back to the newest identity)
+    """
+    if not db.ensure_schema():
+        return None
+
+    min_ttl = COOKIE_EXPIRY['min_ttl'] if min_ttl is None else min_ttl
+    try:
+        candidates = fresh_candidates(db, platform, min_ttl)
+        entry = candidates[0] if candidates else None
+    except Exception as e:
+        print(f"[CookieExpiry] ⚠️ Expiry index unavailable, using newest: {e}")
+        return None
+
+    if not entry:
+        print(f"[CookieExpiry] No {platform} identity valid for {min_ttl}s, using newest")
+        return None
+
+    data = db.get_fingerprint_by_cookie(entry['cookie_id'])
+    if data:
+        data['expires_at'] = entry['expires_at']
+        print(f"[CookieExpiry] Freshest {platform} identity: {entry['device_name']} "
+              f"(cookies #{entry['cookie_id']}, valid until {entry['expires_at']:%Y-%m-%d %H:%M:%S})")
+    return data
+
+
+class RefreshScheduler:
+    """Re-collect devices before their freshest identity expires"""
+
+    def __init__(self, db, settings=None, dry_run=False):
+        """
+        Args:
+            db: DbManager
+            settings: COOKIE_EXPIRY overrides
+            dry_run: Only print planned refreshes
+        """
+        self.db = db
+        self.settings = {**COOKIE_EXPIRY, **(settings or {})}
+        self.dry_run = dry_run
+        self._attempted = {}    # device_name -> last refresh attempt
+
+    def _freshest_per_device(self, index):
+        """device_name -> its longest-lived entry"""
+        freshest = {}
+        for entry in index.entries():
+            current = freshest.get(entry['device_name'])
+            if current is None or entry['expires_at'] > current['expires_at']:
+                freshest[entry['device_name']] = entry
+        return freshest
+
+    def plan(self, index, now=None):
+        """
+        Devices to refresh now (freshest identity within refresh_margin of expiry)
+
+        Returns:
+            list: Entries (freshest per device), soonest expiry first
+        """
+        now = now or datetime.now()
+        margin = timedelta(seconds=self.settings['refresh_margin'])
+        retry_after = timedelta(seconds=self.settings['retry_after'])
+
+        due = []
+        for device_name, entry in self._freshest_per_device(index).items():
+            if entry['expires_at'] - margin > now:
+                continue
+            attempted = self._attempted.get(device_name)
+            if attempted and now - attempted < retry_after:
+                continue
+            due.append(entry)
+
+        return sorted(due, key=lambda e: e['expires_at'])
+
+    def next_due(self, index, now=None):
+        """
+        Earliest time a device becomes due for plan() after now
+
+        A device is due at its freshest identity's expiry - refresh_margin,
+        or once retry_after has passed since its last attempt, whichever is
+        later. Older (superseded) identities are ignored.
+
+        Returns:
+            datetime: Next due time, or None
+        """
+        now = now or datetime.now()
+        margin = timedelta(seconds=self.settings['refresh_margin'])
+        retry_after = timedelta(seconds=self.settings['retry_after'])
+
+        soonest = None
+        for device_name, entry in self._freshest_per_device(index).items():
+            due_at = entry['expires_at'] - margin
+            attempted = self._attempted.get(device_name)
+            if attempted:
+                due_at = max(due_at, attempted + retry_after)
+            if due_at > now and (soonest is None or due_at < soonest):
+                soonest = due_at
+        return soonest
+
+    def refresh(self, entries):
+        """
+        Re-collect devices (PC one at a time, mobile as one batch)
+
+        Returns:
+            list: Device names refreshed (attempted)
+        """
+        from collectors.harvest import refresh_pc, refresh_mobile
+
+        now = datetime.now()
+        for entry in entries:
+            self._attempted[entry['device_name']] = now
+
+        refreshed = []
+        for entry in entries:
+            if entry['platform'] == 'pc':
+                refresh_pc(entry['device_name'], headless=self.settings['pc_headless'])
+                refreshed.append(entry['device_name'])
+
+        mobile = [e['device_name'] for e in entries if e['platform'] == 'mobile']
+        if mobile:
+            refreshed.extend(refresh_mobile(mobile))
+
+        return refreshed
+
+    def run_once(self):
+        """
+        One scheduling pass
+
+        Returns:
+            tuple: (planned entries, ExpiryIndex)
+        """
+        index = ExpiryIndex.load(self.db, settings=self.settings)
+        due = self.plan(index)
+
+        for entry in due:
+            reason = entry['expiring_cookie'] or 'max age'
+            print(f"[CookieExpiry] Refresh {entry['platform']} '{entry['device_name']}' "
+                  f"(expires {entry['expires_at']:%H:%M:%S}, {reason})")
+
+        if due and not self.dry_run:
+            self.refresh(due)
+
+        return due, index
+
+    def run(self, once=False):
+        """Scheduling loop (wakes early when the next refresh is due sooner)"""
+        while True:
+            due, index = self.run_once()
+            if once:
+                return due
+
+            wait = self.settings['poll_interval']
+            upcoming = self.next_due(index)
+            if upcoming:
+                until_due = (upcoming - datetime.now()).total_seconds()
+                wait = min(wait, max(1, until_due))
+            time.sleep(wait)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Cookie expiry index and refresh scheduler')
+    sub = parser.add_subparsers(dest='command', required=True)
+    status_parser = sub.add_parser('status', help='Identities by expiry')
+    status_parser.add_argument('--platform', choices=['pc', 'mobile'], default=None)
+    run_parser = sub.add_parser('run', help='Refresh identities ahead of expiry')
+    run_parser.add_argument('--once', action='store_true', help='Single pass')
+    run_parser.add_argument('--dry-run', action='store_true', help='Only print planned refreshes')
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    from modules.db_manager import DbManager
+
+    db = DbManager()
+
+    if args.command == 'status':
+        index = ExpiryIndex.load(db, args.platform)
+        now = datetime.now()
+        print("\n" + "=" * 60)
+        print(f"Cookie Expiry Index ({len(index)} identities)")
+        print("=" * 60)
+        for entry in index.entries():
+            ttl = (entry['expires_at'] - now).total_seconds()
+            mark = '❌' if ttl <= 0 else '⏳' if ttl < COOKIE_EXPIRY['refresh_margin'] else '✅'
+            print(f"  {mark} #{entry['cookie_id']:<6} {entry['platform']:<6} {entry['device_name']:<40} "
+                  f"{entry['expires_at']:%m-%d %H:%M} ({entry['expiring_cookie'] or 'max age'})")
+        print("=" * 60)
+        return 0
+
+    scheduler = RefreshScheduler(db, dry_run=args.dry_run)
+    try:
+        scheduler.run(once=args.once)
+    except KeyboardInterrupt:
+        print("\n[CookieExpiry] Stopped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,131 @@
 """
 Cookie Handler - Convert cookies between different formats
+- CookieSet: ordered cookie collection keyed by (name, domain, path)
+  with O(1) upsert and cached dict/header conversion
 """
 
 
+class CookieSet:
+    """Ordered cookie collection keyed by (name, domain, path)"""
+
+    def __init__(self, cookies=None):
+        """
+        Args:
+            cookies: Initial cookie dicts (later duplicates replace earlier ones)
+        """
+        self._cookies = {}       # key -> cookie dict (insertion order)
+        self._name_counts = {}   # name -> number of cookies with that name
+        self._header = None
+        self._dict = None
+        if cookies:
+            self.update(cookies)
+
+    @staticmethod
+    def key(cookie):
+        """(name, domain, path) of a cookie dict"""
+        return cookie.get('name'), cookie.get('domain') or '', cookie.get('path') or '/'
+
+    def upsert(self, cookie):
+        """
+        Add a cookie, or replace the one with the same key in place
+
+        Returns:
+            bool: True if added, False if replaced
+        """
+        key = self.key(cookie)
+        added = key not in self._cookies
+        self._cookies[key] = cookie
+        if added:
+            self._name_counts[key[0]] = self._name_counts.get(key[0], 0) + 1
+        self._header = self._dict = None
+        return added
+
+    def update(self, cookies):
+        """
+        Upsert many cookies
+
+        Returns:
+            int: Number of cookies added (not replaced)
+        """
+        return sum(self.upsert(cookie) for cookie in cookies)
+
+    def add_missing(self, cookies):
+        """
+        Add only cookies whose name is not present yet (any domain/path)
+
+        Returns:
+            int: Number of cookies added
+        """
+        added = 0
+        for cookie in cookies:
+            if cookie.get('name') not in self._name_counts:
+                added += self.upsert(cookie)
+        return added
+
+    def remove(self, cookie):
+        """
+        Remove the cookie with the same key
+
+        Returns:
+            bool: True if a cookie was removed
+        """
+        key = self.key(cookie)
+        if key not in self._cookies:
+            return False
+        del self._cookies[key]
+        self._name_counts[key[0]] -= 1
+        if not self._name_counts[key[0]]:
+            del self._name_counts[key[0]]
+        self._header = self._dict = None
+        return True
+
+    def has_name(self, name):
+        return name in self._name_counts
+
+    def names(self):
+        """
+        Returns:
+            set: Cookie names
+        """
+        return set(self._name_counts)
+
+    def to_list(self):
+        """
+        Returns:
+            list: Cookie dicts in insertion order
+        """
+        return list(self._cookies.values())
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: {name: value, ...} (cached until the set changes)
+        """
+        if self._dict is None:
+            self._dict = {c['name']: c['value'] for c in self._cookies.values()
+                          if c.get('name') and c.get('value')}
+        return self._dict
+
+    def to_header_string(self):
+        """
+        Returns:
+            str: Cookie header string (cached until the set changes)
+        """
+        if self._header is None:
+            self._header = '; '.join(f"{c['name']}={c['value']}" for c in self._cookies.values()
+                                     if c.get('name') and c.get('value'))
+        return self._header
+
+    def __len__(self):
+        return len(self._cookies)
+
+    def __iter__(self):
+        return iter(self._cookies.values())
+
+    def __contains__(self, cookie):
+        return self.key(cookie) in self._cookies
+
+
 class CookieHandler:
     @staticmethod
     def to_header_string(cookies):
@@ -10,11 +133,14 @@ class CookieHandler:
         Convert cookie list to header string
 
         Args:
-            cookies: List of cookie dicts
+            cookies: List of cookie dicts or CookieSet
 
         Returns:
             str: Cookie header string (e.g., "name1=value1; name2=value2")
         """
+        if isinstance(cookies, CookieSet):
+            return cookies.to_header_string()
+
         cookie_pairs = []
         for cookie in cookies:
             name = cookie.get('name', '')
@@ -29,13 +155,16 @@ class CookieHandler:
         Convert cookie list to dictionary
 
         Args:
-            cookies: List of cookie dicts or dict or JSON string
+            cookies: List of cookie dicts or dict or JSON string or CookieSet
 
         Returns:
             dict: {name: value, ...}
         """
         import json
 
+        if isinstance(cookies, CookieSet):
+            return cookies.to_dict()
+
         # Handle JSON string
         if isinstance(cookies, str):
             try:
@@ -0,0 +1,1218 @@
+"""
+Crawler Core - Multi-page curl-cffi crawler shared by PC and mobile
+- Platform profiles (PcProfile, MobileProfile) supply fingerprint lookup,
+  URLs, headers, response validation and output naming
+- Crawler runs the common flow: load fingerprint → build TLS config →
+  verify TLS → (warm up) → crawl pages → save cookies → save summary
+"""
+
+import re
+import json
+import time
+import random
+import traceback
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+from .db_manager import DbManager
+from .tls_config import TlsConfig
+from .cookie_handler import CookieSet
+from .file_manager import FileManager
+from .fingerprint_codec import as_tls_data
+from .identity_policy import select_identity, release_identity, IdentityUnavailable
+from .block_signatures import check_blocked
+from config import HARVESTER, RESPONSE_CACHE, PAGE_PIPELINE, ANALYTICS
+
+# TLS verification outputs are written next to the entry points
+PROJECT_ROOT = Path(__file__).parent.parent
+
+VERIFY_URL = "https://tls.browserleaks.com/"
+
+# Markers matched on raw bytes (no lowered copy of the body). Compiled
+# patterns also work on mmap / memoryview bodies, where `in` does not.
+HTML_PRODUCT_PATTERN = re.compile(rb'product-list|search-product')
+RSC_PRODUCT_PATTERN = re.compile(rb'(?i:"product)|search-product|srp_')
+MOBILE_PRODUCT_PATTERN = re.compile(rb'product|search', re.IGNORECASE)
+
+# Product links (HTML) and product IDs (RSC payload)
+PRODUCT_ID_PATTERN = re.compile(rb'/vp/products/(\d+)|"productId"\s*:\s*"?(\d+)')
+
+
+def as_bytes(content):
+    """Page body as bytes-like (str bodies from older callers are UTF-8 encoded)"""
+    return content.encode('utf-8') if isinstance(content, str) else content
+
+
+def extract_product_ids(content):
+    """
+    Product IDs in a page body, in page order without repeats
+
+    Args:
+        content: Page body (bytes, mmap or memoryview; str is encoded first)
+
+    Returns:
+        list: Product ID strings
+    """
+    ids = {}
+    for match in PRODUCT_ID_PATTERN.finditer(as_bytes(content)):
+        ids.setdefault((match.group(1) or match.group(2)).decode('ascii'), None)
+    return list(ids)
+
+
+def force_tls12_ja3(ja3_string):
+    """
+    Force TLS 1.3 (772) → TLS 1.2 (771)
+
+    curl-cffi JA3 mode only supports TLS 1.2.
+    Some devices use TLS 1.3, so we need to convert.
+
+    Args:
+        ja3_string: Original JA3 string (may be TLS 1.3)
+
+    Returns:
+        str: Modified JA3 string with TLS 1.2 (771)
+    """
+    parts = ja3_string.split(',')
+    if len(parts) == 5:
+        version, ciphers, extensions, groups, point_formats = parts
+
+        # Replace 772 (TLS 1.3) with 771 (TLS 1.2)
+        if version == '772':
+            version = '771'
+            print(f"  [JA3 Fix] TLS 1.3 (772) → TLS 1.2 (771)")
+
+        return f"{version},{ciphers},{extensions},{groups},{point_formats}"
+
+    return ja3_string
+
+
+def verify_tls(session, ja3_string, extra_fp, headers, output_file="tls.json", label=''):
+    """
+    Verify TLS fingerprint by connecting to browserleaks.com
+    Saves JSON response for TLS verification
+
+    Args:
+        session: curl-cffi Session object
+        ja3_string: JA3 fingerprint string
+        extra_fp: TLS fingerprint configuration
+        headers: Request headers
+        output_file: Output JSON file path (relative to project root)
+        label: Optional title suffix (e.g., ' (Mobile)')
+
+    Returns:
+        dict: TLS data from browserleaks, or None if failed
+    """
+    print(f"\n{'='*60}")
+    print(f"TLS VERIFICATION{label}")
+    print(f"{'='*60}\n")
+
+    try:
+        print(f"  Connecting to: {VERIFY_URL}")
+        print(f"  Using JA3: {ja3_string[:60]}...")
+        start_time = time.time()
+
+        response = session.get(
+            VERIFY_URL,
+            headers=headers,
+            ja3=ja3_string,
+            extra_fp=extra_fp,
+            timeout=10
+        )
+
+        elapsed_ms = int((time.time() - start_time) * 1000)
+
+        if response.status_code == 200:
+            # Response is pure JSON
+            tls_data = json.loads(response.text)
+            content_length = len(response.text)
+
+            print(f"  Status: {response.status_code}")
+            print(f"  Time: {elapsed_ms} ms")
+            print(f"  Size: {content_length:,} bytes")
+            print(f"  JA3 Hash: {tls_data.get('ja3_hash', 'Unknown')}")
+            print(f"  Akamai Hash: {tls_data.get('akamai_hash', 'Unknown')}")
+
+            # Save JSON to file
+            output_path = PROJECT_ROOT / output_file
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(tls_data, f, indent=2, ensure_ascii=False)
+
+            print(f"  Saved to: {output_path}")
+            print(f"  Result: SUCCESS\n")
+            return tls_data
+        else:
+            print(f"  Status: {response.status_code}")
+            print(f"  Result: FAILED\n")
+            return None
+
+    except Exception as e:
+        print(f"  ERROR: {e}")
+        traceback.print_exc()
+        print(f"  Result: FAILED\n")
+        return None
+
+
+def _extension_names(tls_section, ext_name, list_key):
+    """Extract names from a browserleaks-style extension entry"""
+    for ext in tls_section.get('extensions', []):
+        if ext.get('name') == ext_name:
+            return [item.get('name', '') for item in ext.get('data', {}).get(list_key, [])]
+    return []
+
+
+def compare_tls_data(db_tls_data, browserleaks_data, tls_converted=False, detailed=True):
+    """
+    Compare DB TLS data with browserleaks TLS data
+    Print only differences
+
+    Args:
+        db_tls_data: TLS data from database (dict or encoded fingerprint bytes)
+        browserleaks_data: TLS data from browserleaks.com
+        tls_converted: JA3 was forced to TLS 1.2, so skip the version and
+                       signature algorithm checks (mobile)
+        detailed: Print full item lists for differences (otherwise counts only)
+
+    Returns:
+        bool: True if identical, False if differences found
+    """
+    db_tls_data = as_tls_data(db_tls_data)
+
+    print(f"\n{'='*60}")
+    print(f"TLS COMPARISON")
+    print(f"{'='*60}")
+    print(f"  Note: JA3 Hash changes per connection (GREASE randomization)")
+    if tls_converted:
+        print(f"        TLS 1.3 was converted to 1.2 for curl-cffi compatibility")
+        print(f"        Comparing core TLS components...\n")
+    else:
+        print(f"        Comparing core TLS components instead...\n")
+
+    def describe(items):
+        if detailed:
+            return f"{len(items)} items:\n      " + '\n      '.join(items)
+        return f"{len(items)} items"
+
+    differences = []
+
+    # Extract browserleaks TLS section
+    bl_tls = browserleaks_data.get('tls', {})
+
+    # 1. Compare TLS Version
+    db_version = db_tls_data.get('tls_version', '')
+    bl_version = bl_tls.get('connection_version', {}).get('name', '')
+
+    if tls_converted:
+        if db_version and 'TLS 1.3' in db_version:
+            print(f"  [Note] Original device uses TLS 1.3, converted to 1.2 for curl-cffi")
+    elif db_version != bl_version:
+        differences.append({
+            'field': 'TLS Version',
+            'db_value': db_version,
+            'actual_value': bl_version
+        })
+
+    # 2. Compare Cipher Suites (names only, excluding GREASE)
+    db_ciphers = [c.get('name', '') for c in db_tls_data.get('cipher_suites', [])]
+    bl_ciphers = [c.get('name', '') for c in bl_tls.get('cipher_suites', [])]
+
+    # Filter out GREASE
+    db_ciphers_filtered = [c for c in db_ciphers if c != 'GREASE']
+    bl_ciphers_filtered = [c for c in bl_ciphers if c != 'GREASE']
+
+    if db_ciphers_filtered != bl_ciphers_filtered:
+        differences.append({
+            'field': 'Cipher Suites',
+            'db_value': describe(db_ciphers_filtered),
+            'actual_value': describe(bl_ciphers_filtered)
+        })
+
+    # 3. Compare Supported Groups (excluding GREASE)
+    # DB: top-level list (PC), or extensions (mobile)
+    db_groups_raw = db_tls_data.get('supported_groups', []) or \
+        _extension_names(db_tls_data, 'supported_groups', 'named_groups')
+    db_groups = [g for g in db_groups_raw if 'GREASE' not in str(g).upper()]
+
+    bl_groups_raw = _extension_names(bl_tls, 'supported_groups', 'named_groups')
+    bl_groups = [g for g in bl_groups_raw if 'GREASE' not in g.upper()]
+
+    if db_groups != bl_groups:
+        differences.append({
+            'field': 'Supported Groups',
+            'db_value': describe(db_groups),
+            'actual_value': describe(bl_groups)
+        })
+
+    # 4. Compare Signature Algorithms
+    if not tls_converted:
+        db_sig_algs = db_tls_data.get('signature_algorithms', [])
+        bl_sig_algs = _extension_names(bl_tls, 'signature_algorithms', 'algorithms')
+
+        if db_sig_algs != bl_sig_algs:
+            differences.append({
+                'field': 'Signature Algorithms',
+                'db_value': describe(db_sig_algs),
+                'actual_value': describe(bl_sig_algs)
+            })
+
+    # Print results
+    if not differences:
+        if tls_converted:
+            print(f"  [OK] TLS fingerprints match (considering TLS version conversion)!\n")
+        else:
+            print(f"  [OK] TLS fingerprints match perfectly!\n")
+        return True
+    else:
+        print(f"  [DIFF] Found {len(differences)} difference(s):\n")
+
+        for diff in differences:
+            print(f"  [{diff['field']}]")
+            print(f"    DB:     {diff['db_value']}")
+            print(f"    Actual: {diff['actual_value']}")
+            print()
+
+        return False
+
+
+class BufferedResponse:
+    """Streamed response read to the end (status + body, like a regular response)"""
+
+    def __init__(self, response):
+        self.url = response.url
+        self.status_code = response.status_code
+        self.encoding = getattr(response, 'encoding', None) or 'utf-8'
+        self.headers = dict(getattr(response, 'headers', None) or {})
+        try:
+            self.content = b''.join(response.iter_content())
+        finally:
+            response.close()
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+
+class PcProfile:
+    """Desktop Chrome on www.coupang.com (HTML page 1, RSC page 2+)"""
+
+    name = 'pc'
+    label = ''
+    kind = ''
+    cookie_type = 'crawled'
+    tls_output_file = 'tls.json'
+    warmup_url = None
+    tls_converted = False
+    detailed_diff = True
+    not_found_hint = "Please run main-pc.py first to collect TLS data"
+
+    def load_fingerprint(self, db, keyword=None):
+        """Identity by IDENTITY_POLICY (cookie expiry index), else latest TLS fingerprint + cookies"""
+        data = select_identity(db, self.name, keyword) or db.get_latest_fingerprint()
+        if data:
+            device_name = data['device_name']
+            data['chrome_version'] = device_name.split()[1] if 'Chrome' in device_name else 'Unknown'
+        return data
+
+    def describe(self, data):
+        """Print device summary lines"""
+        print(f"  Device: {data['device_name']}")
+
+    def debug_ja3(self, data, ja3_string):
+        """Extra JA3 diagnostics (none for PC)"""
+
+    def build_search_url(self, keyword, page=1, traceid=None):
+        """
+        Build Coupang search URL
+
+        Args:
+            keyword: Search keyword
+            page: Page number (1, 2, 3, ...)
+            traceid: Trace ID (reuse for pagination)
+
+        Returns:
+            tuple: (url, traceid)
+        """
+        from utils import generate_traceid
+
+        if traceid is None:
+            traceid = generate_traceid()
+
+        encoded_keyword = quote(keyword)
+
+        if page == 1:
+            # First page: no page parameter
+            url = f"https://www.coupang.com/np/search?component=&q={encoded_keyword}&traceId={traceid}&channel=user"
+        else:
+            # Page 2+: Next.js RSC request with _rsc parameter
+            rsc_param = ''.join(random.choices('abcdefghijklmnopqrstuvwxyz0123456789', k=5))
+            url = f"https://www.coupang.com/np/search?q={encoded_keyword}&traceId={traceid}&channel=user&page={page}&_rsc={rsc_param}"
+
+        return url, traceid
+
+    def build_headers(self, data, page_num, referer=None):
+        """Request headers (Session manages cookies, so no Cookie header)"""
+        return TlsConfig.build_headers(data['chrome_version'], page_num, referer, cookie_header='')
+
+    def build_verify_headers(self, data):
+        """Headers for the TLS verification request"""
+        return TlsConfig.build_headers(data['chrome_version'], 1, None, cookie_header='')
+
+    def classify(self, content, page_num):
+        """
+        Product check + block signature match
+
+        Args:
+            content: Response body (bytes-like; str is encoded first)
+            page_num: Page number
+
+        Returns:
+            tuple: (has_products, block rule name or None)
+        """
+        content = as_bytes(content)
+
+        if page_num == 1:
+            # Page 1: Regular HTML
+            has_products = HTML_PRODUCT_PATTERN.search(content) is not None
+            _, block_rule = check_blocked(content, 'pc_html')
+        else:
+            # Page 2+: RSC response (Next.js React Server Component format, usually large)
+            has_products = RSC_PRODUCT_PATTERN.search(content) is not None
+            _, block_rule = check_blocked(content, 'pc_rsc')
+
+        return has_products, block_rule
+
+    def validate_response(self, content, page_num):
+        """
+        Validate response content
+
+        Returns:
+            tuple: (has_products, is_blocked)
+        """
+        has_products, block_rule = self.classify(content, page_num)
+        return has_products, block_rule is not None
+
+    def page_output(self, data, page_num, success):
+        """
+        Output naming for a crawled page
+
+        Returns:
+            tuple: (version_tag, ext) for FileManager.save_page
+        """
+        ext = 'html' if page_num == 1 else 'rsc.txt'
+        if not success:
+            ext = f'failed.{ext}'
+        return data['chrome_version'], ext
+
+    def save_cookies(self, db, data, cookies):
+        """Save updated cookies (keeps link to the original fingerprint)"""
+        return db.save_cookies(
+            device_name=data['device_name'],
+            browser='chrome',
+            os_version='Windows 10',
+            tls_fingerprint_id=data['tls_fingerprint_id'],
+            cookie_data=cookies,
+            collected_at=datetime.now(),
+            cookie_type=self.cookie_type,
+            delta=True,
+            base_cookie_id=data.get('cookie_id')
+        )
+
+    def results(self, data):
+        """
+        Platform fields for the results summary
+
+        Returns:
+            tuple: (extra_fields, filename)
+        """
+        chrome_version = data['chrome_version']
+        major_version = chrome_version.split('.')[0]
+        return {'chrome_version': chrome_version}, f'results_chrome{major_version}.json'
+
+
+class MobileProfile(PcProfile):
+    """Mobile browser on m.coupang.com (device User-Agent, homepage warm-up)"""
+
+    name = 'mobile'
+    label = ' (Mobile)'
+    kind = ' MOBILE'
+    cookie_type = 'mobile'
+    tls_output_file = 'tls-mobile.json'
+    warmup_url = "https://m.coupang.com/"
+    tls_converted = True
+    detailed_diff = False
+    not_found_hint = "Please run main-mobile.py first to collect mobile TLS data"
+
+    DEFAULT_USER_AGENT = 'Mozilla/5.0 (Linux; Android 13) Mobile'
+
+    def load_fingerprint(self, db, keyword=None):
+        data = select_identity(db, self.name, keyword) or db.get_latest_mobile_fingerprint()
+        if data:
+            data['browser'] = data.get('browser') or 'Chrome'
+        return data
+
+    def describe(self, data):
+        print(f"  Device: {data['device_name']}")
+        print(f"  Browser: {data['browser']}")
+
+    def debug_ja3(self, data, ja3_string):
+        """Print extension/group details of the original and built JA3"""
+        original_ja3 = data['tls_data'].get('ja3_text', '')
+        if original_ja3:
+            orig_parts = original_ja3.split(',')
+            if len(orig_parts) >= 3:
+                orig_exts = orig_parts[2]
+                print(f"  [DEBUG] Original extensions from DB: {orig_exts[:100]}...")
+                print(f"  [DEBUG] Extension 0 in original: {'0' in orig_exts.split('-')}")
+
+        if ja3_string:
+            parts = ja3_string.split(',')
+            if len(parts) >= 3:
+                extensions = parts[2]
+                print(f"  [DEBUG] Built extensions: {extensions[:100]}...")
+                print(f"  [DEBUG] Extension 0 in built JA3: {'0' in extensions.split('-')}")
+                print(f"  [DEBUG] UNSUPPORTED_EXTENSIONS: {TlsConfig.UNSUPPORTED_EXTENSIONS}")
+            if len(parts) >= 5:
+                print(f"  [DEBUG] Supported groups: [{parts[3]}]")
+                print(f"  [DEBUG] Point formats: [{parts[4]}]")
+
+    def build_search_url(self, keyword, page=1, traceid=None):
+        """
+        Build Coupang mobile search URL
+
+        Args:
+            keyword: Search keyword
+            page: Page number (1, 2, 3, ...)
+            traceid: Trace ID (reuse for pagination)
+
+        Returns:
+            tuple: (url, traceid)
+        """
+        from utils import generate_traceid
+
+        if traceid is None:
+            traceid = generate_traceid()
+
+        encoded_keyword = quote(keyword)
+
+        if page == 1:
+            # First page: mobile URL
+            url = f"https://m.coupang.com/nm/search?q={encoded_keyword}&traceId={traceid}"
+        else:
+            # Page 2+: pagination
+            url = f"https://m.coupang.com/nm/search?q={encoded_keyword}&traceId={traceid}&page={page}"
+
+        return url, traceid
+
+    def user_agent(self, data):
+        """User-Agent recorded with the TLS fingerprint (must match)"""
+        return data['tls_data'].get('user_agent', self.DEFAULT_USER_AGENT)
+
+    def build_headers(self, data, page_num, referer=None):
+        return {
+            'User-Agent': self.user_agent(data),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+            'Accept-Encoding': 'gzip, deflate, br, zstd',
+            'Referer': referer if page_num > 1 else 'https://m.coupang.com/',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'same-origin' if page_num > 1 else 'none',
+            'Sec-Fetch-User': '?1',
+            'sec-ch-ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
+            'sec-ch-ua-mobile': '?1',
+            'sec-ch-ua-platform': '"Android"',
+        }
+
+    def build_verify_headers(self, data):
+        return {
+            'User-Agent': self.user_agent(data),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'ko-KR,ko;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+        }
+
+    def classify(self, content, page_num):
+        """
+        Product check + block signature match for mobile
+
+        Args:
+            content: Response body (bytes-like; str is encoded first)
+            page_num: Page number
+
+        Returns:
+            tuple: (has_products, block rule name or None)
+        """
+        content = as_bytes(content)
+
+        # Mobile: Simple HTML
+        has_products = MOBILE_PRODUCT_PATTERN.search(content) is not None
+        _, block_rule = check_blocked(content, 'mobile')
+
+        return has_products, block_rule
+
+    def validate_response(self, content, page_num):
+        """
+        Validate response content for mobile
+
+        Returns:
+            tuple: (has_products, is_blocked)
+        """
+        has_products, block_rule = self.classify(content, page_num)
+        return has_products, block_rule is not None
+
+    def page_output(self, data, page_num, success):
+        ext = f'mobile-p{page_num}.html' if success else f'mobile-p{page_num}.failed.html'
+        return f"mobile-{data['browser']}", ext
+
+    def save_cookies(self, db, data, cookies):
+        return db.save_cookies(
+            device_name=data['device_name'],
+            browser=data['browser'],
+            os_version=data.get('os_version', 'Unknown'),
+            tls_fingerprint_id=data['tls_fingerprint_id'],
+            cookie_data=cookies,
+            collected_at=datetime.now(),
+            cookie_type=self.cookie_type,
+            delta=True,
+            base_cookie_id=data.get('cookie_id')
+        )
+
+    def results(self, data):
+        browser = data['browser']
+        return {'browser': browser, 'device_type': 'mobile'}, f'results_mobile_{browser.lower()}.json'
+
+
+PROFILES = {
+    'pc': PcProfile,
+    'mobile': MobileProfile,
+}
+
+
+def get_profile(profile):
+    """Resolve a profile name ('pc', 'mobile') or instance"""
+    if isinstance(profile, str):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown crawl profile: {profile} (choose from {', '.join(PROFILES)})")
+        return PROFILES[profile]()
+    return profile
+
+
+class Crawler:
+    """Multi-page curl-cffi crawler driven by a platform profile"""
+
+    def __init__(self, profile='pc', db=None, file_manager=None, cache=None, lookahead=None):
+        """
+        Args:
+            profile: 'pc', 'mobile' or a profile instance
+            db: DbManager (default: new instance)
+            file_manager: FileManager (default: new instance)
+            cache: ResponseCache, True/False, or None for RESPONSE_CACHE['enabled']
+            lookahead: Pipelined page prefetch window (None: PAGE_PIPELINE['lookahead'])
+        """
+        self.profile = get_profile(profile)
+        self.lookahead = lookahead
+        self.db = db or DbManager()
+        self.file_manager = file_manager or FileManager()
+
+        if cache is None:
+            cache = RESPONSE_CACHE['enabled']
+        if cache is True:
+            from .response_cache import ResponseCache
+            cache = ResponseCache()
+        self.cache = cache or None
+
+        self.data = None
+        self.page_results = []
+        self.session = None
+        self.ja3_string = None
+        self.extra_fp = None
+
+    def load(self, keyword=None):
+        """
+        Load an identity (IDENTITY_POLICY) and build TLS configuration
+
+        Args:
+            keyword: Search keyword (for the 'sticky' policy)
+
+        Returns:
+            bool: True if a fingerprint was found
+        """
+        label = self.profile.label
+        kind = self.profile.kind
+
+        print(f"[1/3] Loading latest{kind} TLS fingerprint from database...")
+        try:
+            data = self.profile.load_fingerprint(self.db, keyword)
+        except IdentityUnavailable as e:
+            print(f"[ERROR] {e}")
+            return False
+        except Exception as e:
+            print(f"[ERROR] Database query failed: {e}")
+            data = None
+
+        if not data:
+            print(f"[ERROR] No{kind} TLS fingerprint found in database")
+            print(f"[INFO] {self.profile.not_found_hint}")
+            return False
+
+        self.data = data
+        self.profile.describe(data)
+        print(f"  Collected: {data['collected_at']}")
+        print(f"  JA3 Hash: {data['ja3_hash']}")
+        print(f"  Cookies: {len(data['cookies'])} items")
+
+        # Build TLS configuration
+        print(f"\n[2/3] Building TLS configuration{label}...")
+
+        # Build JA3 string from DB TLS data
+        ja3_string = TlsConfig.build_ja3_string(data['tls_data'])
+        self.profile.debug_ja3(data, ja3_string)
+
+        # Force TLS 1.3 -> 1.2 conversion (curl-cffi JA3 mode only supports TLS 1.2)
+        self.ja3_string = force_tls12_ja3(ja3_string)
+        self.extra_fp = TlsConfig.build_extra_fp(data['tls_data'])
+
+        # Check if extensions were filtered
+        original_ja3 = data['tls_data'].get('ja3_text', '')
+        if original_ja3 and original_ja3 != self.ja3_string:
+            print(f"  Note: Filtered unsupported TLS extensions for compatibility")
+
+        print(f"  TLS version: {data['tls_data'].get('tls_version')}")
+        print(f"  JA3 string: {self.ja3_string[:80]}{'...' if len(self.ja3_string) > 80 else ''}")
+        print(f"  JA3 hash (DB): {data['ja3_hash']}")
+        print(f"  extra_fp: {self.extra_fp}")
+        return True
+
+    def create_session(self):
+        """Create curl-cffi Session seeded with the DB cookies"""
+        from curl_cffi import requests
+
+        cookie_dict = CookieSet(self.data['cookies']).to_dict()
+
+        # Session manages cookies (Set-Cookie) automatically
+        session = requests.Session()
+        for name, value in cookie_dict.items():
+            session.cookies.set(name, value, domain='.coupang.com', path='/')
+
+        print(f"  Session initialized with {len(cookie_dict)} cookies")
+        print(f"  Initial cookies: {', '.join(list(cookie_dict.keys())[:5])}{'...' if len(cookie_dict) > 5 else ''}")
+
+        self.session = session
+        return session
+
+    def request(self, url, headers, stream=False):
+        """GET through the session with the loaded TLS fingerprint"""
+        return self.session.get(
+            url,
+            headers=headers,
+            ja3=self.ja3_string,
+            extra_fp=self.extra_fp,
+            timeout=10,
+            stream=stream
+        )
+
+    def fetch(self, url, headers, stream=False):
+        """
+        Search page from the response cache (when enabled), else the network
+
+        Args:
+            stream: Return as soon as headers arrive (body read via BufferedResponse)
+
+        Returns:
+            tuple: (response, cached)
+        """
+        if self.cache:
+            response = self.cache.get(url, self.profile.name)
+            if response:
+                return response, True
+        return self.request(url, headers, stream), False
+
+    def verify(self):
+        """Verify TLS fingerprint against browserleaks and compare with DB"""
+        verify_headers = self.profile.build_verify_headers(self.data)
+        browserleaks_data = verify_tls(
+            self.session, self.ja3_string, self.extra_fp, verify_headers,
+            self.profile.tls_output_file, self.profile.label
+        )
+
+        if browserleaks_data:
+            compare_tls_data(
+                self.data['tls_data'], browserleaks_data,
+                tls_converted=self.profile.tls_converted,
+                detailed=self.profile.detailed_diff
+            )
+        return browserleaks_data
+
+    def warm_up(self):
+        """Visit the profile's homepage first to initialize the session"""
+        if not self.profile.warmup_url:
+            return
+
+        print(f"\n[Session Init] Visiting {self.profile.warmup_url}...")
+        try:
+            response = self.request(self.profile.warmup_url, self.profile.build_verify_headers(self.data))
+            print(f"  Status: {response.status_code}")
+            print(f"  Size: {len(response.content):,} bytes")
+            print(f"  Session initialized\n")
+        except Exception as e:
+            print(f"  Warning: Homepage visit failed: {e}")
+            print(f"  Continuing anyway...\n")
+
+    def record_page(self, page_num, url, response, cached, elapsed_ms, request_headers=None):
+        """
+        Validate, print and save one fetched page
+
+        Args:
+            request_headers: Headers sent (kept with the page in the segment archive)
+
+        Returns:
+            dict: Page result
+        """
+        # Raw body bytes all the way: validation, file, cache (no decode)
+        content = response.content
+        content_length = len(content)
+
+        # Validate response
+        has_products, block_rule = self.profile.classify(content, page_num)
+        is_blocked = block_rule is not None
+        success = has_products and not is_blocked
+
+        print(f"    ─────────────────────────────────────")
+        print(f"    Status: {response.status_code}")
+        print(f"    Size: {content_length:,} bytes")
+        print(f"    Time: {elapsed_ms} ms{' (cache)' if cached else ''}")
+        print(f"    Products: {'Yes' if has_products else 'No'}")
+        print(f"    Blocked: {f'Yes ({block_rule})' if is_blocked else 'No'}")
+        print(f"    Result: {'SUCCESS' if success else 'FAILED'}")
+
+        # Save page content (failed responses too, for debugging)
+        version_tag, ext = self.profile.page_output(self.data, page_num, success)
+        meta = None
+        if self.file_manager.archive:
+            meta = {
+                'url': url,
+                'platform': self.profile.name,
+                'status': response.status_code,
+                'success': success,
+                'blocked': is_blocked,
+                'block_rule': block_rule,
+                'cached': cached,
+                'request_headers': dict(request_headers or {}),
+                'response_headers': dict(getattr(response, 'headers', None) or {}),
+                'fetched_at': datetime.now().isoformat(),
+            }
+        filepath = self.file_manager.save_page(content, page_num, version_tag, ext, meta)
+        print(f"    Saved: {filepath}")
+
+        # Only validated pages are cached
+        if success and self.cache and not cached:
+            self.cache.put(url, self.profile.name, response.status_code, content)
+
+        return {
+            'page': page_num,
+            'url': url,
+            'status': response.status_code,
+            'size': content_length,
+            'time_ms': elapsed_ms,
+            'success': success,
+            'blocked': is_blocked,
+            'block_rule': block_rule,
+            'cached': cached,
+            'file': filepath
+        }
+
+    def crawl_pages(self, keyword, max_pages, lookahead=None):
+        """
+        Crawl search result pages in order, stopping when blocked
+
+        Args:
+            lookahead: Pages in flight ahead of processing (None: PAGE_PIPELINE['lookahead'];
+                       1 = strictly sequential with delays)
+
+        Returns:
+            list: Per-page result dicts
+        """
+        lookahead = PAGE_PIPELINE['lookahead'] if lookahead is None else lookahead
+        if lookahead > 1 and max_pages > 1:
+            return self.crawl_pages_pipelined(keyword, max_pages, lookahead)
+
+        print(f"\n[3/3] Crawling {max_pages} pages{self.profile.label}...")
+        print(f"  Keyword: {keyword}")
+        print(f"  Target pages: {max_pages}\n")
+
+        page_results = []
+        traceid = None
+
+        for page_num in range(1, max_pages + 1):
+            print(f"  [Page {page_num}]")
+
+            # Build URL
+            url, traceid = self.profile.build_search_url(keyword, page_num, traceid)
+            print(f"    URL: {url[:70]}...")
+
+            referer = page_results[-1]['url'] if page_num > 1 else None
+            headers = self.profile.build_headers(self.data, page_num, referer)
+
+            # Debug: Show cookies before request
+            current_cookies = {}
+            try:
+                current_cookies = self.session.cookies.get_dict()
+                print(f"    [DEBUG] Cookies before request: {len(current_cookies)} items")
+            except Exception as e:
+                print(f"    [DEBUG] Could not read session cookies: {e}")
+
+            try:
+                start_time = time.time()
+                response, cached = self.fetch(url, headers)
+                elapsed_ms = int((time.time() - start_time) * 1000)
+
+                # Debug: Show cookies after auto-update
+                try:
+                    updated_cookies = self.session.cookies.get_dict()
+                    print(f"    [DEBUG] Cookies after request: {len(updated_cookies)} items")
+                    new_cookies = set(updated_cookies) - set(current_cookies)
+                    if new_cookies:
+                        print(f"    [DEBUG] New cookies: {', '.join(list(new_cookies)[:3])}{'...' if len(new_cookies) > 3 else ''}")
+                except Exception as e:
+                    print(f"    [DEBUG] Could not read updated cookies: {e}")
+
+                result = self.record_page(page_num, url, response, cached, elapsed_ms, headers)
+                page_results.append(result)
+
+                if result['success']:
+                    # Delay between pages (none after a cache hit)
+                    if page_num < max_pages and not cached:
+                        delay = random.uniform(0.5, 1.5)
+                        print(f"    Waiting {delay:.1f}s...\n")
+                        time.sleep(delay)
+                elif result['blocked']:
+                    # Stop if blocked
+                    print(f"\n    [STOPPED] Page {page_num} blocked\n")
+                    break
+
+            except Exception as e:
+                print(f"    ERROR: {e}\n")
+                traceback.print_exc()
+                page_results.append({
+                    'page': page_num,
+                    'url': url,
+                    'success': False,
+                    'error': str(e)
+                })
+                break
+
+        return page_results
+
+    def crawl_pages_pipelined(self, keyword, max_pages, lookahead):
+        """
+        Crawl pages with requests issued ahead of processing
+
+        URLs share one traceId and each page's Referer is the previous
+        page's URL, exactly as in the sequential crawl. Page k+1 is
+        requested once page k answered 200 (headers; its body may still be
+        downloading), at most `lookahead` pages ahead of the page being
+        processed and PAGE_PIPELINE['request_gap'] apart. After any other
+        status page k+1 is requested once page k has been processed, so a
+        non-blocked error page is skipped over as in the sequential crawl.
+        Validation, saves and results stay in page order; after a blocked
+        or failed page the remaining prefetched pages are discarded.
+
+        Returns:
+            list: Per-page result dicts
+        """
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        print(f"\n[3/3] Crawling {max_pages} pages{self.profile.label} (pipelined, lookahead {lookahead})...")
+        print(f"  Keyword: {keyword}")
+        print(f"  Target pages: {max_pages}\n")
+
+        urls = []
+        traceid = None
+        for page_num in range(1, max_pages + 1):
+            url, traceid = self.profile.build_search_url(keyword, page_num, traceid)
+            urls.append(url)
+
+        headers_ready = [threading.Event() for _ in urls]
+        headers_ok = [False] * len(urls)
+        changed = threading.Condition()
+
+        def notify(*_):
+            with changed:
+                changed.notify_all()
+
+        def fetch_page(index):
+            headers = self.profile.build_headers(self.data, index + 1, urls[index - 1] if index else None)
+            start_time = time.time()
+            try:
+                response, cached = self.fetch(urls[index], headers, stream=True)
+                headers_ok[index] = response.status_code == 200
+            finally:
+                headers_ready[index].set()
+                notify()
+            if not cached:
+                response = BufferedResponse(response)
+            return response, cached, int((time.time() - start_time) * 1000), headers
+
+        page_results = []
+        futures = []
+        last_issue = 0.0
+        stopped = False
+
+        def can_issue():
+            issued = len(futures)
+            if stopped or issued >= len(urls) or issued - len(page_results) >= lookahead:
+                return False
+            # Prefetch after a 200; otherwise wait until that page is processed
+            return headers_ready[issued - 1].is_set() and (headers_ok[issued - 1] or len(page_results) >= issued)
+
+        with ThreadPoolExecutor(max_workers=lookahead, thread_name_prefix='page') as executor:
+            def issue():
+                nonlocal last_issue
+                gap = random.uniform(*PAGE_PIPELINE['request_gap']) - (time.time() - last_issue)
+                if gap > 0:
+                    time.sleep(gap)
+                last_issue = time.time()
+                future = executor.submit(fetch_page, len(futures))
+                future.add_done_callback(notify)
+                futures.append(future)
+
+            issue()
+            while len(page_results) < len(futures):
+                index = len(page_results)
+                with changed:
+                    changed.wait_for(lambda: futures[index].done() or can_issue())
+
+                if can_issue():
+                    issue()
+                    continue
+
+                page_num = index + 1
+                print(f"  [Page {page_num}]")
+                print(f"    URL: {urls[index][:70]}...")
+                try:
+                    response, cached, elapsed_ms, headers = futures[index].result()
+                    result = self.record_page(page_num, urls[index], response, cached, elapsed_ms, headers)
+                except Exception as e:
+                    print(f"    ERROR: {e}\n")
+                    traceback.print_exc()
+                    result = {'page': page_num, 'url': urls[index], 'success': False, 'error': str(e)}
+                page_results.append(result)
+                print()
+
+                if result.get('blocked') or 'error' in result:
+                    stopped = True
+                    discarded = len(futures) - len(page_results)
+                    reason = 'blocked' if result.get('blocked') else 'failed'
+                    print(f"    [STOPPED] Page {page_num} {reason}"
+                          f"{f' ({discarded} prefetched page(s) discarded)' if discarded else ''}\n")
+                    break
+
+                # Nothing in flight after a non-200 page: request the next one now
+                if len(page_results) == len(futures) and can_issue():
+                    issue()
+
+        return page_results
+
+    def session_cookies(self):
+        """
+        Extract final cookies from the session in DB cookie format
+
+        Returns:
+            list: Cookie dicts (original DB cookies if extraction fails)
+        """
+        final_cookies = CookieSet()
+
+        # get_dict() has values only: keep the collected cookie's attributes
+        # (its expires is a lower bound when the server re-issued the cookie)
+        original = {c.get('name'): c for c in self.data['cookies']}
+
+        try:
+            # Method 1: get_dict()
+            for name, value in self.session.cookies.get_dict().items():
+                final_cookies.upsert({
+                    'name': name,
+                    'value': value,
+                    'domain': '.coupang.com',
+                    'path': '/',
+                    'expires': original.get(name, {}).get('expires'),
+                    'httpOnly': False,
+                    'secure': True,
+                    'sameSite': 'None',
+                })
+            print(f"Final cookies (dict method): {len(final_cookies)} items")
+
+        except (AttributeError, TypeError):
+            # Method 2: Fallback to jar iteration
+            import http.cookiejar
+            jar = getattr(self.session.cookies, 'jar', None)
+            if isinstance(jar, http.cookiejar.CookieJar):
+                for cookie in jar:
+                    final_cookies.upsert({
+                        'name': cookie.name,
+                        'value': cookie.value,
+                        'domain': cookie.domain,
+                        'path': cookie.path,
+                        'expires': cookie.expires,
+                        'httpOnly': getattr(cookie, 'http_only', False),
+                        'secure': cookie.secure,
+                        'sameSite': None,
+                    })
+                print(f"Final cookies (jar method): {len(final_cookies)} items")
+            else:
+                print(f"Warning: Could not extract cookies from session")
+                final_cookies = CookieSet(self.data['cookies'])
+                print(f"Using original cookies: {len(final_cookies)} items")
+
+        return final_cookies.to_list()
+
+    def save_cookies(self):
+        """
+        Save updated session cookies to database
+
+        Returns:
+            int: Cookie ID, or None on failure
+        """
+        print(f"\n{'='*60}")
+        print(f"COOKIE UPDATE{self.profile.label}")
+        print(f"{'='*60}")
+
+        try:
+            cookie_id = self.profile.save_cookies(self.db, self.data, self.session_cookies())
+            print(f"Cookies saved to DB (ID: {cookie_id}, type: '{self.profile.cookie_type}')")
+            return cookie_id
+        except Exception as e:
+            print(f"Cookie save error: {e}")
+            traceback.print_exc()
+            return None
+
+    def invalidate_if_blocked(self, page_results):
+        """
+        Mark the loaded identity invalid when a page was blocked
+
+        Blocked identities leave the cookie expiry index, so the next crawl
+        picks another one; the harvester (modules/harvester.py) counts them
+        towards the block rate.
+
+        Returns:
+            bool: True if the identity was invalidated
+        """
+        if not HARVESTER['invalidate_blocked'] or not self.data.get('cookie_id'):
+            return False
+        if not any(r.get('blocked') for r in page_results):
+            return False
+
+        try:
+            if self.db.invalidate_cookies(self.data['cookie_id']):
+                print(f"Identity invalidated (cookies #{self.data['cookie_id']} blocked)")
+                return True
+        except Exception as e:
+            print(f"Identity invalidation error: {e}")
+        return False
+
+    def record_outcomes(self, page_results):
+        """
+        Store page outcomes with the identity for analytics (modules/analytics.py)
+
+        Returns:
+            int: Rows stored
+        """
+        if not ANALYTICS['record']:
+            return 0
+
+        from .analytics import record_outcomes
+        try:
+            return record_outcomes(self.db, self.profile.name, self.data, page_results)
+        except Exception as e:
+            print(f"Page outcome recording error: {e}")
+            return 0
+
+    def save_summary(self, keyword, max_pages, page_results):
+        """Print summary and save results JSON"""
+        print(f"\n{'='*60}")
+        print(f"SUMMARY{self.profile.label}")
+        print(f"{'='*60}")
+        print(f"Device: {self.data['device_name']}")
+        print(f"Total pages: {len(page_results)}")
+
+        successful_pages = [r for r in page_results if r.get('success')]
+        print(f"Successful: {len(successful_pages)}")
+
+        for result in page_results:
+            status = "SUCCESS" if result.get('success') else "FAILED"
+            print(f"  Page {result['page']}: {status}")
+
+        extra_fields, filename = self.profile.results(self.data)
+        results_file = self.file_manager.save_results({
+            'keyword': keyword,
+            'max_pages': max_pages,
+            'device_name': self.data['device_name'],
+            **extra_fields,
+            'results': page_results,
+            'summary': {
+                'total': len(page_results),
+                'successful': len(successful_pages)
+            }
+        }, filename)
+
+        print(f"\nResults saved: {results_file}")
+        return successful_pages
+
+    def run(self, keyword="노트북", max_pages=3):
+        """
+        Full crawl: load → verify → warm up → crawl → save
+
+        Args:
+            keyword: Search keyword
+            max_pages: Number of pages to crawl
+
+        Returns:
+            bool: True if all pages successful
+        """
+        print(f"\n{'='*60}")
+        print(f"curl-cffi Multi-Page Crawler{self.profile.label.upper()}")
+        print(f"{'='*60}\n")
+
+        try:
+            if not self.load(keyword):
+                return False
+
+            self.create_session()
+
+            # Verify TLS fingerprint before crawling
+            self.verify()
+            self.warm_up()
+
+            page_results = self.crawl_pages(keyword, max_pages, self.lookahead)
+            self.page_results = page_results
+            if self.cache:
+                print(f"\nResponse cache: {self.cache.stats['hits']} hit(s), {self.cache.stats['misses']} miss(es)")
+            self.save_cookies()
+            self.invalidate_if_blocked(page_results)
+            self.record_outcomes(page_results)
+            successful_pages = self.save_summary(keyword, max_pages, page_results)
+            self.file_manager.flush()
+
+            return len(successful_pages) == max_pages
+
+        finally:
+            # Identity lease (IDENTITY_POLICY coordinator) ends with the crawl
+            release_identity(self.data)
+
+
+def crawl_multipage(keyword="노트북", max_pages=3, profile='pc', cache=None, lookahead=None):
+    """
+    Crawl multiple pages using curl-cffi
+
+    Args:
+        keyword: Search keyword
+        max_pages: Number of pages to crawl
+        profile: 'pc' or 'mobile'
+        cache: Use the response cache (None: RESPONSE_CACHE['enabled'])
+        lookahead: Pipelined prefetch window (None: PAGE_PIPELINE['lookahead'])
+
+    Returns:
+        bool: True if all pages successful
+    """
+    return Crawler(profile, cache=cache, lookahead=lookahead).run(keyword, max_pages)
@@ -2,25 +2,94 @@
 Database Manager - Handle all DB operations
 """
 
-import pymysql
 import json
 import os
-from dotenv import load_dotenv
 from datetime import datetime
 
-load_dotenv()
+# pymysql and dotenv are imported on first use so CLI paths that never
+# touch the database (--list, --history, usage errors) start fast
+_env_loaded = False
+
+# Schema check runs once per process (None = not checked yet)
+_schema_ready = None
+
+
+def _load_env():
+    """Load .env once per process"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
 
 
 class DbManager:
     def __init__(self):
+        _load_env()
         self.host = os.getenv('DB_HOST', '220.121.120.83')
         self.port = int(os.getenv('DB_PORT', 3306))
         self.user = os.getenv('DB_USER', 'tls_user')
         self.password = os.getenv('DB_PASSWORD', '')
         self.database = os.getenv('DB_NAME', 'tls-1029')
 
-    def _get_connection(self):
-        """Get database connection"""
+    # Lookup queries (see modules/schema.py for the indexes they rely on)
+    # Deduplicated rows are re-sighted, so "latest" is by last_seen_at
+    LATEST_TLS_QUERY = """
+        SELECT id, device_name, tls_data, http2_data, fingerprint_blob,
+               ja3_hash, akamai_fingerprint, collected_at
+        FROM tls_fingerprints
+        ORDER BY last_seen_at DESC
+        LIMIT 1
+    """
+
+    LEGACY_TLS_QUERY = LATEST_TLS_QUERY.replace(
+        " fingerprint_blob,", ""
+    ).replace("last_seen_at DESC", "collected_at DESC")
+
+    # idx_cookies_fp_collected: one index probe per fingerprint; the device
+    # comes from this row (a deduped fingerprint keeps its first sighting's)
+    LATEST_COOKIE_QUERY = """
+        SELECT id, device_name, browser, cookie_data
+        FROM cookies
+        WHERE tls_fingerprint_id = %s
+        ORDER BY collected_at DESC
+        LIMIT 1
+    """
+
+    # idx_cookies_platform_collected: newest mobile row is the first index entry
+    LATEST_MOBILE_QUERY = """
+        SELECT
+            c.id as cookie_id,
+            c.device_name,
+            c.browser,
+            c.os_version,
+            c.cookie_type,
+            c.cookie_data,
+            c.collected_at,
+            t.id as tls_fingerprint_id,
+            t.tls_data,
+            t.http2_data,
+            t.fingerprint_blob,
+            t.ja3_hash,
+            t.akamai_fingerprint
+        FROM cookies c
+        JOIN tls_fingerprints t ON c.tls_fingerprint_id = t.id
+        WHERE c.platform = 'mobile'
+        ORDER BY c.collected_at DESC
+        LIMIT 1
+    """
+
+    # Pre-migration fallback (full scan on os_version range)
+    LEGACY_MOBILE_QUERY = LATEST_MOBILE_QUERY.replace(
+        "\n            t.fingerprint_blob,", ""
+    ).replace("c.platform = 'mobile'", "c.os_version != 'Windows 10'")
+
+    # One cookie snapshot with its fingerprint (primary key)
+    COOKIE_BY_ID_QUERY = LATEST_MOBILE_QUERY.replace("c.platform = 'mobile'", "c.id = %s")
+
+    def _connect(self):
+        """Open a raw database connection (no schema check)"""
+        import pymysql
         return pymysql.connect(
             host=self.host,
             port=self.port,
@@ -30,46 +99,145 @@ class DbManager:
             charset='utf8mb4'
         )
 
+    def _get_connection(self):
+        """Get database connection"""
+        self.ensure_schema()
+        return self._connect()
+
+    def ensure_schema(self):
+        """
+        Apply pending schema migrations once per process
+
+        Failures (e.g. no ALTER privilege) are reported once and the
+        pre-migration queries are used instead.
+
+        Returns:
+            bool: True if all migrations are applied
+        """
+        global _schema_ready
+        if _schema_ready is not None:
+            return _schema_ready
+
+        from .schema import SchemaManager
+        from config import DATABASE
+
+        _schema_ready = False
+        try:
+            schema = SchemaManager(self)
+            if DATABASE['auto_migrate']:
+                schema.migrate()
+            _schema_ready = not schema.pending()
+            if not _schema_ready:
+                print("[Schema] ⚠️ Pending migrations (run: python -m modules.schema migrate)")
+        except Exception as e:
+            print(f"[Schema] ⚠️ Schema check failed, using legacy queries: {e}")
+
+        return _schema_ready
+
+    def lookup_queries(self):
+        """
+        Fingerprint lookup queries with sample parameters (for EXPLAIN)
+
+        Returns:
+            dict: {label: (sql, params)}
+        """
+        from datetime import timedelta
+        from .cookie_delta import CHAIN_QUERY, LATEST_DELTA_QUERY
+        from .cookie_expiry import INDEX_QUERY
+
+        return {
+            'latest_tls': (self.LATEST_TLS_QUERY, ()),
+            'latest_cookie': (self.LATEST_COOKIE_QUERY, (1,)),
+            'latest_mobile': (self.LATEST_MOBILE_QUERY, ()),
+            'cookie_chain': (CHAIN_QUERY, (1,)),
+            'latest_mobile_delta': (LATEST_DELTA_QUERY, ('mobile',)),
+            'expiry_index': (INDEX_QUERY, ('pc', datetime.now() - timedelta(days=7))),
+        }
+
     def save_tls_fingerprint(self, device_name, browser, os_version,
                             tls_data, http2_data, ja3_hash,
                             akamai_fingerprint, collected_at):
         """
         Save TLS fingerprint to database
 
+        Identical fingerprints (same canonical hash, see modules/fingerprint.py)
+        reuse the existing row: its sighting_count/last_seen_at are updated
+        and a row is added to tls_fingerprint_sightings.
+
         Returns:
-            int: TLS fingerprint ID
+            int: TLS fingerprint ID (existing ID if already stored)
         """
         conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
-            query = """
-                INSERT INTO tls_fingerprints (
-                    device_name, browser, os_version,
-                    tls_data, http2_data,
-                    ja3_hash, akamai_fingerprint,
-                    collected_at, cipher_count, extension_count
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-
             cipher_count = len(tls_data.get('cipher_suites', []))
             extension_count = len(tls_data.get('extensions', []))
 
-            cursor.execute(query, (
+            from config import DATABASE
+
+            # Blob-only storage keeps '{}' in the JSON columns (NOT NULL)
+            storage = DATABASE['fingerprint_storage'] if _schema_ready else 'json'
+            keep_json = storage != 'blob'
+
+            values = [
                 device_name,
                 browser,
                 os_version,
-                json.dumps(tls_data),
-                json.dumps(http2_data),
+                json.dumps(tls_data) if keep_json else '{}',
+                json.dumps(http2_data) if keep_json else '{}',
                 ja3_hash,
                 akamai_fingerprint,
                 collected_at,
                 cipher_count,
                 extension_count
-            ))
+            ]
+
+            if not _schema_ready:
+                query = """
+                    INSERT INTO tls_fingerprints (
+                        device_name, browser, os_version,
+                        tls_data, http2_data,
+                        ja3_hash, akamai_fingerprint,
+                        collected_at, cipher_count, extension_count
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """
+
+                cursor.execute(query, values)
+                conn.commit()
+                return cursor.lastrowid
+
+            from .fingerprint import fingerprint_hash
+            from .fingerprint_codec import encode_fingerprint
+
+            blob = encode_fingerprint(tls_data, http2_data) if storage != 'json' else None
+
+            # LAST_INSERT_ID(id) makes lastrowid the existing row on duplicate
+            query = """
+                INSERT INTO tls_fingerprints (
+                    device_name, browser, os_version,
+                    tls_data, http2_data,
+                    ja3_hash, akamai_fingerprint,
+                    collected_at, cipher_count, extension_count,
+                    fingerprint_hash, sighting_count, last_seen_at, fingerprint_blob
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    id = LAST_INSERT_ID(id),
+                    sighting_count = sighting_count + 1,
+                    last_seen_at = GREATEST(COALESCE(last_seen_at, collected_at), VALUES(last_seen_at))
+            """
+
+            cursor.execute(query, values + [fingerprint_hash(tls_data, http2_data), collected_at, blob])
+            tls_fingerprint_id = cursor.lastrowid
+
+            cursor.execute("""
+                INSERT INTO tls_fingerprint_sightings (
+                    tls_fingerprint_id, device_name, browser, os_version, ja3_hash, seen_at
+                ) VALUES (%s, %s, %s, %s, %s, %s)
+            """, (tls_fingerprint_id, device_name, browser, os_version, ja3_hash, collected_at))
 
             conn.commit()
-            return cursor.lastrowid
+            return tls_fingerprint_id
 
         finally:
             cursor.close()
@@ -77,7 +245,7 @@ class DbManager:
 
     def save_cookies(self, device_name, browser, os_version,
                     tls_fingerprint_id, cookie_data, collected_at,
-                    cookie_type='browser'):
+                    cookie_type='browser', delta=False, base_cookie_id=None):
         """
         Save cookies to database
 
@@ -85,23 +253,38 @@ class DbManager:
             cookie_type: Cookie source type
                 - 'browser': Collected from browser (main-pc.py)
                 - 'crawled': Updated during crawling (curlcffi.py)
+                - 'mobile': Collected/crawled on mobile (main-mobile.py, curlcffi-mobile.py)
+            delta: Store only the changes against the fingerprint's latest
+                   snapshot (see modules/cookie_delta.py); a full snapshot
+                   is written when no delta can be stored
+            base_cookie_id: Snapshot the delta continues (default: latest)
 
         Returns:
-            int: Cookie ID
+            int: Cookie ID (the snapshot row when saved as a delta)
         """
+        from config import DATABASE
+        from .schema import platform_for
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
-            query = """
-                INSERT INTO cookies (
-                    device_name, browser, os_version,
-                    tls_fingerprint_id, cookie_type, cookie_data,
-                    collected_at, is_valid
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
+            if delta and _schema_ready and DATABASE['cookie_deltas']:
+                from .cookie_delta import CookieDeltaStore
+
+                cookie_id = CookieDeltaStore().save(
+                    conn, tls_fingerprint_id, platform_for(os_version), cookie_data, collected_at,
+                    base_cookie_id=base_cookie_id
+                )
+                if cookie_id:
+                    return cookie_id
 
-            cursor.execute(query, (
+            columns = [
+                'device_name', 'browser', 'os_version',
+                'tls_fingerprint_id', 'cookie_type', 'cookie_data',
+                'collected_at', 'is_valid'
+            ]
+            values = [
                 device_name,
                 browser,
                 os_version,
@@ -110,7 +293,18 @@ class DbManager:
                 json.dumps(cookie_data),
                 collected_at,
                 1
-            ))
+            ]
+
+            if _schema_ready:
+                columns.append('platform')
+                values.append(platform_for(os_version))
+
+            query = f"""
+                INSERT INTO cookies ({', '.join(columns)})
+                VALUES ({', '.join(['%s'] * len(columns))})
+            """
+
+            cursor.execute(query, values)
 
             conn.commit()
             return cursor.lastrowid
@@ -119,20 +313,50 @@ class DbManager:
             cursor.close()
             conn.close()
 
+    def invalidate_cookies(self, cookie_id):
+        """
+        Mark a cookie snapshot as blocked (is_valid = 0)
+
+        Invalid snapshots drop out of the cookie expiry index, and their
+        invalidation time feeds the harvester's block rate.
+
+        Returns:
+            bool: True if a row was updated
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            if _schema_ready:
+                cursor.execute(
+                    "UPDATE cookies SET is_valid = 0, invalidated_at = %s WHERE id = %s AND is_valid = 1",
+                    (datetime.now(), cookie_id)
+                )
+            else:
+                cursor.execute("UPDATE cookies SET is_valid = 0 WHERE id = %s AND is_valid = 1", (cookie_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_latest_fingerprint(self):
         """
         Get latest TLS fingerprint and its most recent cookies from database
 
         Logic:
-        - Gets the latest TLS fingerprint by collected_at
+        - Gets the most recently seen TLS fingerprint (last_seen_at; collected_at before migration 005)
         - For that fingerprint, gets the most recent cookies (browser or crawled)
         - Crawled cookies are preferred for a given fingerprint (more up-to-date)
         - Fresh browser cookies are used when a new fingerprint is collected
 
         Returns:
             dict: {
+                'cookie_id': int,
                 'tls_fingerprint_id': int,
-                'device_name': str,
+                'device_name': str (of the cookies row: the collecting Chrome),
+                'browser': str,
                 'tls_data': dict,
                 'http2_data': dict,
                 'cookies': list,
@@ -141,20 +365,16 @@ class DbManager:
                 'collected_at': datetime
             }
         """
+        from pymysql.cursors import DictCursor
+        from .cookie_delta import CookieDeltaStore
+        from .fingerprint_codec import load_row
+
         conn = self._get_connection()
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor = conn.cursor(DictCursor)
 
         try:
             # Get latest TLS fingerprint
-            tls_query = """
-                SELECT id, device_name, tls_data, http2_data,
-                       ja3_hash, akamai_fingerprint, collected_at
-                FROM tls_fingerprints
-                ORDER BY collected_at DESC
-                LIMIT 1
-            """
-
-            cursor.execute(tls_query)
+            cursor.execute(self.LATEST_TLS_QUERY if _schema_ready else self.LEGACY_TLS_QUERY)
             tls_row = cursor.fetchone()
 
             if not tls_row:
@@ -163,26 +383,27 @@ class DbManager:
             tls_fingerprint_id = tls_row['id']
 
             # Get corresponding cookies
-            cookie_query = """
-                SELECT cookie_data
-                FROM cookies
-                WHERE tls_fingerprint_id = %s
-                ORDER BY collected_at DESC
-                LIMIT 1
-            """
-
-            cursor.execute(cookie_query, (tls_fingerprint_id,))
+            cursor.execute(self.LATEST_COOKIE_QUERY, (tls_fingerprint_id,))
             cookie_row = cursor.fetchone()
 
             if not cookie_row:
                 return None
 
+            tls_data, http2_data = load_row(tls_row['tls_data'], tls_row['http2_data'],
+                                            tls_row.get('fingerprint_blob'))
+
+            cookies = json.loads(cookie_row['cookie_data'])
+            if _schema_ready:
+                cookies, _ = CookieDeltaStore().materialize(conn, cookie_row['id'], cookies)
+
             return {
+                'cookie_id': cookie_row['id'],
                 'tls_fingerprint_id': tls_fingerprint_id,
-                'device_name': tls_row['device_name'],
-                'tls_data': json.loads(tls_row['tls_data']),
-                'http2_data': json.loads(tls_row['http2_data']),
-                'cookies': json.loads(cookie_row['cookie_data']),
+                'device_name': cookie_row['device_name'] or tls_row['device_name'],
+                'browser': cookie_row['browser'],
+                'tls_data': tls_data,
+                'http2_data': http2_data,
+                'cookies': cookies,
                 'ja3_hash': tls_row['ja3_hash'],
                 'akamai_fingerprint': tls_row['akamai_fingerprint'],
                 'collected_at': tls_row['collected_at']
@@ -191,3 +412,98 @@ class DbManager:
         finally:
             cursor.close()
             conn.close()
+
+    def get_latest_mobile_fingerprint(self):
+        """
+        Get latest MOBILE cookies and their TLS fingerprint from database
+
+        Logic:
+        - Mobile rows are cookies with platform 'mobile' (os_version is not 'Windows 10')
+        - Returns the most recently collected one with its fingerprint
+        - Cookie deltas count as collections: a snapshot with a newer delta
+          wins, and its cookies are materialized
+
+        Returns:
+            dict: {
+                'cookie_id': int,
+                'tls_fingerprint_id': int,
+                'device_name': str,
+                'browser': str,
+                'os_version': str,
+                'cookie_type': str,
+                'tls_data': dict,
+                'http2_data': dict,
+                'cookies': list,
+                'ja3_hash': str,
+                'akamai_fingerprint': str,
+                'collected_at': datetime
+            }
+        """
+        from pymysql.cursors import DictCursor
+        from .cookie_delta import CookieDeltaStore
+
+        conn = self._get_connection()
+        cursor = conn.cursor(DictCursor)
+
+        try:
+            # platform column once migrated, os_version scan before
+            query = self.LATEST_MOBILE_QUERY if _schema_ready else self.LEGACY_MOBILE_QUERY
+
+            cursor.execute(query)
+            row = cursor.fetchone()
+
+            if not row:
+                return None
+
+            if _schema_ready:
+                store = CookieDeltaStore()
+                latest = store.latest_delta(conn, 'mobile')
+                if latest and latest[0] != row['cookie_id'] and latest[1] > row['collected_at']:
+                    cursor.execute(self.COOKIE_BY_ID_QUERY, (latest[0],))
+                    row = cursor.fetchone() or row
+
+            return self._identity_from_row(conn, row)
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_fingerprint_by_cookie(self, cookie_id):
+        """
+        Get one cookie snapshot (materialized) and its TLS fingerprint
+
+        Used to load a specific identity, e.g. the freshest one picked by
+        modules/cookie_expiry.py. Requires the migrated schema.
+
+        Returns:
+            dict: Same fields as get_latest_mobile_fingerprint(), or None
+        """
+        from pymysql.cursors import DictCursor
+
+        conn = self._get_connection()
+        cursor = conn.cursor(DictCursor)
+
+        try:
+            if not _schema_ready:
+                return None
+
+            cursor.execute(self.COOKIE_BY_ID_QUERY, (cookie_id,))
+            row = cursor.fetchone()
+            return self._identity_from_row(conn, row) if row else None
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _identity_from_row(self, conn, row):
+        """Decode fingerprint data and materialize cookie deltas of a joined row"""
+        from .cookie_delta import CookieDeltaStore
+        from .fingerprint_codec import load_row
+
+        row['tls_data'], row['http2_data'] = load_row(row['tls_data'], row['http2_data'],
+                                                      row.pop('fingerprint_blob', None))
+        row['cookies'] = json.loads(row.pop('cookie_data'))
+        if _schema_ready:
+            row['cookies'], last_delta_at = CookieDeltaStore().materialize(conn, row['cookie_id'], row['cookies'])
+            row['collected_at'] = last_delta_at or row['collected_at']
+        return row
@@ -1,5 +1,9 @@
 """
 File Manager - Handle all file I/O operations
+- Writes go through the shared background writer when FILE_WRITER['async']
+  is set (modules/async_writer.py); paths are returned immediately
+- Crawled pages go to the segment archive when ARCHIVE['enabled'] is set
+  (modules/segment_archive.py); save_page then returns a record locator
 """
 
 import json
@@ -8,12 +12,34 @@ from datetime import datetime
 
 
 class FileManager:
-    def __init__(self, base_dir='output'):
+    def __init__(self, base_dir='output', async_writes=None, archive=None):
         """
         Args:
             base_dir: Base directory for outputs (default: 'output')
+            async_writes: Queue writes to a background thread
+                          (default: config FILE_WRITER['async'])
+            archive: Append pages to segment files under <base_dir>/archive
+                     (default: config ARCHIVE['enabled'])
         """
+        from config import FILE_WRITER, ARCHIVE
+
+        if async_writes is None:
+            async_writes = FILE_WRITER['async']
+        if archive is None:
+            archive = ARCHIVE['enabled']
+
+        self.writer = None
+        if async_writes:
+            from .async_writer import get_writer
+            self.writer = get_writer()
+
         self.base_dir = Path(base_dir)
+
+        self.archive = None
+        if archive:
+            from .segment_archive import get_writer as get_archive_writer
+            self.archive = get_archive_writer(self.base_dir / 'archive')
+
         self.html_dir = self.base_dir / 'html'
         self.json_dir = self.base_dir / 'json'
         self.logs_dir = self.base_dir / 'logs'
@@ -23,21 +49,35 @@ class FileManager:
         self.json_dir.mkdir(parents=True, exist_ok=True)
         self.logs_dir.mkdir(parents=True, exist_ok=True)
 
+    def _write(self, filepath, content):
+        """Write bytes as-is or text as UTF-8, now or via the background writer"""
+        if self.writer:
+            self.writer.write(filepath, content)
+        elif isinstance(content, (bytes, bytearray, memoryview)):
+            with open(filepath, 'wb') as f:
+                f.write(content)
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(content)
+        return str(filepath)
+
+    def flush(self):
+        """Wait for queued background writes (no-op for synchronous writes)"""
+        if self.writer:
+            self.writer.flush()
+
     def save_html(self, content, filename):
         """
         Save HTML content
 
         Args:
-            content: HTML string
+            content: HTML string or raw bytes
             filename: Filename (without path)
 
         Returns:
             str: Full file path
         """
-        filepath = self.html_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return str(filepath)
+        return self._write(self.html_dir / filename, content)
 
     def save_json(self, data, filename):
         """
@@ -50,10 +90,8 @@ class FileManager:
         Returns:
             str: Full file path
         """
-        filepath = self.json_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        return str(filepath)
+        # Serialized now, so later changes to data do not leak into a queued write
+        return self._write(self.json_dir / filename, json.dumps(data, indent=2, ensure_ascii=False))
 
     def save_cookies(self, cookies, chrome_version, timestamp=None):
         """
@@ -89,35 +127,33 @@ class FileManager:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
         filename = f'request_headers_chrome{chrome_version}_{timestamp}.json'
-        filepath = self.logs_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(headers, f, indent=2, ensure_ascii=False)
-        return str(filepath)
+        return self._write(self.logs_dir / filename, json.dumps(headers, indent=2, ensure_ascii=False))
 
-    def save_page(self, content, page_num, chrome_version, ext='html'):
+    def save_page(self, content, page_num, chrome_version, ext='html', meta=None):
         """
         Save crawled page content
 
         Args:
-            content: Page content string
+            content: Page body (raw bytes are written without re-encoding)
             page_num: Page number
             chrome_version: Chrome version string
             ext: File extension (default: 'html')
+            meta: Record metadata for the archive (url, status, headers, ...)
 
         Returns:
-            str: Full file path
+            str: Full file path, or '<segment>@<offset>' when archiving
         """
         major_version = chrome_version.split('.')[0]
         filename = f'page_{page_num}_chrome{major_version}.{ext}'
 
+        if self.archive:
+            return self.archive.append(content, {'name': filename, 'page': page_num, **(meta or {})})
+
         if ext in ['html', 'htm']:
             return self.save_html(content, filename)
         else:
             # For RSC or other text formats
-            filepath = self.html_dir / filename
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return str(filepath)
+            return self._write(self.html_dir / filename, content)
 
     def save_results(self, results, filename):
         """
@@ -0,0 +1,273 @@
+"""
+Fingerprint Canonicalizer - Stable identity hash for TLS/HTTP2 fingerprints
+- GREASE values are dropped (randomized per connection)
+- Order is kept where the browser keeps it (ciphers, groups, signature
+  algorithms, ALPN, supported versions, HTTP/2 settings)
+- Extension IDs are sorted: Chrome permutes extension order per connection
+  (same idea as JA3N), so raw order would split one browser into many rows
+
+Usage:
+  python -m modules.fingerprint hash tls.json     # Canonical hash of a browserleaks JSON
+  python -m modules.fingerprint dedupe            # Merge duplicate rows (repoints cookies)
+"""
+
+import sys
+import json
+import hashlib
+
+# Part of the hashed form: bumping it changes every hash (needs a re-hash migration)
+CANONICAL_VERSION = 1
+
+
+def is_grease(value):
+    """GREASE code points: 0x0A0A, 0x1A1A, ... 0xFAFA (RFC 8701)"""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return isinstance(value, str) and 'GREASE' in value.upper()
+    return (value & 0x0F0F) == 0x0A0A and (value >> 8) == (value & 0xFF)
+
+
+def _ids(items):
+    """IDs (or names when no ID) of a browserleaks item list, GREASE removed"""
+    result = []
+    for item in items or []:
+        if isinstance(item, dict):
+            if 'GREASE' in str(item.get('name', '')).upper():
+                continue
+            value = item.get('id', item.get('name'))
+        else:
+            value = item
+        if value is None or is_grease(value):
+            continue
+        result.append(value)
+    return result
+
+
+def _extension(extensions, name):
+    for ext in extensions or []:
+        if isinstance(ext, dict) and ext.get('name') == name:
+            return ext.get('data') or {}
+    return {}
+
+
+def _ja3_fields(tls_data):
+    """Split ja3_text into its 5 fields (empty lists if missing)"""
+    parts = (tls_data.get('ja3_text') or '').split(',')
+    if len(parts) != 5:
+        return None
+    return [[int(v) for v in part.split('-') if v] for part in parts]
+
+
+def _canonical_http2(http2_data):
+    """HTTP/2 identity: SETTINGS (ordered), WINDOW_UPDATE, pseudo-header order"""
+    if isinstance(http2_data, dict):
+        if http2_data.get('akamai_text'):
+            return http2_data['akamai_text']
+        settings = http2_data.get('settings') or {}
+        return sorted(settings.items()) if isinstance(settings, dict) else settings
+
+    # Raw browserleaks frame list (mobile)
+    canonical = []
+    for frame in http2_data or []:
+        name = frame.get('name')
+        if name == 'SETTINGS':
+            canonical.append(['SETTINGS', [[s.get('id'), s.get('value')] for s in frame.get('settings', [])
+                                           if not is_grease(s.get('id'))]])
+        elif name == 'WINDOW_UPDATE':
+            canonical.append(['WINDOW_UPDATE', frame.get('window_size_increment')])
+        elif name == 'HEADERS':
+            pseudo = [h for h in (frame.get('headers') or {}) if h.startswith(':')]
+            canonical.append(['HEADERS', pseudo])
+    return canonical
+
+
+def canonical_fingerprint(tls_data, http2_data=None):
+    """
+    Build the canonical form of a fingerprint
+
+    Args:
+        tls_data: TLS data (main-pc.py format or browserleaks 'tls' section)
+        http2_data: HTTP/2 data (dict or browserleaks frame list)
+
+    Returns:
+        dict: Canonical fingerprint (JSON-serializable)
+    """
+    tls_data = tls_data or {}
+    extensions = tls_data.get('extensions', [])
+
+    version = tls_data.get('tls_version') or \
+        (tls_data.get('connection_version') or {}).get('name', '')
+
+    ciphers = _ids(tls_data.get('cipher_suites'))
+    extension_ids = _ids(extensions)
+    groups = _ids(_extension(extensions, 'supported_groups').get('named_groups'))
+    point_formats = _ids(_extension(extensions, 'ec_point_formats').get('ec_point_format_list'))
+    sig_algs = _ids(_extension(extensions, 'signature_algorithms').get('algorithms')) or \
+        _ids(tls_data.get('signature_algorithms'))
+    versions = _ids(_extension(extensions, 'supported_versions').get('supported_versions'))
+    alpn = list(_extension(extensions, 'application_layer_protocol_negotiation').get('protocol_name_list', []))
+
+    # Stored without browserleaks details: fall back to ja3_text
+    ja3 = _ja3_fields(tls_data)
+    if ja3:
+        ciphers = ciphers or [v for v in ja3[1] if not is_grease(v)]
+        extension_ids = extension_ids or [v for v in ja3[2] if not is_grease(v)]
+        groups = groups or [v for v in ja3[3] if not is_grease(v)]
+        point_formats = point_formats or ja3[4]
+    if not groups:
+        groups = _ids(tls_data.get('supported_groups'))
+
+    return {
+        'v': CANONICAL_VERSION,
+        'tls_version': version,
+        'ciphers': ciphers,
+        'extensions': sorted(extension_ids, key=lambda v: (0, v, '') if isinstance(v, int) else (1, 0, str(v))),
+        'groups': groups,
+        'point_formats': point_formats,
+        'signature_algorithms': sig_algs,
+        'supported_versions': versions,
+        'alpn': alpn,
+        'http2': _canonical_http2(http2_data),
+    }
+
+
+def fingerprint_hash(tls_data, http2_data=None):
+    """
+    SHA-256 of the canonical fingerprint
+
+    Args:
+        tls_data: TLS data
+        http2_data: HTTP/2 data
+
+    Returns:
+        str: 64-char hex digest
+    """
+    canonical = canonical_fingerprint(tls_data, http2_data)
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _merge(conn, cursor, duplicates, verbose=True):
+    """
+    Merge (duplicate id, kept id) pairs, one transaction each
+
+    Returns:
+        int: Rows merged away
+    """
+    merged = 0
+    for dup_id, keep_id in duplicates:
+        cursor.execute("UPDATE cookies SET tls_fingerprint_id = %s WHERE tls_fingerprint_id = %s", (keep_id, dup_id))
+        cursor.execute("UPDATE tls_fingerprint_sightings SET tls_fingerprint_id = %s WHERE tls_fingerprint_id = %s", (keep_id, dup_id))
+        cursor.execute("""
+            UPDATE tls_fingerprints k
+            JOIN tls_fingerprints d ON d.id = %s
+            SET k.sighting_count = k.sighting_count + d.sighting_count,
+                k.last_seen_at = GREATEST(COALESCE(k.last_seen_at, k.collected_at),
+                                          COALESCE(d.last_seen_at, d.collected_at))
+            WHERE k.id = %s
+        """, (dup_id, keep_id))
+        cursor.execute("DELETE FROM tls_fingerprints WHERE id = %s", (dup_id,))
+        conn.commit()
+        merged += 1
+        if verbose:
+            print(f"  Merged #{dup_id} → #{keep_id}")
+    return merged
+
+
+def dedupe(db, verbose=True):
+    """
+    Merge duplicate fingerprint rows left from before hashing
+
+    Rows with the same canonical hash are merged into the oldest one:
+    cookies and sightings are repointed, sighting counts summed and
+    last_seen_at kept as the newest. Rows are streamed by id in
+    DATABASE['backfill_batch'] pages; rows that already have a hash are
+    not decoded. Requires migrations 005 (hash, sightings) and 006 (blob).
+
+    Returns:
+        int: Number of rows merged away
+    """
+    from config import DATABASE
+    from .fingerprint_codec import load_row
+
+    conn = db._get_connection()
+    cursor = conn.cursor()
+    merged = 0
+    batch = int(DATABASE['backfill_batch'])
+
+    try:
+        keep = {}
+        last_id = 0
+        while True:
+            cursor.execute(f"""
+                SELECT id, fingerprint_hash,
+                       IF(fingerprint_hash IS NULL, tls_data, NULL),
+                       IF(fingerprint_hash IS NULL, http2_data, NULL),
+                       IF(fingerprint_hash IS NULL, fingerprint_blob, NULL)
+                FROM tls_fingerprints
+                WHERE id > %s
+                ORDER BY id
+                LIMIT {batch}
+            """, (last_id,))
+            rows = cursor.fetchall()
+
+            duplicates = []
+            for fp_id, digest, tls_json, http2_json, blob in rows:
+                last_id = fp_id
+                digest = digest or fingerprint_hash(*load_row(tls_json, http2_json, blob))
+                if digest in keep:
+                    duplicates.append((fp_id, keep[digest]))
+                else:
+                    keep[digest] = fp_id
+            merged += _merge(conn, cursor, duplicates, verbose)
+
+            if len(rows) < batch:
+                break
+
+        # Kept rows can take their hash now that duplicates are gone
+        for digest, fp_id in keep.items():
+            cursor.execute(
+                "UPDATE tls_fingerprints SET fingerprint_hash = %s WHERE id = %s AND fingerprint_hash IS NULL",
+                (digest, fp_id)
+            )
+        conn.commit()
+        return merged
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Canonical TLS fingerprint tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+    hash_parser = sub.add_parser('hash', help='Hash a browserleaks JSON file')
+    hash_parser.add_argument('file')
+    sub.add_parser('dedupe', help='Merge duplicate fingerprint rows')
+    args = parser.parse_args()
+
+    if args.command == 'hash':
+        with open(args.file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        # browserleaks JSON: 'tls' section + top-level ja3/akamai fields
+        tls_data = dict(data.get('tls', data), ja3_text=data.get('ja3_text', ''))
+        http2_data = {'akamai_text': data['akamai_text']} if data.get('akamai_text') else data.get('http2')
+        print(json.dumps(canonical_fingerprint(tls_data, http2_data), ensure_ascii=False))
+        print(fingerprint_hash(tls_data, http2_data))
+        return 0
+
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from modules.db_manager import DbManager
+
+    print("[Fingerprint] Merging duplicate fingerprints...")
+    merged = dedupe(DbManager())
+    print(f"[Fingerprint] {merged} duplicate row(s) merged")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,578 @@
+"""
+Fingerprint Codec - Compact binary encoding for tls_data / http2_data
+- Every {id, name} item list (cipher suites, extensions, named groups,
+  signature algorithms, ...) becomes an integer array; names come from
+  built-in tables, anything that differs is kept in an overrides map,
+  so decode(encode(x)) == x for any input
+- Name lists (PC 'supported_groups' / 'signature_algorithms') become IDs
+  when every name maps back exactly
+- Envelope: msgpack if installed (else compact JSON), zstd if installed
+  (else zlib)
+- FingerprintView gives read-only access to the IDs/names of an encoded
+  fingerprint; TlsConfig and compare_tls_data take the blob as-is. This
+  is for storage size, decoding is not faster than json.loads
+
+Usage:
+  python -m modules.fingerprint_codec size tls.json     # Encoded size vs JSON
+  python -m modules.fingerprint_codec check tls.json    # TlsConfig output: dict vs encoded (PC + mobile shape)
+  python -m modules.fingerprint_codec backfill          # Encode stored rows (config DATABASE)
+"""
+
+import sys
+import json
+import zlib
+
+# Envelope: MAGIC + format version + flags
+MAGIC = b'FP'
+FORMAT_VERSION = 1
+FLAG_MSGPACK = 0x01
+FLAG_ZSTD = 0x02
+FLAG_ZLIB = 0x04
+
+# Compact-form markers (keys that never occur in browserleaks data)
+ITEMS_KEY = '\x00L'
+NAMES_KEY = '\x00N'
+
+CIPHER_NAMES = {
+    4865: 'TLS_AES_128_GCM_SHA256',
+    4866: 'TLS_AES_256_GCM_SHA384',
+    4867: 'TLS_CHACHA20_POLY1305_SHA256',
+    49195: 'TLS_ECDHE_ECDSA_WITH_AES_128_GCM_SHA256',
+    49199: 'TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256',
+    49196: 'TLS_ECDHE_ECDSA_WITH_AES_256_GCM_SHA384',
+    49200: 'TLS_ECDHE_RSA_WITH_AES_256_GCM_SHA384',
+    52393: 'TLS_ECDHE_ECDSA_WITH_CHACHA20_POLY1305_SHA256',
+    52392: 'TLS_ECDHE_RSA_WITH_CHACHA20_POLY1305_SHA256',
+    49161: 'TLS_ECDHE_ECDSA_WITH_AES_128_CBC_SHA',
+    49162: 'TLS_ECDHE_ECDSA_WITH_AES_256_CBC_SHA',
+    49171: 'TLS_ECDHE_RSA_WITH_AES_128_CBC_SHA',
+    49172: 'TLS_ECDHE_RSA_WITH_AES_256_CBC_SHA',
+    156: 'TLS_RSA_WITH_AES_128_GCM_SHA256',
+    157: 'TLS_RSA_WITH_AES_256_GCM_SHA384',
+    47: 'TLS_RSA_WITH_AES_128_CBC_SHA',
+    53: 'TLS_RSA_WITH_AES_256_CBC_SHA',
+    10: 'TLS_RSA_WITH_3DES_EDE_CBC_SHA',
+}
+
+EXTENSION_NAMES = {
+    0: 'server_name',
+    5: 'status_request',
+    10: 'supported_groups',
+    11: 'ec_point_formats',
+    13: 'signature_algorithms',
+    16: 'application_layer_protocol_negotiation',
+    18: 'signed_certificate_timestamp',
+    21: 'padding',
+    22: 'encrypt_then_mac',
+    23: 'extended_main_secret',
+    27: 'compress_certificate',
+    28: 'record_size_limit',
+    35: 'session_ticket',
+    41: 'pre_shared_key',
+    43: 'supported_versions',
+    45: 'psk_key_exchange_modes',
+    51: 'key_share',
+    17513: 'application_settings_old',
+    17613: 'application_settings',
+    65037: 'encrypted_client_hello',
+    65281: 'renegotiation_info',
+}
+
+GROUP_NAMES = {
+    23: 'secp256r1',
+    24: 'secp384r1',
+    25: 'secp521r1',
+    29: 'x25519',
+    30: 'x448',
+    256: 'ffdhe2048',
+    257: 'ffdhe3072',
+    4588: 'X25519MLKEM768',
+    25497: 'X25519Kyber768Draft00 (OBSOLETE)',
+}
+
+SIGALG_NAMES = {
+    # compress_certificate algorithms share the 'algorithms' key (no ID overlap)
+    1: 'zlib',
+    2: 'brotli',
+    3: 'zstd',
+    513: 'rsa_pkcs1_sha1',
+    515: 'ecdsa_sha1',
+    1025: 'rsa_pkcs1_sha256',
+    1027: 'ecdsa_secp256r1_sha256',
+    1281: 'rsa_pkcs1_sha384',
+    1283: 'ecdsa_secp384r1_sha384',
+    1537: 'rsa_pkcs1_sha512',
+    1539: 'ecdsa_secp521r1_sha512',
+    2052: 'rsa_pss_rsae_sha256',
+    2053: 'rsa_pss_rsae_sha384',
+    2054: 'rsa_pss_rsae_sha512',
+    2055: 'ed25519',
+}
+
+VERSION_NAMES = {
+    769: 'TLS 1.0',
+    770: 'TLS 1.1',
+    771: 'TLS 1.2',
+    772: 'TLS 1.3',
+}
+
+# Parent key of an item list -> name table
+NAME_TABLES = {
+    'cipher_suites': CIPHER_NAMES,
+    'extensions': EXTENSION_NAMES,
+    'named_groups': GROUP_NAMES,
+    'algorithms': SIGALG_NAMES,
+    'supported_versions': VERSION_NAMES,
+    'ec_point_format_list': {0: 'uncompressed', 1: 'ansiX962_compressed_prime', 2: 'ansiX962_compressed_char2'},
+    'ke_modes': {0: 'psk_ke', 1: 'psk_dhe_ke'},
+}
+
+# Top-level name lists (PC tls_data) -> name table
+NAME_LIST_TABLES = {
+    'supported_groups': GROUP_NAMES,
+    'signature_algorithms': SIGALG_NAMES,
+}
+
+
+def _is_grease(value):
+    return isinstance(value, int) and (value & 0x0F0F) == 0x0A0A and (value >> 8) == (value & 0xFF)
+
+
+def _default_name(table, item_id):
+    if _is_grease(item_id):
+        return 'GREASE'
+    return table.get(item_id)
+
+
+def _is_item_list(value):
+    return bool(value) and isinstance(value, list) and all(
+        isinstance(item, dict) and isinstance(item.get('id'), int) and isinstance(item.get('name'), str)
+        for item in value
+    )
+
+
+def _pack(value, key=None):
+    """Compact form of a JSON value (key = parent key, selects the name table)"""
+    if isinstance(value, dict):
+        return {k: _pack(v, k) for k, v in value.items()}
+
+    if isinstance(value, list):
+        table = NAME_TABLES.get(key, {})
+        if _is_item_list(value):
+            ids = []
+            names = {}
+            extras = {}
+            for index, item in enumerate(value):
+                ids.append(item['id'])
+                if item['name'] != _default_name(table, item['id']):
+                    names[str(index)] = item['name']
+                extra = {k: _pack(v, k) for k, v in item.items() if k not in ('id', 'name')}
+                if extra:
+                    extras[str(index)] = extra
+            return {ITEMS_KEY: [ids, names, extras]}
+
+        list_table = NAME_LIST_TABLES.get(key)
+        if list_table and value and all(isinstance(v, str) for v in value):
+            reverse = {name: item_id for item_id, name in list_table.items()}
+            if all(name in reverse for name in value):
+                return {NAMES_KEY: [reverse[name] for name in value]}
+
+        return [_pack(v) for v in value]
+
+    return value
+
+
+def _unpack(value, key=None):
+    """Inverse of _pack"""
+    if isinstance(value, dict):
+        if len(value) == 1 and ITEMS_KEY in value:
+            ids, names, extras = value[ITEMS_KEY]
+            table = NAME_TABLES.get(key, {})
+            items = []
+            for index, item_id in enumerate(ids):
+                item = {'id': item_id, 'name': names.get(str(index), _default_name(table, item_id))}
+                for k, v in (extras.get(str(index)) or {}).items():
+                    item[k] = _unpack(v, k)
+                items.append(item)
+            return items
+
+        if len(value) == 1 and NAMES_KEY in value:
+            table = NAME_LIST_TABLES.get(key, {})
+            return [table[item_id] for item_id in value[NAMES_KEY]]
+
+        return {k: _unpack(v, k) for k, v in value.items()}
+
+    if isinstance(value, list):
+        return [_unpack(v) for v in value]
+
+    return value
+
+
+def _zstd():
+    """zstd module (zstandard package or Python 3.14 compression.zstd), or None"""
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        pass
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        return None
+
+
+def _serialize(obj):
+    try:
+        import msgpack
+        return msgpack.packb(obj, use_bin_type=True), FLAG_MSGPACK
+    except ImportError:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8'), 0
+
+
+def _deserialize(payload, flags):
+    if flags & FLAG_MSGPACK:
+        import msgpack
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    return json.loads(payload)
+
+
+def encode_fingerprint(tls_data, http2_data=None, compress=True):
+    """
+    Encode TLS/HTTP2 data to the compact binary envelope
+
+    Args:
+        tls_data: TLS data dict
+        http2_data: HTTP/2 data (dict or frame list)
+        compress: Compress payload (zstd if available, else zlib)
+
+    Returns:
+        bytes: Encoded fingerprint
+    """
+    payload, flags = _serialize({'t': _pack(tls_data), 'h': _pack(http2_data)})
+
+    if compress:
+        zstd = _zstd()
+        if zstd is not None:
+            payload = zstd.compress(payload) if not hasattr(zstd, 'ZstdCompressor') \
+                else zstd.ZstdCompressor(level=10).compress(payload)
+            flags |= FLAG_ZSTD
+        else:
+            payload = zlib.compress(payload, 9)
+            flags |= FLAG_ZLIB
+
+    return MAGIC + bytes([FORMAT_VERSION, flags]) + payload
+
+
+def _read_envelope(blob):
+    """Decompress/deserialize envelope into the compact dict"""
+    blob = bytes(blob)
+    if blob[:2] != MAGIC or len(blob) < 4:
+        raise ValueError("Not an encoded fingerprint (bad magic)")
+    if blob[2] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported fingerprint format version: {blob[2]}")
+
+    flags = blob[3]
+    payload = blob[4:]
+
+    if flags & FLAG_ZSTD:
+        zstd = _zstd()
+        if zstd is None:
+            raise ValueError("Fingerprint is zstd-compressed but no zstd module is installed (pip install zstandard)")
+        payload = zstd.decompress(payload) if not hasattr(zstd, 'ZstdDecompressor') \
+            else zstd.ZstdDecompressor().decompress(payload)
+    elif flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+
+    return _deserialize(payload, flags)
+
+
+def decode_fingerprint(blob):
+    """
+    Decode the binary envelope back to the original structures
+
+    Returns:
+        tuple: (tls_data, http2_data)
+    """
+    compact = _read_envelope(blob)
+    return _unpack(compact['t']), _unpack(compact['h'])
+
+
+def is_encoded(value):
+    """True for an encoded fingerprint (bytes with the codec magic)"""
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:2]) == MAGIC
+
+
+def load_row(tls_json, http2_json, blob=None):
+    """
+    TLS/HTTP2 data of a tls_fingerprints row (blob preferred over JSON)
+
+    Returns:
+        tuple: (tls_data, http2_data)
+    """
+    if blob:
+        return decode_fingerprint(blob)
+    return json.loads(tls_json), json.loads(http2_json or 'null')
+
+
+# tls_data keys read by TlsConfig and compare_tls_data
+LIGHT_KEYS = ('tls_version', 'ja3_text', 'cipher_suites', 'extensions',
+              'supported_groups', 'signature_algorithms')
+
+
+class FingerprintView:
+    """Read-only access to an encoded fingerprint's IDs and names"""
+
+    def __init__(self, blob):
+        """
+        Args:
+            blob: Encoded fingerprint bytes
+        """
+        self._tls = _read_envelope(blob)['t'] or {}
+
+    def _items(self, packed, key):
+        """(ids, names) of a packed item list"""
+        if not isinstance(packed, dict) or ITEMS_KEY not in packed:
+            return [], []
+        ids, names, _ = packed[ITEMS_KEY]
+        table = NAME_TABLES.get(key, {})
+        return ids, [names.get(str(i), _default_name(table, item_id)) for i, item_id in enumerate(ids)]
+
+    def _extension_items(self, ext_name, key):
+        packed = self._tls.get('extensions')
+        if not isinstance(packed, dict) or ITEMS_KEY not in packed:
+            return [], []
+        ext_ids, ext_names, extras = packed[ITEMS_KEY]
+        for index, ext_id in enumerate(ext_ids):
+            name = ext_names.get(str(index), _default_name(EXTENSION_NAMES, ext_id))
+            if name == ext_name:
+                data = (extras.get(str(index)) or {}).get('data') or {}
+                return self._items(data.get(key), key)
+        return [], []
+
+    def _name_list(self, key, ext_name, item_key):
+        value = self._tls.get(key)
+        if isinstance(value, dict) and NAMES_KEY in value:
+            return [NAME_LIST_TABLES[key][i] for i in value[NAMES_KEY]]
+        if isinstance(value, list) and value:
+            return value
+        return self._extension_items(ext_name, item_key)[1]
+
+    @property
+    def tls_version(self):
+        version = self._tls.get('tls_version')
+        if version:
+            return version
+        connection = self._tls.get('connection_version') or {}
+        return connection.get('name', '')
+
+    @property
+    def ja3_text(self):
+        return self._tls.get('ja3_text', '')
+
+    @property
+    def cipher_suites(self):
+        """list: (id, name) pairs in order"""
+        return list(zip(*self._items(self._tls.get('cipher_suites'), 'cipher_suites')))
+
+    @property
+    def extensions(self):
+        """list: (id, name) pairs in order"""
+        return list(zip(*self._items(self._tls.get('extensions'), 'extensions')))
+
+    @property
+    def supported_groups(self):
+        """list: group names (top-level list, else from the extension)"""
+        return self._name_list('supported_groups', 'supported_groups', 'named_groups')
+
+    @property
+    def signature_algorithms(self):
+        """list: signature algorithm names"""
+        return self._name_list('signature_algorithms', 'signature_algorithms', 'algorithms')
+
+    def light(self):
+        """
+        The tls_data fields TlsConfig and compare_tls_data read
+
+        Only keys stored in the fingerprint are returned, unpacked exactly
+        as decode_fingerprint() would, so both forms give the same output.
+
+        Returns:
+            dict: Subset of LIGHT_KEYS
+        """
+        return {key: _unpack(self._tls[key], key) for key in LIGHT_KEYS if key in self._tls}
+
+
+def as_tls_data(tls_data):
+    """Accept tls_data dict or encoded bytes (returns a dict either way)"""
+    if is_encoded(tls_data):
+        return FingerprintView(tls_data).light()
+    return tls_data
+
+
+def backfill(db, drop_json=False, verbose=True):
+    """
+    Encode fingerprint rows that have no blob yet
+
+    Args:
+        db: DbManager
+        drop_json: Replace tls_data/http2_data JSON with '{}' after encoding
+
+    Returns:
+        int: Rows encoded
+    """
+    conn = db._get_connection()
+    cursor = conn.cursor()
+    count = 0
+
+    try:
+        cursor.execute("SELECT id, tls_data, http2_data FROM tls_fingerprints WHERE fingerprint_blob IS NULL")
+        for fp_id, tls_json, http2_json in cursor.fetchall():
+            tls_data, http2_data = json.loads(tls_json), json.loads(http2_json or 'null')
+            blob = encode_fingerprint(tls_data, http2_data)
+
+            if drop_json:
+                cursor.execute(
+                    "UPDATE tls_fingerprints SET fingerprint_blob = %s, tls_data = '{}', http2_data = '{}' WHERE id = %s",
+                    (blob, fp_id)
+                )
+            else:
+                cursor.execute("UPDATE tls_fingerprints SET fingerprint_blob = %s WHERE id = %s", (blob, fp_id))
+            count += 1
+
+            if count % 500 == 0:
+                conn.commit()
+                if verbose:
+                    print(f"  {count} rows encoded...")
+
+        conn.commit()
+        return count
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _pc_tls_data(browserleaks_data):
+    """PC tls_data shape (as collectors/tls_extractor.py stores it) from a browserleaks JSON"""
+    tls_section = browserleaks_data.get('tls', {})
+    extensions = tls_section.get('extensions', [])
+
+    def names(ext_name, list_key):
+        for ext in extensions:
+            if ext.get('name') == ext_name:
+                return [item.get('name', '') for item in ext.get('data', {}).get(list_key, [])]
+        return []
+
+    return {
+        'tls_version': tls_section.get('connection_version', {}).get('name', 'TLS 1.3'),
+        'cipher_suites': tls_section.get('cipher_suites', []),
+        'extensions': extensions,
+        'supported_groups': names('supported_groups', 'named_groups'),
+        'signature_algorithms': names('signature_algorithms', 'algorithms'),
+        'ja3_hash': browserleaks_data.get('ja3_hash', ''),
+        'ja3_text': browserleaks_data.get('ja3_text', ''),
+    }
+
+
+def check(browserleaks_data):
+    """
+    Compare TlsConfig output for dict vs encoded tls_data
+
+    Shapes: PC (with and without ja3_text) and mobile (raw browserleaks 'tls' section)
+
+    Returns:
+        list: (shape, builder) pairs that differ
+    """
+    from .tls_config import TlsConfig
+
+    pc = _pc_tls_data(browserleaks_data)
+    shapes = {
+        'pc': pc,
+        'pc (no ja3_text)': {k: v for k, v in pc.items() if k != 'ja3_text'},
+        'mobile': browserleaks_data.get('tls', browserleaks_data),
+    }
+
+    try:
+        import curl_cffi  # noqa: F401  (build_extra_fp needs curl_cffi.const)
+        builders = {'build_ja3_string': TlsConfig.build_ja3_string, 'build_extra_fp': TlsConfig.build_extra_fp}
+    except ImportError:
+        print("  [Note] curl_cffi not installed, build_extra_fp skipped")
+        builders = {'build_ja3_string': TlsConfig.build_ja3_string}
+
+    mismatches = []
+    for shape, tls_data in shapes.items():
+        blob = encode_fingerprint(tls_data)
+        for name, build in builders.items():
+            same = build(tls_data) == build(blob)
+            print(f"  {'✓' if same else '✗'} {shape:<18} {name}")
+            if not same:
+                mismatches.append((shape, name))
+    return mismatches
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Compact fingerprint encoding')
+    sub = parser.add_subparsers(dest='command', required=True)
+    size_parser = sub.add_parser('size', help='Compare encoded size/decode time with JSON')
+    size_parser.add_argument('file')
+    check_parser = sub.add_parser('check', help='TlsConfig output for dict vs encoded input')
+    check_parser.add_argument('file', help='browserleaks JSON (e.g. tls.json)')
+    backfill_parser = sub.add_parser('backfill', help='Encode stored rows without a blob')
+    backfill_parser.add_argument('--drop-json', action='store_true', help="Replace JSON columns with '{}'")
+    args = parser.parse_args()
+
+    if args.command == 'size':
+        with open(args.file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        tls_data, http2_data = data.get('tls', data), data.get('http2')
+
+        tls_json = json.dumps(tls_data, ensure_ascii=False).encode('utf-8')
+        as_json = tls_json + json.dumps(http2_data, ensure_ascii=False).encode('utf-8')
+        blob = encode_fingerprint(tls_data, http2_data)
+        if decode_fingerprint(blob) != (tls_data, http2_data):
+            print("❌ Round-trip mismatch")
+            return 1
+
+        runs = 2000
+        start = time.perf_counter()
+        for _ in range(runs):
+            json.loads(tls_json)
+        json_us = (time.perf_counter() - start) / runs * 1e6
+        start = time.perf_counter()
+        for _ in range(runs):
+            FingerprintView(blob).light()
+        view_us = (time.perf_counter() - start) / runs * 1e6
+
+        flags = blob[3]
+        print(f"JSON:    {len(as_json):,} bytes (tls_data decode {json_us:.1f} us)")
+        print(f"Encoded: {len(blob):,} bytes ({len(blob) / len(as_json):.1%}) "
+              f"[{'msgpack' if flags & FLAG_MSGPACK else 'json'}"
+              f"{'+zstd' if flags & FLAG_ZSTD else '+zlib' if flags & FLAG_ZLIB else ''}] "
+              f"(view.light() {view_us:.1f} us)")
+        print("Round-trip: OK")
+        return 0
+
+    if args.command == 'check':
+        with open(args.file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        print(f"[FingerprintCodec] TlsConfig dict vs encoded ({args.file})")
+        mismatches = check(data)
+        print("❌ Output differs" if mismatches else "Dict and encoded input: identical")
+        return 1 if mismatches else 0
+
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from modules.db_manager import DbManager
+
+    print("[FingerprintCodec] Encoding stored fingerprints...")
+    count = backfill(DbManager(), drop_json=args.drop_json)
+    print(f"[FingerprintCodec] {count} row(s) encoded")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
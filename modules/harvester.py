@@ -0,0 +1,410 @@
+"""
+Harvester - Keep a buffer of fresh identities per platform
+- Fresh identity: valid cookie snapshot that stays valid longer than
+  HARVESTER['min_ttl'] (cookie expiry index, modules/cookie_expiry.py)
+- Below HARVESTER['targets'] collections are launched in background
+  threads, at most HARVESTER['max_browsers'] per platform at a time
+- Block rate: identities invalidated by crawlers / crawls in the window;
+  at block_threshold the target grows by block_boost
+- PC: wiped rotating profiles user/harvest-1..N per Chrome version
+  (Linux: cloned profile farm directories, utils/profile_farm.py);
+  mobile: most recent distinct devices of the selection history over one
+  kept BrowserStack Local tunnel
+
+Usage:
+  python -m modules.harvester status           # Buffer, block rate and launches per platform
+  python -m modules.harvester run              # Daemon
+  python -m modules.harvester run --once       # One pass, waits for its collections
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import HARVESTER
+
+PLATFORMS = ('pc', 'mobile')
+
+# idx_cookies_platform_invalidated
+BLOCKED_QUERY = """
+    SELECT COUNT(*)
+    FROM cookies
+    WHERE platform = %s AND invalidated_at >= %s
+"""
+
+# idx_cookie_deltas_platform_collected: every crawl stores one delta
+CRAWLS_QUERY = """
+    SELECT COUNT(*)
+    FROM cookie_deltas
+    WHERE platform = %s AND collected_at >= %s
+"""
+
+
+def block_rate(db, platform, window=None):
+    """
+    Share of recent crawls whose identity got blocked
+
+    Args:
+        db: DbManager
+        platform: 'pc' / 'mobile'
+        window: Seconds to look back (default: HARVESTER['block_window'])
+
+    Returns:
+        tuple: (rate, blocked, crawls) - (0.0, 0, 0) before migration 008
+    """
+    window = HARVESTER['block_window'] if window is None else window
+    if not db.ensure_schema():
+        return 0.0, 0, 0
+
+    since = datetime.now() - timedelta(seconds=window)
+    conn = db._get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(BLOCKED_QUERY, (platform, since))
+        blocked = cursor.fetchone()[0]
+        cursor.execute(CRAWLS_QUERY, (platform, since))
+        # Crawls saved as full snapshots (compaction) have no delta row
+        crawls = max(cursor.fetchone()[0], blocked)
+        return (blocked / crawls if crawls else 0.0), blocked, crawls
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+class Harvester:
+    """Launch background collections while a platform's identity buffer is low"""
+
+    def __init__(self, db, settings=None, dry_run=False):
+        """
+        Args:
+            db: DbManager
+            settings: HARVESTER overrides
+            dry_run: Only print planned launches
+        """
+        self.db = db
+        self.settings = {**HARVESTER, **(settings or {})}
+        self.dry_run = dry_run
+
+        self._executors = {}
+        self._running = {platform: {} for platform in PLATFORMS}   # future -> device name
+        self._failed = {}                                          # device name -> failure time
+        self._launched = {}                                        # device name -> launch time
+        self._pc_candidates = None
+        self._mobile_candidates = None
+        self._tunnel = None
+
+    # -- candidates --------------------------------------------------------
+
+    def pc_candidates(self):
+        """
+        PC collection slots: (Chrome version, rotating user folder)
+
+        Returns:
+            list: [{'device_name', 'chrome_info', 'user_folder'}]
+        """
+        if self._pc_candidates is None:
+            from utils.chrome_detector import ChromeDetector
+            from collectors.harvest import pc_device_name
+
+            detector = ChromeDetector()
+            self._pc_candidates = []
+            for version_query in self.settings['pc_versions']:
+                chrome_info = detector.get_version(version_query)
+                if not chrome_info or not chrome_info['available']:
+                    print(f"[Harvester] Chrome '{version_query}' not available, skipped")
+                    continue
+                for n in range(1, self.settings['pc_profiles'] + 1):
+                    user_folder = f"harvest-{n}"
+                    self._pc_candidates.append({
+                        'device_name': pc_device_name(chrome_info, user_folder),
+                        'chrome_info': chrome_info,
+                        'user_folder': user_folder,
+                    })
+
+        return self._pc_candidates
+
+    def mobile_candidates(self):
+        """
+        Mobile devices: most recent distinct devices of the selection history
+
+        Returns:
+            list: [{'device_name', 'device_config'}]
+        """
+        if self._mobile_candidates is None:
+            from utils.device_selector import DeviceSelector
+            from collectors.harvest import (BROWSERSTACK_USERNAME, BROWSERSTACK_ACCESS_KEY,
+                                            device_config_from_history, get_device_name)
+
+            selector = DeviceSelector(BROWSERSTACK_USERNAME, BROWSERSTACK_ACCESS_KEY)
+            self._mobile_candidates = []
+            seen = set()
+            for selection in reversed(selector.get_history()):
+                device_config = device_config_from_history(selection)
+                device_name = get_device_name(device_config)
+                if device_name in seen:
+                    continue
+                seen.add(device_name)
+                self._mobile_candidates.append({'device_name': device_name, 'device_config': device_config})
+                if len(self._mobile_candidates) >= self.settings['mobile_devices']:
+                    break
+
+            if not self._mobile_candidates:
+                print("[Harvester] No mobile devices in selection history (run main-mobile.py first)")
+
+        return self._mobile_candidates
+
+    def candidates(self, platform):
+        return self.pc_candidates() if platform == 'pc' else self.mobile_candidates()
+
+    # -- planning ----------------------------------------------------------
+
+    def max_browsers(self, platform):
+        limit = self.settings['max_browsers'].get(platform, 1)
+        if platform == 'mobile':
+            from collectors.harvest import BROWSERSTACK_PARALLEL_SESSIONS
+            limit = min(limit, BROWSERSTACK_PARALLEL_SESSIONS)
+        return limit
+
+    def fresh(self, index, platform, now=None):
+        """
+        Identities of a platform valid at least min_ttl seconds
+
+        Returns:
+            list: ExpiryIndex entries
+        """
+        limit = (now or datetime.now()) + timedelta(seconds=self.settings['min_ttl'])
+        return [e for e in index.entries() if e['platform'] == platform and e['expires_at'] > limit]
+
+    def pick(self, platform, fresh, count, now=None):
+        """
+        Candidates to collect next: fewest fresh identities, then least recently launched
+
+        Running devices and devices within retry_after of a failure are skipped.
+
+        Returns:
+            list: Candidate dicts (at most count)
+        """
+        now = now or datetime.now()
+        retry_after = timedelta(seconds=self.settings['retry_after'])
+        running = set(self._running[platform].values())
+
+        per_device = {}
+        for entry in fresh:
+            per_device[entry['device_name']] = per_device.get(entry['device_name'], 0) + 1
+
+        available = [
+            c for c in self.candidates(platform)
+            if c['device_name'] not in running
+            and not (c['device_name'] in self._failed and now - self._failed[c['device_name']] < retry_after)
+        ]
+        available.sort(key=lambda c: (per_device.get(c['device_name'], 0),
+                                      self._launched.get(c['device_name'], datetime.min)))
+        return available[:count]
+
+    def plan(self, index, now=None):
+        """
+        Buffer state and launches per platform
+
+        Returns:
+            dict: {platform: {'fresh', 'target', 'block_rate', 'blocked', 'crawls',
+                              'running', 'launch': [candidate, ...]}}
+        """
+        now = now or datetime.now()
+        plans = {}
+
+        for platform in PLATFORMS:
+            base_target = self.settings['targets'].get(platform, 0)
+            if base_target <= 0:
+                continue
+
+            fresh = self.fresh(index, platform, now)
+            rate, blocked, crawls = block_rate(self.db, platform, self.settings['block_window'])
+            target = base_target
+            if crawls and rate >= self.settings['block_threshold']:
+                target += self.settings['block_boost']
+
+            running = len(self._running[platform])
+            count = min(target - len(fresh) - running, self.max_browsers(platform) - running)
+
+            plans[platform] = {
+                'fresh': len(fresh),
+                'target': target,
+                'block_rate': rate,
+                'blocked': blocked,
+                'crawls': crawls,
+                'running': running,
+                'launch': self.pick(platform, fresh, count, now) if count > 0 else [],
+            }
+
+        return plans
+
+    # -- collections -------------------------------------------------------
+
+    def _ensure_tunnel(self):
+        """Start (or reuse) a kept BrowserStack Local tunnel for mobile collections"""
+        if self._tunnel:
+            return True
+
+        from collectors.browserstack_local import BrowserStackLocalManager
+        from collectors.harvest import BROWSERSTACK_ACCESS_KEY
+
+        manager = BrowserStackLocalManager(BROWSERSTACK_ACCESS_KEY, keep_alive=True)
+        if not manager.start():
+            print("[Harvester] ❌ BrowserStack Local tunnel failed, mobile collections skipped")
+            return False
+        self._tunnel = manager
+        return True
+
+    def launch(self, platform, candidate):
+        """Submit one background collection"""
+        from collectors.harvest import harvest_pc, harvest_mobile
+
+        executor = self._executors.get(platform)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=self.max_browsers(platform),
+                                          thread_name_prefix=f'harvest-{platform}')
+            self._executors[platform] = executor
+
+        if platform == 'pc':
+            future = executor.submit(harvest_pc, candidate['chrome_info'], candidate['user_folder'],
+                                     headless=self.settings['pc_headless'], fresh_profile=True)
+        else:
+            future = executor.submit(harvest_mobile, candidate['device_config'])
+
+        self._running[platform][future] = candidate['device_name']
+        self._launched[candidate['device_name']] = datetime.now()
+        print(f"[Harvester] Launched {platform} collection: {candidate['device_name']}")
+
+    def reap(self):
+        """
+        Collect finished background collections
+
+        Returns:
+            int: Identities stored
+        """
+        stored = 0
+        for platform, running in self._running.items():
+            for future in [f for f in running if f.done()]:
+                device_name = running.pop(future)
+                try:
+                    saved = future.result()
+                except Exception as e:
+                    print(f"[Harvester] ❌ {platform} '{device_name}': {e}")
+                    saved = None
+
+                if saved:
+                    stored += 1
+                    self._failed.pop(device_name, None)
+                    print(f"[Harvester] ✅ {platform} '{device_name}' stored")
+                else:
+                    self._failed[device_name] = datetime.now()
+                    print(f"[Harvester] ❌ {platform} '{device_name}' failed "
+                          f"(retry after {self.settings['retry_after']}s)")
+        return stored
+
+    def running(self):
+        return sum(len(running) for running in self._running.values())
+
+    # -- loop --------------------------------------------------------------
+
+    def run_once(self):
+        """
+        One pass: reap finished collections, plan, launch
+
+        Returns:
+            dict: plan() result
+        """
+        from .cookie_expiry import ExpiryIndex
+        from utils.profile_farm import ProfileFarm, farm_enabled
+
+        self.reap()
+        if farm_enabled() and not self.dry_run:
+            # Profiles of killed harvesters and of timed-out collections
+            removed = ProfileFarm().gc()
+            if removed:
+                print(f"[Harvester] {removed} stale farm profile(s) removed")
+
+        index = ExpiryIndex.load(self.db)
+        plans = self.plan(index)
+
+        for platform, plan in plans.items():
+            high = ' ⚠️ high block rate' if plan['target'] > self.settings['targets'][platform] else ''
+            print(f"[Harvester] {platform}: {plan['fresh']}/{plan['target']} fresh, "
+                  f"{plan['running']} running, block rate {plan['block_rate']:.0%} "
+                  f"({plan['blocked']}/{plan['crawls']}){high}")
+
+            if self.dry_run:
+                for candidate in plan['launch']:
+                    print(f"[Harvester]   would launch: {candidate['device_name']}")
+                continue
+
+            if plan['launch'] and platform == 'mobile' and not self._ensure_tunnel():
+                continue
+            for candidate in plan['launch']:
+                self.launch(platform, candidate)
+
+        return plans
+
+    def run(self, once=False):
+        """Daemon loop (once: single pass, then wait for its collections)"""
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[Harvester] ⚠️ Pass failed: {e}")
+
+            if once:
+                futures = [f for running in self._running.values() for f in running]
+                wait(futures)
+                self.reap()
+                return
+
+            time.sleep(self.settings['poll_interval'])
+
+    def close(self):
+        """Stop launching; running collections finish in their threads"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        if self.running():
+            print(f"[Harvester] {self.running()} collection(s) still finishing")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Keep a buffer of fresh identities')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status', help='Buffer, block rate and planned launches')
+    run_parser = sub.add_parser('run', help='Harvest in the background while buffers are low')
+    run_parser.add_argument('--once', action='store_true', help='Single pass (waits for its collections)')
+    run_parser.add_argument('--dry-run', action='store_true', help='Only print planned launches')
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    from modules.db_manager import DbManager
+
+    db = DbManager()
+
+    if args.command == 'status':
+        Harvester(db, dry_run=True).run_once()
+        return 0
+
+    harvester = Harvester(db, dry_run=args.dry_run)
+    try:
+        harvester.run(once=args.once)
+    except KeyboardInterrupt:
+        print("\n[Harvester] Stopped")
+    finally:
+        harvester.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""
+Identity Policy - Which identity a crawl uses, shared by every worker
+- Candidates: identities valid at least COOKIE_EXPIRY['min_ttl'] from the
+  cookie expiry index (narrowed by analytics, modules/cookie_expiry.py)
+- Policies order the candidates:
+    freshest     longest-lived first (default, no coordinator needed)
+    round_robin  next identity after the one handed out last
+    lru          least recently handed out first
+    weighted     random, weighted by the fingerprint's smoothed success
+                 ratio (page_outcomes, modules/analytics.py)
+    sticky       a keyword keeps its identity (sticky_ttl), else lru
+- IdentityCoordinator: local SQLite file with leases and usage; the first
+  candidate below max_concurrent active leases is leased atomically, so
+  workers in any process on this machine share caps and rotation state
+
+Usage:
+  python -m modules.identity_policy status       # Active leases and usage
+  python -m modules.identity_policy reset        # Drop leases, usage and sticky bindings
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import IDENTITY_POLICY
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS leases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cookie_id INTEGER NOT NULL,
+        platform TEXT NOT NULL,
+        holder TEXT NOT NULL,
+        keyword TEXT,
+        acquired_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_leases_cookie ON leases (cookie_id);
+    CREATE TABLE IF NOT EXISTS usage (
+        cookie_id INTEGER PRIMARY KEY,
+        platform TEXT NOT NULL,
+        uses INTEGER NOT NULL DEFAULT 0,
+        last_used REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS rotation (
+        platform TEXT PRIMARY KEY,
+        last_cookie_id INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS sticky (
+        platform TEXT NOT NULL,
+        keyword TEXT NOT NULL,
+        cookie_id INTEGER NOT NULL,
+        bound_at REAL NOT NULL,
+        PRIMARY KEY (platform, keyword)
+    );
+"""
+
+POLICIES = ('freshest', 'round_robin', 'lru', 'weighted', 'sticky')
+
+
+class IdentityCoordinator:
+    """SQLite leases + rotation state shared by local crawl workers"""
+
+    def __init__(self, db_path=None, settings=None):
+        """
+        Args:
+            db_path: Coordinator file (default: IDENTITY_POLICY['db_path'])
+            settings: IDENTITY_POLICY overrides
+        """
+        self.settings = {**IDENTITY_POLICY, **(settings or {})}
+        self.db_path = Path(db_path or self.settings['db_path'])
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self):
+        """Committed, closed connection per call (shared by worker threads and processes)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def order(self, conn, platform, candidates, policy, keyword=None, weights=None):
+        """
+        Candidates in the policy's preference order
+
+        Args:
+            candidates: Entries longest-lived first ('cookie_id', 'tls_fingerprint_id', ...)
+            weights: {tls_fingerprint_id: weight} for 'weighted'
+
+        Returns:
+            list: Entries
+        """
+        if policy == 'round_robin':
+            ordered = sorted(candidates, key=lambda e: e['cookie_id'])
+            row = conn.execute("SELECT last_cookie_id FROM rotation WHERE platform = ?", (platform,)).fetchone()
+            if row:
+                start = next((i for i, e in enumerate(ordered) if e['cookie_id'] > row[0]), 0)
+                ordered = ordered[start:] + ordered[:start]
+            return ordered
+
+        if policy == 'weighted':
+            # Weighted random order without replacement (key = u ** (1 / w))
+            weights = weights or {}
+            return sorted(candidates, reverse=True,
+                          key=lambda e: random.random() ** (1 / max(weights.get(e['tls_fingerprint_id'], 0.5), 1e-6)))
+
+        if policy in ('lru', 'sticky'):
+            last_used = dict(conn.execute(
+                "SELECT cookie_id, last_used FROM usage WHERE platform = ?", (platform,)
+            ).fetchall())
+            # Never used first, then oldest use; ties keep longest-lived first
+            ordered = sorted(candidates, key=lambda e: last_used.get(e['cookie_id'], 0))
+            if policy == 'sticky' and keyword:
+                row = conn.execute(
+                    "SELECT cookie_id FROM sticky WHERE platform = ? AND keyword = ? AND bound_at >= ?",
+                    (platform, keyword, time.time() - self.settings['sticky_ttl'])
+                ).fetchone()
+                if row:
+                    ordered.sort(key=lambda e: e['cookie_id'] != row[0])
+            return ordered
+
+        return list(candidates)
+
+    def acquire(self, platform, candidates, policy=None, keyword=None, weights=None, holder=None):
+        """
+        Lease the first candidate (policy order) below max_concurrent
+
+        Returns:
+            tuple: (entry, lease_id), or (None, None) when every candidate is at its cap
+        """
+        policy = policy or self.settings['policy']
+        cap = self.settings['max_concurrent']
+        holder = holder or f"{os.getpid()}-{threading.get_ident()}"
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            active = dict(conn.execute("SELECT cookie_id, COUNT(*) FROM leases GROUP BY cookie_id").fetchall())
+
+            for entry in self.order(conn, platform, candidates, policy, keyword, weights):
+                cookie_id = entry['cookie_id']
+                if cap and active.get(cookie_id, 0) >= cap:
+                    continue
+
+                lease_id = conn.execute("""
+                    INSERT INTO leases (cookie_id, platform, holder, keyword, acquired_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (cookie_id, platform, holder, keyword, now, now + self.settings['lease_timeout'])).lastrowid
+                conn.execute("""
+                    INSERT INTO usage (cookie_id, platform, uses, last_used) VALUES (?, ?, 1, ?)
+                    ON CONFLICT(cookie_id) DO UPDATE SET uses = uses + 1, last_used = excluded.last_used
+                """, (cookie_id, platform, now))
+                conn.execute("INSERT OR REPLACE INTO rotation (platform, last_cookie_id) VALUES (?, ?)",
+                             (platform, cookie_id))
+                if policy == 'sticky' and keyword:
+                    conn.execute("INSERT OR REPLACE INTO sticky (platform, keyword, cookie_id, bound_at) "
+                                 "VALUES (?, ?, ?, ?)", (platform, keyword, cookie_id, now))
+                return entry, lease_id
+
+        return None, None
+
+    def release(self, lease_id):
+        """End a lease (crawl finished)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    def active(self):
+        """
+        Unexpired leases
+
+        Returns:
+            list: [(lease_id, cookie_id, platform, holder, keyword, acquired_at)]
+        """
+        with self._connect() as conn:
+            return conn.execute("""
+                SELECT id, cookie_id, platform, holder, keyword, acquired_at
+                FROM leases WHERE expires_at >= ? ORDER BY acquired_at
+            """, (time.time(),)).fetchall()
+
+    def usage(self, limit=20):
+        """Most used identities: [(cookie_id, platform, uses, last_used)]"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT cookie_id, platform, uses, last_used FROM usage ORDER BY uses DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def reset(self):
+        with self._connect() as conn:
+            for table in ('leases', 'usage', 'rotation', 'sticky'):
+                conn.execute(f"DELETE FROM {table}")
+
+
+class IdentityUnavailable(RuntimeError):
+    """Every candidate identity stayed at max_concurrent leases for wait_timeout"""
+
+
+def fingerprint_weights(db, platform):
+    """
+    Smoothed success ratio per fingerprint: (success + 1) / (pages + 2)
+
+    Returns:
+        dict: {tls_fingerprint_id: weight} ({} before migration 009)
+    """
+    if not db.ensure_schema():
+        return {}
+    from .analytics import outcome_rates
+    return {r['key']: (r['success'] + 1) / (r['pages'] + 2)
+            for r in outcome_rates(db, 'tls_fingerprint_id', platform)}
+
+
+def select_identity(db, platform, keyword=None, settings=None):
+    """
+    Pick and lease an identity for one crawl
+
+    Args:
+        db: DbManager
+        platform: 'pc' / 'mobile'
+        keyword: Search keyword ('sticky' binds it to the identity)
+        settings: IDENTITY_POLICY overrides
+
+    Returns:
+        dict: DbManager.get_fingerprint_by_cookie() data (+ 'expires_at', 'lease_id'),
+              or None (caller falls back to the newest identity)
+
+    Raises:
+        IdentityUnavailable: max_concurrent is set and every candidate is
+                             still at its cap after wait_timeout
+    """
+    from .cookie_expiry import load_fresh_identity, fresh_candidates
+    from config import COOKIE_EXPIRY
+
+    settings = {**IDENTITY_POLICY, **(settings or {})}
+    policy = settings['policy']
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown identity policy: {policy} (choose from {', '.join(POLICIES)})")
+    if policy == 'freshest' and not settings['max_concurrent']:
+        return load_fresh_identity(db, platform) if COOKIE_EXPIRY['prefer_fresh'] else None
+    if not db.ensure_schema():
+        return None
+
+    try:
+        candidates = fresh_candidates(db, platform, COOKIE_EXPIRY['min_ttl'])
+    except Exception as e:
+        print(f"[IdentityPolicy] ⚠️ Expiry index unavailable, using newest: {e}")
+        return None
+    if not candidates:
+        print(f"[IdentityPolicy] No {platform} identity valid for {COOKIE_EXPIRY['min_ttl']}s, using newest")
+        return None
+
+    weights = fingerprint_weights(db, platform) if policy == 'weighted' else None
+    coordinator = IdentityCoordinator(settings=settings)
+    deadline = time.time() + settings['wait_timeout']
+    while True:
+        entry, lease_id = coordinator.acquire(platform, candidates, policy, keyword, weights)
+        if entry or time.time() >= deadline:
+            break
+        time.sleep(settings['poll_interval'])
+
+    if not entry:
+        # An unleased fallback identity would exceed the cap
+        raise IdentityUnavailable(
+            f"All {len(candidates)} {platform} identities at {settings['max_concurrent']} concurrent "
+            f"crawl(s) for {settings['wait_timeout']}s"
+        )
+
+    data = db.get_fingerprint_by_cookie(entry['cookie_id'])
+    if not data:
+        coordinator.release(lease_id)
+        return None
+
+    data['expires_at'] = entry['expires_at']
+    data['lease_id'] = lease_id
+    print(f"[IdentityPolicy] {policy}: {entry['device_name']} (cookies #{entry['cookie_id']}, "
+          f"lease #{lease_id}, valid until {entry['expires_at']:%Y-%m-%d %H:%M:%S})")
+    return data
+
+
+def release_identity(data):
+    """Release the lease select_identity() took (no-op without one)"""
+    if data and data.get('lease_id'):
+        IdentityCoordinator().release(data['lease_id'])
+
+
+def main():
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description='Identity selection coordinator')
+    parser.add_argument('command', choices=['status', 'reset'])
+    args = parser.parse_args()
+
+    coordinator = IdentityCoordinator()
+
+    if args.command == 'reset':
+        coordinator.reset()
+        print("[IdentityPolicy] Leases, usage and sticky bindings cleared")
+        return 0
+
+    settings = coordinator.settings
+    print("\n" + "=" * 60)
+    print(f"Policy: {settings['policy']}, max concurrent: {settings['max_concurrent'] or 'unlimited'}")
+    print("=" * 60)
+    leases = coordinator.active()
+    print(f"Active leases: {len(leases)}")
+    for lease_id, cookie_id, platform, holder, keyword, acquired_at in leases:
+        print(f"  #{lease_id:<6} cookies #{cookie_id:<7} {platform:<7} {holder:<16} "
+              f"{datetime.fromtimestamp(acquired_at):%H:%M:%S}  {keyword or ''}")
+    print("\nMost used identities:")
+    for cookie_id, platform, uses, last_used in coordinator.usage():
+        print(f"  cookies #{cookie_id:<7} {platform:<7} {uses:>5} use(s), last {datetime.fromtimestamp(last_used):%Y-%m-%d %H:%M:%S}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
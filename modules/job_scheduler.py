@@ -0,0 +1,461 @@
+"""
+Job Scheduler - Persistent keyword crawl queue with priorities and deadlines
+- Jobs (keyword, platform, priority, max pages, deadline) live in a local
+  SQLite file, so cron scripts only enqueue and any number of workers drain
+- Highest priority first, then earliest deadline, then oldest
+- Dedupe: a keyword already queued is merged (max priority, max pages,
+  earliest deadline); a running one covers requests for as many pages,
+  more pages are queued as a follow-up job; one completed within
+  dedupe_window with at least as many pages is skipped
+- Jobs past their deadline are expired instead of run; running jobs are
+  re-queued when their worker process is gone or sent no heartbeat for
+  lease_timeout (workers renew the lease every heartbeat_interval)
+
+Usage:
+  python -m modules.job_scheduler add 노트북 마우스 --priority 5 --max-pages 3 --deadline 60
+  python -m modules.job_scheduler add --file keywords.txt --platform mobile
+  python -m modules.job_scheduler run --workers 2          # Until stopped
+  python -m modules.job_scheduler run --drain              # Until the queue is empty
+  python -m modules.job_scheduler status
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import JOB_SCHEDULER
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        keyword TEXT NOT NULL,
+        dedupe_key TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        max_pages INTEGER NOT NULL,
+        deadline REAL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        worker TEXT,
+        worker_pid INTEGER,
+        heartbeat_at REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        pages_ok INTEGER,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_status_priority ON jobs (status, priority, deadline);
+    CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (dedupe_key, platform, status);
+"""
+
+# Dispatch order among queued jobs (deadline NULL = no deadline, last)
+NEXT_JOB_QUERY = """
+    SELECT id, keyword, platform, max_pages
+    FROM jobs
+    WHERE status = 'queued'
+    ORDER BY priority DESC, deadline IS NULL, deadline, created_at
+    LIMIT 1
+"""
+
+STATUSES = ('queued', 'running', 'done', 'failed', 'expired')
+
+# Columns added after the first release (ALTER TABLE on older queue files)
+ADDED_COLUMNS = {
+    'worker_pid': 'INTEGER',
+    'heartbeat_at': 'REAL',
+}
+
+
+def dedupe_key(keyword):
+    """Keyword identity: trimmed, inner whitespace collapsed, lowercased"""
+    return ' '.join(keyword.split()).lower()
+
+
+def worker_gone(pid):
+    """True if the worker process is known to have exited (queue file is local)"""
+    if not pid or os.name == 'nt':
+        # os.kill(pid, 0) would terminate the process on Windows: heartbeat only
+        return False
+    from utils.profile_farm import pid_alive
+    return not pid_alive(pid)
+
+
+class JobScheduler:
+    """SQLite-backed keyword job queue"""
+
+    def __init__(self, db_path=None, settings=None):
+        """
+        Args:
+            db_path: Queue file (default: JOB_SCHEDULER['db_path'])
+            settings: JOB_SCHEDULER overrides
+        """
+        self.settings = {**JOB_SCHEDULER, **(settings or {})}
+        self.db_path = Path(db_path or self.settings['db_path'])
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            conn.commit()
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self):
+        """Committed, closed connection per call (shared by worker threads and processes)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def add(self, keyword, platform='pc', priority=None, max_pages=None, deadline=None):
+        """
+        Enqueue a keyword (deduplicated)
+
+        Args:
+            keyword: Search keyword
+            platform: 'pc' / 'mobile'
+            priority: Higher runs first (default: JOB_SCHEDULER['default_priority'])
+            max_pages: Pages to crawl (default: JOB_SCHEDULER['default_max_pages'])
+            deadline: Seconds from now after which the job is dropped (None = no deadline)
+
+        Returns:
+            tuple: (job_id, action) - action is 'added', 'merged' (into a queued
+                   job), 'running' (a running job already covers it),
+                   'follow_up' (queued after a running job with fewer pages)
+                   or 'skipped'
+        """
+        priority = self.settings['default_priority'] if priority is None else priority
+        max_pages = max_pages or self.settings['default_max_pages']
+        now = time.time()
+        deadline_at = now + deadline if deadline else None
+        key = dedupe_key(keyword)
+
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT id, priority, max_pages, deadline FROM jobs
+                WHERE dedupe_key = ? AND platform = ? AND status = 'queued'
+                ORDER BY id LIMIT 1
+            """, (key, platform)).fetchone()
+            if row:
+                job_id, old_priority, old_pages, old_deadline = row
+                if old_deadline is not None and deadline_at is not None:
+                    deadline_at = min(old_deadline, deadline_at)
+                else:
+                    # A job without deadline keeps the merged job from expiring
+                    deadline_at = None
+                conn.execute("""
+                    UPDATE jobs SET priority = ?, max_pages = ?, deadline = ?
+                    WHERE id = ?
+                """, (max(old_priority, priority), max(old_pages, max_pages), deadline_at, job_id))
+                return job_id, 'merged'
+
+            # A running job can no longer change: it covers requests for as
+            # many pages, more pages need a follow-up job
+            row = conn.execute("""
+                SELECT id, max_pages FROM jobs
+                WHERE dedupe_key = ? AND platform = ? AND status = 'running'
+                ORDER BY id LIMIT 1
+            """, (key, platform)).fetchone()
+            if row and row[1] >= max_pages:
+                return row[0], 'running'
+            running = row is not None
+
+            row = conn.execute("""
+                SELECT id FROM jobs
+                WHERE dedupe_key = ? AND platform = ? AND status = 'done'
+                  AND finished_at >= ? AND max_pages >= ?
+                ORDER BY finished_at DESC LIMIT 1
+            """, (key, platform, now - self.settings['dedupe_window'], max_pages)).fetchone()
+            if row:
+                return row[0], 'skipped'
+
+            cursor = conn.execute("""
+                INSERT INTO jobs (keyword, dedupe_key, platform, priority, max_pages, deadline, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (keyword.strip(), key, platform, priority, max_pages, deadline_at, now))
+            return cursor.lastrowid, 'follow_up' if running else 'added'
+
+    def claim(self, worker):
+        """
+        Take the next job (expires overdue jobs, re-queues abandoned ones)
+
+        A running job is abandoned when its worker process is gone, or its
+        lease was not renewed (renew()) for lease_timeout seconds.
+
+        Returns:
+            dict: {'id', 'keyword', 'platform', 'max_pages'}, or None if the queue is empty
+        """
+        now = time.time()
+        cutoff = now - self.settings['lease_timeout']
+
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE jobs SET status = 'expired', finished_at = ?
+                WHERE status = 'queued' AND deadline IS NOT NULL AND deadline < ?
+            """, (now, now))
+            abandoned = [
+                (job_id,) for job_id, pid, heartbeat in conn.execute("""
+                    SELECT id, worker_pid, COALESCE(heartbeat_at, started_at) FROM jobs
+                    WHERE status = 'running'
+                """).fetchall()
+                if heartbeat < cutoff or worker_gone(pid)
+            ]
+            conn.executemany("""
+                UPDATE jobs SET status = 'queued', worker = NULL, worker_pid = NULL
+                WHERE id = ?
+            """, abandoned)
+
+            row = conn.execute(NEXT_JOB_QUERY).fetchone()
+            if not row:
+                return None
+
+            job_id, keyword, platform, max_pages = row
+            conn.execute("""
+                UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ?, worker = ?,
+                                worker_pid = ?, attempts = attempts + 1
+                WHERE id = ?
+            """, (now, now, worker, os.getpid(), job_id))
+            return {'id': job_id, 'keyword': keyword, 'platform': platform, 'max_pages': max_pages}
+
+    def renew(self, job_id, worker):
+        """
+        Extend a running job's lease (worker heartbeat)
+
+        Returns:
+            bool: False if the job is no longer held by this worker
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET heartbeat_at = ?
+                WHERE id = ? AND worker = ? AND status = 'running'
+            """, (time.time(), job_id, worker))
+            return cursor.rowcount == 1
+
+    def finish(self, job_id, success, pages_ok=None, error=None, worker=None):
+        """
+        Record a job result ('done' or 'failed')
+
+        Args:
+            worker: Claiming worker; the result is dropped if the job was
+                    re-queued and claimed by another worker since
+
+        Returns:
+            bool: True if the result was recorded
+        """
+        query = """
+            UPDATE jobs SET status = ?, finished_at = ?, pages_ok = ?, error = ?
+            WHERE id = ?
+        """
+        values = ['done' if success else 'failed', time.time(), pages_ok, error, job_id]
+        if worker is not None:
+            query += " AND worker = ? AND status = 'running'"
+            values.append(worker)
+
+        with self._connect() as conn:
+            return conn.execute(query, values).rowcount == 1
+
+    def counts(self):
+        """
+        Jobs per status
+
+        Returns:
+            dict: {status: count}
+        """
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in STATUSES}
+
+    def queued(self, limit=20):
+        """
+        Queued jobs in dispatch order
+
+        Returns:
+            list: (id, keyword, platform, priority, max_pages, deadline)
+        """
+        with self._connect() as conn:
+            return conn.execute("""
+                SELECT id, keyword, platform, priority, max_pages, deadline
+                FROM jobs WHERE status = 'queued'
+                ORDER BY priority DESC, deadline IS NULL, deadline, created_at
+                LIMIT ?
+            """, (limit,)).fetchall()
+
+    def purge(self, days):
+        """
+        Delete finished jobs older than some days
+
+        Returns:
+            int: Jobs deleted
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                DELETE FROM jobs
+                WHERE status IN ('done', 'failed', 'expired') AND finished_at < ?
+            """, (time.time() - days * 86400,))
+            return cursor.rowcount
+
+
+def run_job(job):
+    """
+    Crawl one job
+
+    Returns:
+        tuple: (success, pages_ok)
+    """
+    from modules.crawler import Crawler
+
+    crawler = Crawler(job['platform'])
+    success = crawler.run(job['keyword'], job['max_pages'])
+    return success, sum(1 for r in crawler.page_results if r.get('success'))
+
+
+def run_workers(scheduler, workers=1, drain=False, runner=run_job):
+    """
+    Dispatch queued jobs to worker threads
+
+    Args:
+        scheduler: JobScheduler
+        workers: Concurrent crawls
+        drain: Stop once the queue is empty (else poll until interrupted)
+        runner: Job function (job dict -> (success, pages_ok))
+
+    Returns:
+        int: Jobs processed
+    """
+    processed = []
+    stop = threading.Event()
+
+    def worker_loop(worker_id):
+        worker = f"{os.getpid()}-{worker_id}"
+        while not stop.is_set():
+            job = scheduler.claim(worker)
+            if not job:
+                if drain:
+                    return
+                stop.wait(scheduler.settings['poll_interval'])
+                continue
+
+            print(f"\n[JobScheduler] {worker}: job #{job['id']} '{job['keyword']}' "
+                  f"({job['platform']}, {job['max_pages']} pages)")
+
+            # Lease renewal while the crawl runs
+            finished = threading.Event()
+
+            def heartbeat(job_id=job['id']):
+                while not finished.wait(scheduler.settings['heartbeat_interval']):
+                    scheduler.renew(job_id, worker)
+
+            threading.Thread(target=heartbeat, daemon=True).start()
+            try:
+                success, pages_ok = runner(job)
+                error = None
+            except Exception as e:
+                print(f"[JobScheduler] ❌ Job #{job['id']} failed: {e}")
+                success, pages_ok, error = False, None, str(e)
+            finally:
+                finished.set()
+
+            if not scheduler.finish(job['id'], success, pages_ok, error, worker):
+                print(f"[JobScheduler] ⚠️ Job #{job['id']} was re-queued (lease lost), result not recorded")
+            processed.append(job['id'])
+            print(f"[JobScheduler] Job #{job['id']} {'done' if success else 'failed'}")
+
+    threads = [threading.Thread(target=worker_loop, args=(n,), daemon=True) for n in range(1, workers + 1)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        print("\n[JobScheduler] Stopping after current jobs...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    return len(processed)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Keyword crawl job queue')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = sub.add_parser('add', help='Enqueue keywords')
+    add_parser.add_argument('keywords', nargs='*', help='Search keywords')
+    add_parser.add_argument('--file', help='Keyword file (one per line)')
+    add_parser.add_argument('--platform', choices=['pc', 'mobile'], default='pc')
+    add_parser.add_argument('--priority', type=int, default=None, help='Higher runs first')
+    add_parser.add_argument('--max-pages', type=int, default=None)
+    add_parser.add_argument('--deadline', type=int, default=None, help='Drop if not started within N minutes')
+
+    run_parser = sub.add_parser('run', help='Dispatch queued jobs to crawl workers')
+    run_parser.add_argument('--workers', type=int, default=None)
+    run_parser.add_argument('--drain', action='store_true', help='Exit when the queue is empty')
+
+    sub.add_parser('status', help='Job counts and queued jobs')
+    purge_parser = sub.add_parser('purge', help='Delete finished jobs')
+    purge_parser.add_argument('--days', type=int, default=7)
+    args = parser.parse_args()
+
+    scheduler = JobScheduler()
+
+    if args.command == 'add':
+        keywords = list(args.keywords)
+        if args.file:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                keywords.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+        if not keywords:
+            print("[JobScheduler] No keywords given")
+            return 1
+
+        deadline = args.deadline * 60 if args.deadline else None
+        for keyword in keywords:
+            job_id, action = scheduler.add(keyword, args.platform, args.priority, args.max_pages, deadline)
+            print(f"  {action:<9} #{job_id} {keyword}")
+        return 0
+
+    if args.command == 'run':
+        processed = run_workers(scheduler, args.workers or scheduler.settings['workers'], args.drain)
+        print(f"[JobScheduler] {processed} job(s) processed")
+        return 0
+
+    if args.command == 'purge':
+        print(f"[JobScheduler] {scheduler.purge(args.days)} job(s) deleted")
+        return 0
+
+    counts = scheduler.counts()
+    print("\n" + "=" * 60)
+    print("Job Queue: " + ', '.join(f"{status} {count}" for status, count in counts.items()))
+    print("=" * 60)
+    now = time.time()
+    for job_id, keyword, platform, priority, max_pages, deadline in scheduler.queued():
+        due = f"{(deadline - now) / 60:.0f}m left" if deadline else 'no deadline'
+        print(f"  #{job_id:<5} p{priority:<3} {platform:<6} {max_pages}p  {keyword}  ({due})")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Reprocessor - Re-score stored pages in bulk with the current heuristics
+- Inputs: segment files (.seg), page files (output/html) or directories of either
+- Worker processes memory-map their inputs and run the profile's
+  classify (block signatures) + extract_product_ids on the mapped bodies
+  (no read copies)
+- Results are aggregated per platform / page number and per block rule;
+  pages whose verdict differs from the one recorded at crawl time are
+  counted as changed
+
+Usage:
+  python -m modules.reprocessor                                  # REPROCESSOR['inputs']
+  python -m modules.reprocessor output/archive --workers 8
+  python -m modules.reprocessor output/html --details rows.jsonl --out summary.json
+"""
+
+import re
+import sys
+import json
+import mmap
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import REPROCESSOR
+
+from .crawler import get_profile, extract_product_ids
+from .segment_archive import SegmentReader, SEGMENT_SUFFIX
+
+# FileManager.save_page names: page_{num}_chrome{version}.{ext}
+PAGE_FILE_PATTERN = re.compile(r'^page_(\d+)_chrome')
+
+# Profiles per worker process (validators are stateless)
+_profiles = {}
+
+
+def page_info(name):
+    """
+    Platform, page number and crawl-time verdict from a page file name
+
+    Returns:
+        tuple: (platform, page_num, recorded_success), page_num None if not a page file
+    """
+    match = PAGE_FILE_PATTERN.match(name)
+    platform = 'mobile' if '.mobile-p' in name else 'pc'
+    return platform, int(match.group(1)) if match else None, '.failed.' not in name
+
+
+def score(platform, page_num, body):
+    """
+    Validate one body and extract its products
+
+    Args:
+        platform: Profile name ('pc', 'mobile')
+        page_num: Page number (PC validates page 1 and RSC pages differently)
+        body: Page body (bytes, mmap or memoryview)
+
+    Returns:
+        tuple: (row dict, product ID list)
+    """
+    if platform not in _profiles:
+        _profiles[platform] = get_profile(platform)
+    has_products, block_rule = _profiles[platform].classify(body, page_num)
+    is_blocked = block_rule is not None
+    products = extract_product_ids(body)
+    row = {
+        'platform': platform,
+        'page': page_num,
+        'size': len(body),
+        'has_products': has_products,
+        'blocked': is_blocked,
+        'block_rule': block_rule,
+        'success': has_products and not is_blocked,
+        'products': len(products),
+    }
+    return row, products
+
+
+def _finish_row(row, source, recorded_success):
+    row['source'] = source
+    row['recorded_success'] = recorded_success
+    row['changed'] = recorded_success is not None and recorded_success != row['success']
+    return row
+
+
+def process_segment(path):
+    """
+    Re-score every record of one segment (worker task)
+
+    Returns:
+        tuple: (rows, set of product IDs)
+    """
+    rows, products = [], set()
+    with SegmentReader(path) as reader:
+        for entry, meta, body in reader.records():
+            name = meta.get('name', '')
+            platform, page_num, recorded_success = page_info(name)
+            platform = meta.get('platform', platform)
+            page_num = meta.get('page', page_num) or 1
+            recorded_success = meta.get('success', recorded_success if name else None)
+
+            row, ids = score(platform, page_num, body)
+            if isinstance(body, memoryview):
+                body.release()
+            rows.append(_finish_row(row, f"{path}@{entry['offset']}", recorded_success))
+            products.update(ids)
+    return rows, products
+
+
+def process_files(paths):
+    """
+    Re-score a batch of page files (worker task)
+
+    Returns:
+        tuple: (rows, set of product IDs)
+    """
+    rows, products = [], set()
+    for path in map(Path, paths):
+        platform, page_num, recorded_success = page_info(path.name)
+        with open(path, 'rb') as f:
+            # Empty files cannot be mapped
+            body = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if path.stat().st_size else b''
+            try:
+                row, ids = score(platform, page_num or 1, body)
+            finally:
+                if isinstance(body, mmap.mmap):
+                    body.close()
+        rows.append(_finish_row(row, str(path), recorded_success))
+        products.update(ids)
+    return rows, products
+
+
+def collect_inputs(paths):
+    """
+    Split inputs into segments and page files (directories are walked)
+
+    Returns:
+        tuple: (segment paths, page file paths)
+    """
+    segment_paths, page_files = [], []
+    for path in map(Path, paths):
+        candidates = sorted(path.rglob('*')) if path.is_dir() else [path]
+        for candidate in candidates:
+            if not candidate.is_file():
+                continue
+            if candidate.suffix == SEGMENT_SUFFIX:
+                segment_paths.append(str(candidate))
+            elif PAGE_FILE_PATTERN.match(candidate.name):
+                page_files.append(str(candidate))
+    return segment_paths, page_files
+
+
+def _empty_counts():
+    return {'pages': 0, 'success': 0, 'blocked': 0, 'no_products': 0,
+            'changed': 0, 'became_success': 0, 'became_failed': 0, 'products': 0, 'bytes': 0}
+
+
+def _add(counts, row):
+    counts['pages'] += 1
+    counts['success'] += row['success']
+    counts['blocked'] += row['blocked']
+    counts['no_products'] += not row['has_products']
+    counts['changed'] += row['changed']
+    counts['became_success'] += row['changed'] and row['success']
+    counts['became_failed'] += row['changed'] and not row['success']
+    counts['products'] += row['products']
+    counts['bytes'] += row['size']
+
+
+def reprocess(paths=None, workers=None, chunk_files=None, details=None):
+    """
+    Re-score stored pages across a process pool
+
+    Args:
+        paths: Files / directories (default: REPROCESSOR['inputs'])
+        workers: Worker processes (default: REPROCESSOR['workers'], None = CPU count)
+        chunk_files: Page files per task
+        details: Optional JSONL path for one row per page
+
+    Returns:
+        dict: Totals, per 'platform pN' counts, block rule counts,
+              unique products, elapsed seconds
+    """
+    paths = paths or REPROCESSOR['inputs']
+    workers = workers or REPROCESSOR['workers']
+    chunk_files = chunk_files or REPROCESSOR['chunk_files']
+
+    segment_paths, page_files = collect_inputs(paths)
+    print(f"[Reprocessor] {len(segment_paths)} segment(s), {len(page_files)} page file(s)")
+
+    totals = _empty_counts()
+    by_page = {}
+    by_rule = {}
+    products = set()
+    start = time.time()
+
+    details_file = open(details, 'w', encoding='utf-8') if details else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process_segment, path) for path in segment_paths]
+            futures += [executor.submit(process_files, page_files[i:i + chunk_files])
+                        for i in range(0, len(page_files), chunk_files)]
+
+            for future in as_completed(futures):
+                rows, ids = future.result()
+                products.update(ids)
+                for row in rows:
+                    _add(totals, row)
+                    _add(by_page.setdefault(f"{row['platform']} p{row['page']}", _empty_counts()), row)
+                    if row['block_rule']:
+                        by_rule[row['block_rule']] = by_rule.get(row['block_rule'], 0) + 1
+                    if details_file:
+                        details_file.write(json.dumps(row, ensure_ascii=False) + '\n')
+    finally:
+        if details_file:
+            details_file.close()
+
+    return {
+        'totals': totals,
+        'by_page': dict(sorted(by_page.items())),
+        'by_rule': dict(sorted(by_rule.items(), key=lambda item: -item[1])),
+        'unique_products': len(products),
+        'elapsed': round(time.time() - start, 2),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Re-score stored pages with the current validators')
+    parser.add_argument('paths', nargs='*', help='Segments, page files or directories')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-files', type=int, default=None, help='Page files per worker task')
+    parser.add_argument('--details', help='Write one JSON row per page to this file')
+    parser.add_argument('--out', help='Write the summary as JSON to this file')
+    args = parser.parse_args()
+
+    summary = reprocess(args.paths, args.workers, args.chunk_files, args.details)
+    totals = summary['totals']
+
+    print("\n" + "=" * 60)
+    print(f"Reprocessed {totals['pages']:,} page(s), {totals['bytes']:,} bytes in {summary['elapsed']}s")
+    print("=" * 60)
+    print(f"  {'group':<12} {'pages':>7} {'success':>8} {'blocked':>8} {'no prod':>8} {'changed':>8}")
+    for group, counts in [*summary['by_page'].items(), ('total', totals)]:
+        print(f"  {group:<12} {counts['pages']:>7,} {counts['success']:>8,} {counts['blocked']:>8,} "
+              f"{counts['no_products']:>8,} {counts['changed']:>8,}")
+    print(f"\n  Now success: {totals['became_success']:,}, now failed: {totals['became_failed']:,}")
+    if summary['by_rule']:
+        print("  Block rules: " + ', '.join(f"{rule} {count:,}" for rule, count in summary['by_rule'].items()))
+    print(f"  Unique products: {summary['unique_products']:,}")
+    print("=" * 60)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(f"[Reprocessor] Summary saved: {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
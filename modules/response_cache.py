@@ -0,0 +1,267 @@
+"""
+Response Cache - On-disk cache of validated search page responses
+- Key: platform + URL with volatile parameters (traceId, _rsc) removed,
+  so the same keyword/page hits across jobs and trace IDs
+- Bodies are zlib-compressed files; a SQLite index keeps status, size,
+  store time (TTL) and last access (LRU eviction over max_bytes)
+- Hit/miss counters per process and cumulative in the index
+
+Usage:
+  python -m modules.response_cache stats     # Entries, size, hit rate
+  python -m modules.response_cache prune     # Drop expired entries
+  python -m modules.response_cache clear     # Drop everything
+"""
+
+import sys
+import time
+import zlib
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import RESPONSE_CACHE
+
+# Query parameters that change per request but not the page content
+VOLATILE_PARAMS = {'traceId', '_rsc'}
+
+INDEX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        status INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        stored_at REAL NOT NULL,
+        last_access REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+    CREATE TABLE IF NOT EXISTS metrics (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+"""
+
+METRICS = ('hits', 'misses', 'expired', 'stores', 'evictions')
+
+
+def normalize_url(url):
+    """
+    URL without volatile parameters, remaining parameters sorted
+
+    Returns:
+        str: e.g. 'www.coupang.com/np/search?channel=user&page=2&q=...'
+    """
+    parts = urlsplit(url)
+    params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                    if k not in VOLATILE_PARAMS)
+    return f"{parts.netloc}{parts.path}?{urlencode(params)}"
+
+
+def cache_key(url, platform):
+    """SHA-256 of platform + normalized URL (keyword, page, channel, ...)"""
+    return hashlib.sha256(f"{platform}|{normalize_url(url)}".encode('utf-8')).hexdigest()
+
+
+class CachedResponse:
+    """Response stand-in for a cache hit (fields used by the crawler)"""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, content):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+
+class ResponseCache:
+    """TTL + LRU cache of compressed response bodies"""
+
+    def __init__(self, cache_dir=None, ttl=None, max_bytes=None, compress_level=None):
+        """
+        Args:
+            cache_dir: Cache directory (default: RESPONSE_CACHE['dir'])
+            ttl: Seconds an entry stays valid
+            max_bytes: Compressed size limit (least recently used evicted first)
+            compress_level: zlib level
+        """
+        self.cache_dir = Path(cache_dir or RESPONSE_CACHE['dir'])
+        self.ttl = RESPONSE_CACHE['ttl'] if ttl is None else ttl
+        self.max_bytes = RESPONSE_CACHE['max_bytes'] if max_bytes is None else max_bytes
+        self.compress_level = RESPONSE_CACHE['compress_level'] if compress_level is None else compress_level
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / 'index.db'
+        self.stats = dict.fromkeys(METRICS, 0)
+
+        with self._connect() as conn:
+            conn.executescript(INDEX_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Committed, closed connection per call (the cache may be used from worker threads)"""
+        conn = sqlite3.connect(self.index_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _body_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.z"
+
+    def _count(self, conn, name, amount=1):
+        self.stats[name] += amount
+        conn.execute("""
+            INSERT INTO metrics (name, value) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+        """, (name, amount))
+
+    def _delete(self, conn, key):
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._body_path(key).unlink(missing_ok=True)
+
+    def get(self, url, platform):
+        """
+        Cached response for a URL
+
+        Returns:
+            CachedResponse, or None (miss or expired)
+        """
+        key = cache_key(url, platform)
+        now = time.time()
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT status, stored_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl:
+                self._delete(conn, key)
+                self._count(conn, 'expired')
+                row = None
+
+            body = None
+            if row:
+                try:
+                    body = zlib.decompress(self._body_path(key).read_bytes())
+                except (OSError, zlib.error):
+                    self._delete(conn, key)
+
+            if body is None:
+                self._count(conn, 'misses')
+                return None
+
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._count(conn, 'hits')
+            return CachedResponse(url, row[0], body)
+
+    def put(self, url, platform, status_code, content):
+        """
+        Store a response body (callers only store validated pages)
+
+        Args:
+            content: Body as bytes or str
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+
+        key = cache_key(url, platform)
+        compressed = zlib.compress(content, self.compress_level)
+        body_path = self._body_path(key)
+        body_path.parent.mkdir(exist_ok=True)
+        body_path.write_bytes(compressed)
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO entries (key, url, status, size, stored_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, url, status_code, len(compressed), now, now))
+            self._count(conn, 'stores')
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Drop least recently used entries until under max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._delete(conn, key)
+            total -= size
+            evicted += 1
+        self._count(conn, 'evictions', evicted)
+
+    def prune(self):
+        """
+        Drop expired entries
+
+        Returns:
+            int: Entries removed
+        """
+        with self._connect() as conn:
+            keys = [row[0] for row in conn.execute(
+                "SELECT key FROM entries WHERE stored_at < ?", (time.time() - self.ttl,)
+            ).fetchall()]
+            for key in keys:
+                self._delete(conn, key)
+            return len(keys)
+
+    def clear(self):
+        """Drop every entry and reset counters"""
+        with self._connect() as conn:
+            for (key,) in conn.execute("SELECT key FROM entries").fetchall():
+                self._delete(conn, key)
+            conn.execute("DELETE FROM metrics")
+
+    def summary(self):
+        """
+        Entry count, size and cumulative counters
+
+        Returns:
+            dict: {'entries', 'bytes', 'hits', 'misses', ..., 'hit_rate'}
+        """
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            counters = dict(conn.execute("SELECT name, value FROM metrics").fetchall())
+
+        result = {'entries': entries, 'bytes': size, **{name: counters.get(name, 0) for name in METRICS}}
+        lookups = result['hits'] + result['misses']
+        result['hit_rate'] = result['hits'] / lookups if lookups else 0.0
+        return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Search response cache')
+    parser.add_argument('command', choices=['stats', 'prune', 'clear'])
+    args = parser.parse_args()
+
+    cache = ResponseCache()
+
+    if args.command == 'prune':
+        print(f"[ResponseCache] {cache.prune()} expired entr(ies) removed")
+    elif args.command == 'clear':
+        cache.clear()
+        print("[ResponseCache] Cleared")
+    else:
+        s = cache.summary()
+        print(f"Entries:   {s['entries']:,} ({s['bytes']:,} bytes compressed)")
+        print(f"Hits:      {s['hits']:,}")
+        print(f"Misses:    {s['misses']:,} ({s['expired']:,} expired)")
+        print(f"Hit rate:  {s['hit_rate']:.1%}")
+        print(f"Stores:    {s['stores']:,} ({s['evictions']:,} evicted)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""
+Schema Manager - Versioned, idempotent MySQL migrations
+- Applied migrations are recorded in schema_migrations
+- Every step checks information_schema first, so a migration that was
+  interrupted can simply be run again
+- DbManager applies pending migrations once per process (config DATABASE)
+
+Usage:
+  python -m modules.schema status     # Applied / pending migrations
+  python -m modules.schema migrate    # Apply pending migrations
+  python -m modules.schema explain    # EXPLAIN the fingerprint lookup queries
+"""
+
+import sys
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import DATABASE
+
+# GET_LOCK name held while migrations run
+MIGRATION_LOCK = 'coupang_schema_migrations'
+
+# os_version stored for PC rows (main-pc.py / curlcffi.py)
+PC_OS_VERSION = 'Windows 10'
+
+
+def platform_for(os_version):
+    """
+    Platform of a cookie row ('pc' or 'mobile')
+
+    Same rule as the legacy mobile lookup (os_version != 'Windows 10'),
+    so the backfill and new inserts agree.
+    """
+    return 'pc' if os_version == PC_OS_VERSION else 'mobile'
+
+
+def _index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index))
+    return cursor.fetchone() is not None
+
+
+def _column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (table, column))
+    return cursor.fetchone() is not None
+
+
+def _add_index(cursor, table, index, columns):
+    if not _index_exists(cursor, table, index):
+        cursor.execute(f"ALTER TABLE `{table}` ADD INDEX `{index}` ({columns})")
+
+
+def _add_column(cursor, table, column, definition):
+    if not _column_exists(cursor, table, column):
+        cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN `{column}` {definition}")
+
+
+def _m001_tls_collected_at(conn, cursor):
+    # get_latest_fingerprint: ORDER BY collected_at DESC LIMIT 1
+    _add_index(cursor, 'tls_fingerprints', 'idx_tls_collected_at', '`collected_at`')
+
+
+def _m002_cookies_fingerprint_time(conn, cursor):
+    # Latest cookies of one fingerprint
+    _add_index(cursor, 'cookies', 'idx_cookies_fp_collected', '`tls_fingerprint_id`, `collected_at`')
+
+
+def _m003_cookies_os_time(conn, cursor):
+    # Lookups by device OS
+    _add_index(cursor, 'cookies', 'idx_cookies_os_collected', '`os_version`, `collected_at`')
+
+
+def _m004_cookies_platform(conn, cursor):
+    # Equality on platform lets latest-mobile use an index range
+    # instead of scanning every row with os_version != 'Windows 10'
+    _add_column(cursor, 'cookies', 'platform', "VARCHAR(16) NULL AFTER `os_version`")
+
+    # Backfill in batches to keep row locks short on large tables
+    batch = DATABASE['backfill_batch']
+    while True:
+        cursor.execute(f"""
+            UPDATE cookies
+            SET platform = IF(os_version = %s, 'pc', 'mobile')
+            WHERE platform IS NULL
+            LIMIT {int(batch)}
+        """, (PC_OS_VERSION,))
+        conn.commit()
+        if cursor.rowcount < batch:
+            break
+
+    _add_index(cursor, 'cookies', 'idx_cookies_platform_collected', '`platform`, `collected_at`')
+
+
+def _m005_fingerprint_hash(conn, cursor):
+    # Dedup: one row per canonical fingerprint, repeat collections are sightings
+    from .fingerprint import fingerprint_hash
+
+    _add_column(cursor, 'tls_fingerprints', 'fingerprint_hash', "CHAR(64) NULL")
+    _add_column(cursor, 'tls_fingerprints', 'sighting_count', "INT NOT NULL DEFAULT 1")
+    _add_column(cursor, 'tls_fingerprints', 'last_seen_at', "DATETIME NULL")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tls_fingerprint_sightings (
+            id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            tls_fingerprint_id INT NOT NULL,
+            device_name VARCHAR(255),
+            browser VARCHAR(64),
+            os_version VARCHAR(64),
+            ja3_hash VARCHAR(64),
+            seen_at DATETIME NOT NULL,
+            INDEX idx_sightings_fp_seen (tls_fingerprint_id, seen_at)
+        )
+    """)
+
+    cursor.execute("UPDATE tls_fingerprints SET last_seen_at = collected_at WHERE last_seen_at IS NULL")
+    conn.commit()
+
+    # Backfill hashes; existing duplicates keep NULL (UNIQUE allows many NULLs)
+    # until merged with: python -m modules.fingerprint dedupe
+    cursor.execute("SELECT fingerprint_hash FROM tls_fingerprints WHERE fingerprint_hash IS NOT NULL")
+    seen = {row[0] for row in cursor.fetchall()}
+
+    # Streamed by primary key: duplicates stay NULL, so page on id, not on the NULL filter
+    batch = DATABASE['backfill_batch']
+    last_id = 0
+    while True:
+        cursor.execute(f"""
+            SELECT id, tls_data, http2_data FROM tls_fingerprints
+            WHERE fingerprint_hash IS NULL AND id > %s
+            ORDER BY id
+            LIMIT {int(batch)}
+        """, (last_id,))
+        rows = cursor.fetchall()
+        for fp_id, tls_json, http2_json in rows:
+            last_id = fp_id
+            digest = fingerprint_hash(json.loads(tls_json), json.loads(http2_json or 'null'))
+            if digest in seen:
+                continue
+            seen.add(digest)
+            cursor.execute("UPDATE tls_fingerprints SET fingerprint_hash = %s WHERE id = %s", (digest, fp_id))
+        conn.commit()
+        if len(rows) < batch:
+            break
+
+    if not _index_exists(cursor, 'tls_fingerprints', 'uq_tls_fingerprint_hash'):
+        cursor.execute("ALTER TABLE tls_fingerprints ADD UNIQUE INDEX uq_tls_fingerprint_hash (fingerprint_hash)")
+    _add_index(cursor, 'tls_fingerprints', 'idx_tls_last_seen', '`last_seen_at`')
+
+
+def _m006_fingerprint_blob(conn, cursor):
+    # Compact encoding (modules/fingerprint_codec.py); written per DATABASE['fingerprint_storage']
+    _add_column(cursor, 'tls_fingerprints', 'fingerprint_blob', "MEDIUMBLOB NULL")
+
+
+def _m007_cookie_deltas(conn, cursor):
+    # Crawl-to-crawl cookie diffs against a cookies row (modules/cookie_delta.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cookie_deltas (
+            id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            base_cookie_id INT NOT NULL,
+            tls_fingerprint_id INT NOT NULL,
+            platform VARCHAR(16) NULL,
+            seq INT NOT NULL,
+            delta_data TEXT NOT NULL,
+            collected_at DATETIME NOT NULL,
+            UNIQUE INDEX uq_cookie_deltas_base_seq (base_cookie_id, seq),
+            INDEX idx_cookie_deltas_platform_collected (platform, collected_at)
+        )
+    """)
+
+
+def _m008_cookies_invalidated_at(conn, cursor):
+    # Crawlers mark blocked identities (is_valid = 0); the harvester
+    # counts recent invalidations per platform as the block rate
+    _add_column(cursor, 'cookies', 'invalidated_at', "DATETIME NULL")
+    _add_index(cursor, 'cookies', 'idx_cookies_platform_invalidated', '`platform`, `invalidated_at`')
+
+
+def _m009_page_outcomes(conn, cursor):
+    # One row per crawled page with its identity (modules/analytics.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS page_outcomes (
+            id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            platform VARCHAR(16) NOT NULL,
+            tls_fingerprint_id INT NULL,
+            cookie_id INT NULL,
+            ja3_hash VARCHAR(64) NULL,
+            chrome_version VARCHAR(64) NULL,
+            device_name VARCHAR(255) NULL,
+            cookie_age INT NULL,
+            page INT NOT NULL,
+            status INT NULL,
+            success TINYINT NOT NULL,
+            blocked TINYINT NOT NULL,
+            block_rule VARCHAR(64) NULL,
+            size INT NULL,
+            time_ms INT NULL,
+            crawled_at DATETIME NOT NULL,
+            INDEX idx_page_outcomes_platform_crawled (platform, crawled_at),
+            INDEX idx_page_outcomes_ja3_crawled (ja3_hash, crawled_at),
+            INDEX idx_page_outcomes_fp_crawled (tls_fingerprint_id, crawled_at)
+        )
+    """)
+
+
+def _m010_cookies_platform_valid(conn, cursor):
+    # Expiry index: valid snapshots of one platform in the lookback window
+    _add_index(cursor, 'cookies', 'idx_cookies_platform_valid_collected', '`platform`, `is_valid`, `collected_at`')
+
+
+# (id, description, apply function) - append only, never reorder
+MIGRATIONS = [
+    ('001_tls_collected_at', 'tls_fingerprints (collected_at) index', _m001_tls_collected_at),
+    ('002_cookies_fp_collected', 'cookies (tls_fingerprint_id, collected_at) index', _m002_cookies_fingerprint_time),
+    ('003_cookies_os_collected', 'cookies (os_version, collected_at) index', _m003_cookies_os_time),
+    ('004_cookies_platform', 'cookies.platform column + (platform, collected_at) index', _m004_cookies_platform),
+    ('005_tls_fingerprint_hash', 'tls_fingerprints dedup hash + sightings table', _m005_fingerprint_hash),
+    ('006_tls_fingerprint_blob', 'tls_fingerprints.fingerprint_blob column', _m006_fingerprint_blob),
+    ('007_cookie_deltas', 'cookie_deltas table (per-crawl cookie diffs)', _m007_cookie_deltas),
+    ('008_cookies_invalidated_at', 'cookies.invalidated_at column + (platform, invalidated_at) index', _m008_cookies_invalidated_at),
+    ('009_page_outcomes', 'page_outcomes table (per-page crawl results with identity)', _m009_page_outcomes),
+    ('010_cookies_platform_valid', 'cookies (platform, is_valid, collected_at) index', _m010_cookies_platform_valid),
+]
+
+
+class SchemaManager:
+    """Apply and inspect schema migrations"""
+
+    def __init__(self, db):
+        """
+        Args:
+            db: DbManager (only its raw connection is used)
+        """
+        self.db = db
+
+    def _ensure_table(self, cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                id VARCHAR(64) NOT NULL PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at DATETIME NOT NULL
+            )
+        """)
+
+    def applied(self):
+        """
+        Returns:
+            set: IDs of applied migrations
+        """
+        conn = self.db._connect()
+        cursor = conn.cursor()
+
+        try:
+            self._ensure_table(cursor)
+            cursor.execute("SELECT id FROM schema_migrations")
+            return {row[0] for row in cursor.fetchall()}
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    def pending(self):
+        """
+        Returns:
+            list: (id, description, apply) tuples not yet applied
+        """
+        done = self.applied()
+        return [m for m in MIGRATIONS if m[0] not in done]
+
+    def migrate(self, verbose=True):
+        """
+        Apply pending migrations in order
+
+        Returns:
+            list: IDs applied by this call
+        """
+        if not self.pending():
+            return []
+
+        conn = self.db._connect()
+        cursor = conn.cursor()
+        applied = []
+
+        try:
+            # One migrating process at a time: concurrent first starts wait
+            # here, then find the migrations applied
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, DATABASE['migrate_lock_timeout']))
+            if cursor.fetchone()[0] != 1:
+                raise RuntimeError(f"Migration lock not acquired within {DATABASE['migrate_lock_timeout']}s")
+
+            cursor.execute("SELECT id FROM schema_migrations")
+            done = {row[0] for row in cursor.fetchall()}
+            pending = [m for m in MIGRATIONS if m[0] not in done]
+
+            for migration_id, description, apply in pending:
+                if verbose:
+                    print(f"[Schema] Applying {migration_id}: {description}...")
+                start_time = time.time()
+
+                apply(conn, cursor)
+                cursor.execute(
+                    "INSERT IGNORE INTO schema_migrations (id, description, applied_at) VALUES (%s, %s, %s)",
+                    (migration_id, description, datetime.now())
+                )
+                conn.commit()
+                applied.append(migration_id)
+
+                if verbose:
+                    print(f"  ✅ Done ({time.time() - start_time:.1f}s)")
+
+            return applied
+
+        finally:
+            try:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+            finally:
+                cursor.close()
+                conn.close()
+
+    def explain(self, queries):
+        """
+        Run EXPLAIN for lookup queries
+
+        Args:
+            queries: {label: (sql, params)}
+
+        Returns:
+            dict: {label: [explain rows as dicts]}
+        """
+        from pymysql.cursors import DictCursor
+
+        conn = self.db._connect()
+        cursor = conn.cursor(DictCursor)
+
+        try:
+            plans = {}
+            for label, (sql, params) in queries.items():
+                cursor.execute(f"EXPLAIN {sql}", params)
+                plans[label] = cursor.fetchall()
+            return plans
+
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def main():
+    import argparse
+    from modules.db_manager import DbManager
+
+    parser = argparse.ArgumentParser(description='Database schema migrations')
+    parser.add_argument('command', choices=['status', 'migrate', 'explain'])
+    args = parser.parse_args()
+
+    db = DbManager()
+    schema = SchemaManager(db)
+
+    if args.command == 'status':
+        done = schema.applied()
+        print("\n" + "=" * 60)
+        print("Schema Migrations")
+        print("=" * 60)
+        for migration_id, description, _ in MIGRATIONS:
+            mark = '✅' if migration_id in done else '⏳'
+            print(f"  {mark} {migration_id}: {description}")
+        print("=" * 60)
+        return 0
+
+    if args.command == 'migrate':
+        applied = schema.migrate()
+        print(f"\n[Schema] {len(applied)} migration(s) applied" if applied else "\n[Schema] Up to date")
+        return 0
+
+    # explain
+    plans = schema.explain(db.lookup_queries())
+    for label, rows in plans.items():
+        print(f"\n[{label}]")
+        for row in rows:
+            print(f"  table={row.get('table')} type={row.get('type')} key={row.get('key')} "
+                  f"rows={row.get('rows')} extra={row.get('Extra')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Segment Archive - Append-only segment files for crawled pages
+- One record per page: fixed header, JSON metadata (URL, status, request
+  and response headers, ...) and the raw body
+    magic 'SAR1' | meta length (uint32 BE) | body length (uint64 BE) | meta | body
+- Segments rotate at ARCHIVE['max_segment_bytes'];
+  each has a sidecar index (<segment>.idx, one JSON line per record with
+  its offsets) so readers seek straight to a record
+- SegmentReader memory-maps a segment; bodies are zero-copy memoryviews
+- Locator of a record: '<segment file>@<offset>'
+
+Usage:
+  python -m modules.segment_archive list                      # Segments, records, sizes
+  python -m modules.segment_archive show <segment>@<offset>   # Metadata + body head
+  python -m modules.segment_archive extract <segment> --out dir
+"""
+
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import atexit
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import ARCHIVE
+
+MAGIC = b'SAR1'
+HEADER = struct.Struct('>4sIQ')
+SEGMENT_SUFFIX = '.seg'
+INDEX_SUFFIX = '.idx'
+
+
+def parse_locator(locator):
+    """'<segment>@<offset>' -> (Path, int)"""
+    path, _, offset = str(locator).rpartition('@')
+    return Path(path), int(offset)
+
+
+class SegmentWriter:
+    """Append records to the current segment, rotating by size"""
+
+    def __init__(self, archive_dir=None, max_segment_bytes=None, compress=None):
+        """
+        Args:
+            archive_dir: Segment directory (default: ARCHIVE['dir'])
+            max_segment_bytes: Rotate once a segment would grow past this
+            compress: zlib-compress bodies (readers decompress transparently)
+        """
+        self.archive_dir = Path(archive_dir or ARCHIVE['dir'])
+        self.max_segment_bytes = ARCHIVE['max_segment_bytes'] if max_segment_bytes is None else max_segment_bytes
+        self.compress = ARCHIVE['compress'] if compress is None else compress
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None
+        self._size = 0
+        self._sequence = 0
+        atexit.register(self.close)
+
+    def _rotate(self):
+        self._close_files()
+        self._sequence += 1
+        name = f"seg-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{self._sequence:04d}"
+        path = self.archive_dir / f"{name}{SEGMENT_SUFFIX}"
+        self._segment = open(path, 'ab')
+        self._index = open(path.with_suffix(INDEX_SUFFIX), 'a', encoding='utf-8')
+        self._size = self._segment.tell()
+
+    def append(self, body, meta):
+        """
+        Append one record
+
+        Args:
+            body: Raw body (bytes / memoryview; str is UTF-8 encoded)
+            meta: JSON-serializable metadata (url, status, headers, ...)
+
+        Returns:
+            str: Locator '<segment>@<offset>'
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        meta = dict(meta)
+        if self.compress:
+            body = zlib.compress(body)
+            meta['encoding'] = 'zlib'
+
+        meta_bytes = json.dumps(meta, ensure_ascii=False, default=str).encode('utf-8')
+        record_len = HEADER.size + len(meta_bytes) + len(body)
+
+        with self._lock:
+            if self._segment is None or (self._size and self._size + record_len > self.max_segment_bytes):
+                self._rotate()
+
+            offset = self._size
+            self._segment.write(HEADER.pack(MAGIC, len(meta_bytes), len(body)))
+            self._segment.write(meta_bytes)
+            self._segment.write(body)
+            self._segment.flush()
+            self._size += record_len
+
+            entry = {
+                'offset': offset,
+                'length': record_len,
+                'body_offset': offset + HEADER.size + len(meta_bytes),
+                'body_length': len(body),
+                'url': meta.get('url'),
+                'page': meta.get('page'),
+            }
+            self._index.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._index.flush()
+
+            return f"{self._segment.name}@{offset}"
+
+    def _close_files(self):
+        for f in (self._segment, self._index):
+            if f:
+                f.close()
+        self._segment = self._index = None
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+
+
+class SegmentReader:
+    """Memory-mapped read access to one segment"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.path.stat().st_size else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map:
+            try:
+                self._map.close()
+            except BufferError:
+                pass    # Bodies still referenced; the map is released with the last one
+        self._file.close()
+
+    def index(self):
+        """
+        Index entries (sidecar file, or a header scan when it is missing)
+
+        Returns:
+            list: [{'offset', 'length', 'body_offset', 'body_length', 'url', 'page'}]
+        """
+        index_path = self.path.with_suffix(INDEX_SUFFIX)
+        if index_path.exists():
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        return list(self.scan())
+
+    def scan(self):
+        """Walk record headers from the start (rebuilds the index)"""
+        offset = 0
+        size = len(self._map) if self._map else 0
+        while offset + HEADER.size <= size:
+            magic, meta_len, body_len = HEADER.unpack_from(self._map, offset)
+            if magic != MAGIC:
+                raise ValueError(f"Corrupt record at {self.path}@{offset}")
+            length = HEADER.size + meta_len + body_len
+            if offset + length > size:
+                break    # Truncated tail (writer interrupted)
+            meta = json.loads(self._map[offset + HEADER.size:offset + HEADER.size + meta_len])
+            yield {
+                'offset': offset,
+                'length': length,
+                'body_offset': offset + HEADER.size + meta_len,
+                'body_length': body_len,
+                'url': meta.get('url'),
+                'page': meta.get('page'),
+            }
+            offset += length
+
+    def read(self, offset):
+        """
+        Record at an offset
+
+        Returns:
+            tuple: (meta dict, body) - body is a memoryview into the map,
+                   or bytes when the record is compressed
+        """
+        magic, meta_len, body_len = HEADER.unpack_from(self._map, offset)
+        if magic != MAGIC:
+            raise ValueError(f"No record at {self.path}@{offset}")
+        meta_start = offset + HEADER.size
+        meta = json.loads(self._map[meta_start:meta_start + meta_len])
+        body = memoryview(self._map)[meta_start + meta_len:meta_start + meta_len + body_len]
+        if meta.get('encoding') == 'zlib':
+            body = zlib.decompress(body)
+        return meta, body
+
+    def records(self):
+        """Yield (index entry, meta, body) for every record in order"""
+        for entry in self.index():
+            meta, body = self.read(entry['offset'])
+            yield entry, meta, body
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(archive_dir=None):
+    """
+    Process-wide SegmentWriter per directory (one open segment per process)
+
+    Returns:
+        SegmentWriter
+    """
+    key = str(Path(archive_dir or ARCHIVE['dir']).resolve())
+    with _writers_lock:
+        if key not in _writers:
+            _writers[key] = SegmentWriter(archive_dir)
+        return _writers[key]
+
+
+def segments(archive_dir=None):
+    """Segment files, oldest first"""
+    return sorted(Path(archive_dir or ARCHIVE['dir']).glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def read_locator(locator):
+    """
+    One record by locator
+
+    Returns:
+        tuple: (meta dict, body bytes)
+    """
+    path, offset = parse_locator(locator)
+    with SegmentReader(path) as reader:
+        meta, body = reader.read(offset)
+        data = bytes(body)
+        if isinstance(body, memoryview):
+            body.release()
+        return meta, data
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Crawled page segment archive')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='Segments with record counts')
+    show_parser = sub.add_parser('show', help='Show one record')
+    show_parser.add_argument('locator', help='<segment>@<offset>')
+    extract_parser = sub.add_parser('extract', help='Write the bodies of a segment to files')
+    extract_parser.add_argument('segment')
+    extract_parser.add_argument('--out', required=True)
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        total = 0
+        for path in segments():
+            with SegmentReader(path) as reader:
+                count = len(reader.index())
+            total += count
+            print(f"  {path.name}  {count:>6} records  {path.stat().st_size:>14,} bytes")
+        print(f"{total:,} records")
+        return 0
+
+    if args.command == 'show':
+        meta, body = read_locator(args.locator)
+        print(json.dumps(meta, indent=2, ensure_ascii=False))
+        print(f"\n{len(body):,} bytes")
+        print(body[:500].decode('utf-8', errors='replace'))
+        return 0
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    with SegmentReader(args.segment) as reader:
+        count = 0
+        for entry, meta, body in reader.records():
+            name = meta.get('name') or f"record_{entry['offset']}.bin"
+            (out / f"{entry['offset']}_{name}").write_bytes(body)
+            count += 1
+    print(f"[SegmentArchive] {count} record(s) extracted to {out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,7 @@
 TLS Configuration Builder - Build JA3/extra_fp for curl-cffi
 """
 
-from curl_cffi.const import CurlSslVersion
+from .fingerprint_codec import as_tls_data
 
 
 class TlsConfig:
@@ -21,11 +21,13 @@ class TlsConfig:
         Format: SSLVersion,Ciphers,Extensions,EllipticCurves,EllipticCurvePointFormats
 
         Args:
-            tls_data: TLS data from database
+            tls_data: TLS data from database (dict or encoded fingerprint bytes)
 
         Returns:
             str: JA3 string with unsupported extensions filtered out
         """
+        tls_data = as_tls_data(tls_data)
+
         # Use ja3_text from DB if available, but filter unsupported extensions
         ja3_text = tls_data.get('ja3_text')
         if ja3_text:
@@ -119,11 +121,15 @@ class TlsConfig:
         Build extra_fp from TLS data for fine-tuning
 
         Args:
-            tls_data: TLS data from database
+            tls_data: TLS data from database (dict or encoded fingerprint bytes)
 
         Returns:
             dict: extra_fp configuration
         """
+        from curl_cffi.const import CurlSslVersion
+
+        tls_data = as_tls_data(tls_data)
+
         extra_fp = {}
 
         # TLS version
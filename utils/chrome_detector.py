@@ -1,17 +1,49 @@
 """
 Chrome Version Detector
-- Detect system-installed Chrome
+- Detect system-installed Chrome (Windows and Linux paths)
 - Scan chrome-versions/files directory
-- Verify chrome.exe exists
+- Verify chrome.exe (Linux: chrome) exists
 - Extract version information
+- Inventory cache (config/chrome_inventory.json): the portable scan is reused
+  while the versions directory mtime is unchanged, with executables re-stat'ed
+  (a version extracted into an existing folder shows up); system Chrome
+  versions are memoized per binary mtime, so PowerShell / --version probes
+  run only after Chrome updates
 """
 
 import os
-import glob
 import re
+import json
 import subprocess
 from pathlib import Path
 
+# Bump when the inventory layout changes so stale caches are rescanned
+INVENTORY_VERSION = 1
+
+# System Chrome install locations per os.name
+SYSTEM_CHROME_PATHS = {
+    'nt': [
+        r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+        r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe',
+        r'%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe',
+    ],
+    'posix': [
+        '/opt/google/chrome/chrome',
+        '/usr/bin/google-chrome-stable',
+        '/usr/bin/google-chrome',
+        '/usr/bin/chromium',
+        '/usr/bin/chromium-browser',
+        '/snap/bin/chromium',
+    ],
+}
+
+# Executable inside a chrome-<version> folder, most common layout first
+PORTABLE_LAYOUTS = {
+    'nt': ['chrome-win64/chrome.exe', 'chrome.exe', 'Application/chrome.exe'],
+    'posix': ['chrome-linux64/chrome', 'chrome-linux/chrome', 'chrome'],
+}
+
+
 class ChromeDetector:
     def __init__(self, chrome_versions_path=None):
         """
@@ -22,7 +54,8 @@ class ChromeDetector:
             # Default path
             chrome_versions_path = os.getenv(
                 'CHROME_VERSIONS_PATH',
-                r'D:\dev\git\local-packet-coupang\chrome-versions\files'
+                r'D:\dev\git\local-packet-coupang\chrome-versions\files' if os.name == 'nt'
+                else str(Path.home() / 'chrome-versions' / 'files')
             )
 
         self.chrome_versions_path = Path(chrome_versions_path)
@@ -30,92 +63,170 @@ class ChromeDetector:
         if not self.chrome_versions_path.exists():
             raise FileNotFoundError(f"Chrome versions path not found: {self.chrome_versions_path}")
 
+        self.cache_file = Path(__file__).parent.parent / 'config' / 'chrome_inventory.json'
+        self._cache = None
+        self._versions = None
+
+    def _load_cache(self):
+        """Inventory cache ({} when missing, unreadable or from an older layout)"""
+        if self._cache is None:
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    self._cache = json.load(f)
+                if self._cache.get('version') != INVENTORY_VERSION:
+                    self._cache = {}
+            except (OSError, ValueError):
+                self._cache = {}
+            self._cache.setdefault('version', INVENTORY_VERSION)
+            self._cache.setdefault('system', {})
+            self._cache.setdefault('portable', {})
+        return self._cache
+
+    def _save_cache(self):
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._cache, f, indent=2)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"[ChromeDetector] Inventory cache not saved: {e}")
+
+    def _probe_version(self, chrome_path):
+        """
+        Read the version of a Chrome binary (slow: may start subprocesses)
+
+        Returns:
+            str: Version or 'Unknown'
+        """
+        version = 'Unknown'
+
+        # Method 1: Check version folders in parent directory (Windows installs)
+        try:
+            app_dir = chrome_path.parent
+            version_dirs = [d for d in app_dir.iterdir() if d.is_dir() and re.match(r'\d+\.\d+\.\d+\.\d+', d.name)]
+            if version_dirs:
+                # Get the latest version
+                version_dirs.sort(key=lambda x: [int(n) for n in x.name.split('.')], reverse=True)
+                version = version_dirs[0].name
+        except Exception:
+            pass
+
+        # Method 2: Use PowerShell to get file version
+        if version == 'Unknown' and os.name == 'nt':
+            try:
+                ps_cmd = f'(Get-Item "{chrome_path}").VersionInfo.FileVersion'
+                result = subprocess.run(
+                    ['powershell', '-Command', ps_cmd],
+                    capture_output=True,
+                    text=True,
+                    timeout=3
+                )
+                version_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', result.stdout)
+                if version_match:
+                    version = version_match.group(1)
+            except Exception:
+                pass
+
+        # Method 3: Run chrome --version (may not work in some cases on Windows)
+        if version == 'Unknown':
+            try:
+                result = subprocess.run(
+                    [str(chrome_path), '--version'],
+                    capture_output=True,
+                    text=True,
+                    timeout=2,
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                )
+                version_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', result.stdout)
+                if version_match:
+                    version = version_match.group(1)
+            except Exception:
+                pass
+
+        return version
+
     def get_system_chrome(self):
         """
         Get system-installed Chrome information
 
+        The version is probed once per binary mtime (inventory cache).
+
         Returns:
             dict: System Chrome info or None if not found
         """
         # Common Chrome installation paths
-        possible_paths = [
-            Path(r'C:\Program Files\Google\Chrome\Application\chrome.exe'),
-            Path(r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe'),
-            Path(os.path.expandvars(r'%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe')),
-        ]
+        possible_paths = [Path(os.path.expandvars(p)) for p in SYSTEM_CHROME_PATHS.get(os.name, [])]
 
         for chrome_path in possible_paths:
-            if chrome_path.exists():
-                version = 'Unknown'
-
-                # Method 1: Check version folders in parent directory
-                try:
-                    app_dir = chrome_path.parent
-                    version_dirs = [d for d in app_dir.iterdir() if d.is_dir() and re.match(r'\d+\.\d+\.\d+\.\d+', d.name)]
-                    if version_dirs:
-                        # Get the latest version
-                        version_dirs.sort(key=lambda x: [int(n) for n in x.name.split('.')], reverse=True)
-                        version = version_dirs[0].name
-                except Exception:
-                    pass
-
-                # Method 2: Use PowerShell to get file version
-                if version == 'Unknown':
-                    try:
-                        ps_cmd = f'(Get-Item "{chrome_path}").VersionInfo.FileVersion'
-                        result = subprocess.run(
-                            ['powershell', '-Command', ps_cmd],
-                            capture_output=True,
-                            text=True,
-                            timeout=3
-                        )
-                        version_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', result.stdout)
-                        if version_match:
-                            version = version_match.group(1)
-                    except Exception:
-                        pass
-
-                # Method 3: Run chrome.exe --version (may not work in some cases)
-                if version == 'Unknown':
-                    try:
-                        result = subprocess.run(
-                            [str(chrome_path), '--version'],
-                            capture_output=True,
-                            text=True,
-                            timeout=2,
-                            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-                        )
-                        version_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', result.stdout)
-                        if version_match:
-                            version = version_match.group(1)
-                    except Exception:
-                        pass
-
-                return {
-                    'version': version,
-                    'folder': 'System Chrome',
-                    'path': str(chrome_path),
-                    'available': True,
-                    'is_system': True
-                }
+            try:
+                mtime = chrome_path.stat().st_mtime_ns
+            except OSError:
+                continue
+
+            cache = self._load_cache()
+            memo = cache['system'].get(str(chrome_path))
+            if memo and memo['mtime'] == mtime:
+                version = memo['version']
+            else:
+                version = self._probe_version(chrome_path)
+                cache['system'][str(chrome_path)] = {'mtime': mtime, 'version': version}
+                self._save_cache()
+
+            return {
+                'version': version,
+                'folder': 'System Chrome',
+                'path': str(chrome_path),
+                'available': True,
+                'is_system': True
+            }
 
         return None
 
-    def list_versions(self):
+    def _find_executable(self, chrome_dir):
         """
-        List all available Chrome versions (system Chrome first)
+        Executable of a chrome-<version> folder (first existing layout)
 
         Returns:
-            list: [{'version': '142.0.x.x', 'path': '...', 'available': True, 'is_system': True}, ...]
+            tuple: (path, exists) - the first layout's path when none exists
         """
-        versions = []
+        layouts = PORTABLE_LAYOUTS.get(os.name, PORTABLE_LAYOUTS['posix'])
+        possible_paths = [chrome_dir / layout for layout in layouts]
+        for path in possible_paths:
+            if path.exists():
+                return path, True
+        return possible_paths[0], False
+
+    def _restat(self, versions):
+        """
+        Re-check cached executables (stat only, no subprocess)
 
-        # 1. Add system Chrome first
-        system_chrome = self.get_system_chrome()
-        if system_chrome:
-            versions.append(system_chrome)
+        Extracting chrome.exe into an existing version folder does not
+        change the versions directory mtime, so availability is not
+        taken from the cache.
+
+        Returns:
+            bool: True if any entry changed
+        """
+        changed = False
+        for v in versions:
+            if v['available'] and Path(v['path']).exists():
+                continue
+            chrome_exe, available = self._find_executable(self.chrome_versions_path / v['folder'])
+            if available != v['available'] or str(chrome_exe) != v['path']:
+                v['path'], v['available'] = str(chrome_exe), available
+                changed = True
+        return changed
+
+    def _scan_portable(self):
+        """
+        Scan subdirectories for portable Chrome versions (newest first)
+
+        Returns:
+            list: Version dicts
+        """
+        versions = []
 
-        # 2. Scan subdirectories for portable Chrome versions
         for chrome_dir in self.chrome_versions_path.iterdir():
             if not chrome_dir.is_dir():
                 continue
@@ -127,36 +238,56 @@ class ChromeDetector:
 
             version = match.group(1)
 
-            # Try multiple possible paths
-            possible_paths = [
-                chrome_dir / 'chrome-win64' / 'chrome.exe',  # Standard structure
-                chrome_dir / 'chrome.exe',                    # Direct
-                chrome_dir / 'Application' / 'chrome.exe',    # Installed structure
-            ]
-
-            chrome_exe = None
-            for path in possible_paths:
-                if path.exists():
-                    chrome_exe = path
-                    break
-
-            if chrome_exe is None:
-                chrome_exe = possible_paths[0]  # Default to first path
-
+            chrome_exe, available = self._find_executable(chrome_dir)
             versions.append({
                 'version': version,
                 'folder': chrome_dir.name,
                 'path': str(chrome_exe),
-                'available': chrome_exe.exists(),
+                'available': available,
                 'is_system': False
             })
 
-        # Sort portable versions by version (newest first), but keep system Chrome at position 0
-        if len(versions) > 1:
-            portable_versions = versions[1:]
-            portable_versions.sort(key=lambda x: [int(n) for n in x['version'].split('.')], reverse=True)
-            versions = [versions[0]] + portable_versions
+        versions.sort(key=lambda x: [int(n) for n in x['version'].split('.') if n], reverse=True)
+        return versions
+
+    def list_versions(self, refresh=False):
+        """
+        List all available Chrome versions (system Chrome first)
+
+        Args:
+            refresh: Ignore the inventory cache and rescan
 
+        Returns:
+            list: [{'version': '142.0.x.x', 'path': '...', 'available': True, 'is_system': True}, ...]
+        """
+        if self._versions is not None and not refresh:
+            return self._versions
+
+        cache = self._load_cache()
+        if refresh:
+            cache['system'].clear()
+
+        versions = []
+
+        # 1. Add system Chrome first
+        system_chrome = self.get_system_chrome()
+        if system_chrome:
+            versions.append(system_chrome)
+
+        # 2. Portable versions: rescan only when the directory changed
+        #    (adding / removing a version folder updates its mtime)
+        key = str(self.chrome_versions_path.resolve())
+        dir_mtime = self.chrome_versions_path.stat().st_mtime_ns
+        entry = cache['portable'].get(key)
+        if refresh or not entry or entry['mtime'] != dir_mtime or entry['os'] != os.name:
+            entry = {'mtime': dir_mtime, 'os': os.name, 'versions': self._scan_portable()}
+            cache['portable'][key] = entry
+            self._save_cache()
+        elif self._restat(entry['versions']):
+            self._save_cache()
+        versions.extend(entry['versions'])
+
+        self._versions = versions
         return versions
 
     def get_version(self, version_query):
@@ -192,9 +323,9 @@ class ChromeDetector:
 
         return None
 
-    def print_versions(self):
+    def print_versions(self, refresh=False):
         """Print all available Chrome versions (system Chrome first)"""
-        versions = self.list_versions()
+        versions = self.list_versions(refresh)
 
         print(f"Chrome Versions Path: {self.chrome_versions_path}")
         print(f"Total {len(versions)} versions found:\n")
@@ -209,5 +340,6 @@ class ChromeDetector:
         return versions
 
 if __name__ == '__main__':
+    import sys
     detector = ChromeDetector()
-    detector.print_versions()
+    detector.print_versions(refresh='--refresh' in sys.argv)
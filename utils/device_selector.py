@@ -2,16 +2,20 @@
 BrowserStack Device Selector Module
 - Fetch device list from BrowserStack API (cache for 24 hours)
 - 4-step selection: Manufacturer → Model → Browser → OS Version
+- Pre-classified device index (rebuilt only when the raw cache changes)
 - Save selection history for tracking progress
 """
 
 import os
 import json
-import requests
+import pickle
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+# Bump when the index layout changes so stale pickles are rebuilt
+INDEX_VERSION = 1
+
 
 class DeviceSelector:
     """BrowserStack device selector with 4-step selection and history tracking"""
@@ -27,10 +31,25 @@ class DeviceSelector:
 
         self.cache_file = self.config_dir / 'browserstack_devices.json'
         self.history_file = self.config_dir / 'device_history.json'
+        self.index_file = self.config_dir / 'browserstack_devices.index.pkl'
 
         # Cache validity: 24 hours
         self.cache_duration = timedelta(hours=24)
 
+    def _cache_age(self) -> Optional[timedelta]:
+        """Age of the raw device cache, or None if it does not exist"""
+        if not self.cache_file.exists():
+            return None
+        return datetime.now() - datetime.fromtimestamp(self.cache_file.stat().st_mtime)
+
+    def _cache_signature(self) -> Optional[tuple]:
+        """(mtime_ns, size) of the raw device cache, used to validate the index"""
+        try:
+            stat = self.cache_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
     def fetch_devices(self, force_refresh: bool = False) -> List[Dict]:
         """
         Fetch device list from BrowserStack API or cache
@@ -42,9 +61,8 @@ class DeviceSelector:
             List of device configurations
         """
         # Check cache validity
-        if not force_refresh and self.cache_file.exists():
-            cache_age = datetime.now() - datetime.fromtimestamp(self.cache_file.stat().st_mtime)
-
+        cache_age = self._cache_age()
+        if not force_refresh and cache_age is not None:
             if cache_age < self.cache_duration:
                 print(f"[DeviceSelector] Using cached devices (age: {cache_age.seconds // 3600}h)")
                 with open(self.cache_file, 'r', encoding='utf-8') as f:
@@ -54,6 +72,8 @@ class DeviceSelector:
         print("[DeviceSelector] Fetching devices from BrowserStack API...")
 
         try:
+            import requests
+
             response = requests.get(
                 self.api_url,
                 auth=(self.username, self.access_key),
@@ -135,6 +155,168 @@ class DeviceSelector:
 
         return classified
 
+    def build_index(self, devices: List[Dict]) -> Dict:
+        """
+        Build pre-classified device index
+
+        Structure:
+        {
+            'version': INDEX_VERSION,
+            'source': (mtime_ns, size) of browserstack_devices.json,
+            'classified': classify_devices() result,
+            'by_browser': {"chrome": [(manufacturer, model, os_version), ...]},
+            'by_os': {"13.0": [(manufacturer, model, browser), ...]},
+            'by_model': {"galaxy s23": (manufacturer, model)},
+            'stats': {"samsung": (model_count, config_count)}
+        }
+        """
+        classified = self.classify_devices(devices)
+
+        by_browser = {}
+        by_os = {}
+        by_model = {}
+        stats = {}
+
+        for manufacturer, models in classified.items():
+            config_count = 0
+            for model, browsers in models.items():
+                by_model[model.lower()] = (manufacturer, model)
+                for browser, os_versions in browsers.items():
+                    config_count += len(os_versions)
+                    for os_version in os_versions:
+                        by_browser.setdefault(browser, []).append((manufacturer, model, os_version))
+                        by_os.setdefault(os_version, []).append((manufacturer, model, browser))
+            stats[manufacturer] = (len(models), config_count)
+
+        return {
+            'version': INDEX_VERSION,
+            'source': self._cache_signature(),
+            'classified': classified,
+            'by_browser': by_browser,
+            'by_os': by_os,
+            'by_model': by_model,
+            'stats': stats,
+        }
+
+    def _load_index(self) -> Optional[Dict]:
+        """Load persisted index if it matches the current raw cache"""
+        if not self.index_file.exists():
+            return None
+
+        try:
+            with open(self.index_file, 'rb') as f:
+                index = pickle.load(f)
+        except Exception:
+            return None
+
+        if index.get('version') != INDEX_VERSION:
+            return None
+        if index.get('source') != self._cache_signature():
+            return None
+
+        return index
+
+    def _save_index(self, index: Dict):
+        """Persist index atomically (write temp file, then replace)"""
+        tmp_file = self.index_file.with_suffix('.tmp')
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            print(f"[WARNING] Failed to save device index: {e}")
+
+    def load_catalog(self, force_refresh: bool = False) -> Dict:
+        """
+        Load pre-classified device index
+
+        The raw cache is only parsed when the index is missing or was built
+        from a different version of browserstack_devices.json.
+
+        Args:
+            force_refresh: Force refresh cache from BrowserStack API
+
+        Returns:
+            dict: Index (see build_index)
+        """
+        cache_age = self._cache_age()
+        if not force_refresh and cache_age is not None and cache_age < self.cache_duration:
+            index = self._load_index()
+            if index:
+                return index
+
+        devices = self.fetch_devices(force_refresh=force_refresh)
+
+        # fetch_devices may have fallen back to an unchanged (stale) cache
+        index = self._load_index()
+        if index:
+            return index
+
+        index = self.build_index(devices)
+        self._save_index(index)
+        print(f"[DeviceSelector] Device index rebuilt ({sum(c for _, c in index['stats'].values())} configurations)")
+        return index
+
+    def find_devices(self, index: Dict, manufacturer: Optional[str] = None,
+                     model: Optional[str] = None, browser: Optional[str] = None,
+                     os_version: Optional[str] = None) -> List[Dict]:
+        """
+        Look up device configurations using the index
+
+        Args:
+            index: Index from load_catalog()
+            manufacturer: e.g. "samsung"
+            model: e.g. "Galaxy S23" (case-insensitive)
+            browser: e.g. "chrome"
+            os_version: e.g. "13.0"
+
+        Returns:
+            list: Matching device configurations
+        """
+        classified = index['classified']
+
+        # Narrow candidates with the most selective index first
+        if model:
+            entry = index['by_model'].get(model.lower())
+            if not entry or (manufacturer and entry[0] != manufacturer.lower()):
+                return []
+            candidates = [
+                (entry[0], entry[1], b, v)
+                for b, versions in classified[entry[0]][entry[1]].items()
+                for v in versions
+            ]
+        elif os_version:
+            candidates = [(m, md, b, os_version) for m, md, b in index['by_os'].get(os_version, [])]
+        elif browser:
+            candidates = [(m, md, browser.lower(), v) for m, md, v in index['by_browser'].get(browser.lower(), [])]
+        elif manufacturer:
+            candidates = [
+                (manufacturer.lower(), md, b, v)
+                for md, browsers in classified.get(manufacturer.lower(), {}).items()
+                for b, versions in browsers.items()
+                for v in versions
+            ]
+        else:
+            candidates = [
+                (m, md, b, v)
+                for m, models in classified.items()
+                for md, browsers in models.items()
+                for b, versions in browsers.items()
+                for v in versions
+            ]
+
+        results = []
+        for m, md, b, v in candidates:
+            if manufacturer and m != manufacturer.lower():
+                continue
+            if browser and b != browser.lower():
+                continue
+            if os_version and v != os_version:
+                continue
+            results.append(classified[m][md][b][v])
+
+        return results
+
     def _get_manufacturer(self, device_name: str) -> str:
         """Determine manufacturer from device name"""
         device_lower = device_name.lower()
@@ -399,6 +581,17 @@ class DeviceSelector:
         print(f"Use: python main-mobile.py --device <ID> --search \"keyword\"")
         print("=" * 60 + "\n")
 
+    def get_history(self) -> List[Dict]:
+        """Get all history entries (oldest first)"""
+        if not self.history_file.exists():
+            return []
+
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except:
+            return []
+
     def get_last_selection(self) -> Optional[Dict]:
         """Get last selected device configuration"""
         if not self.history_file.exists():
@@ -455,25 +648,15 @@ def test_device_selector():
 
     selector = DeviceSelector(username, access_key)
 
-    # Fetch devices
-    devices = selector.fetch_devices()
-    print(f"\n[INFO] Total devices: {len(devices)}")
-
-    # Classify devices
-    classified = selector.classify_devices(devices)
+    # Load indexed catalog
+    catalog = selector.load_catalog()
+    classified = catalog['classified']
 
     print(f"\n[INFO] Manufacturers: {', '.join(sorted(classified.keys()))}")
 
     # Show statistics
     total_configs = 0
-    for manufacturer, models in classified.items():
-        model_count = len(models)
-        config_count = sum(
-            len(browsers[browser])
-            for model in models.values()
-            for browsers in [model]
-            for browser in browsers
-        )
+    for manufacturer, (model_count, config_count) in catalog['stats'].items():
         total_configs += config_count
         print(f"  {manufacturer.capitalize()}: {model_count} models, {config_count} configurations")
 
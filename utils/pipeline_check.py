@@ -0,0 +1,99 @@
+"""
+Page Pipeline Check
+- Runs the sequential and the pipelined crawl (modules/crawler.py) on
+  scripted responses, no network or DB
+- Both modes must return the same pages, statuses and outcomes for a
+  status sequence (e.g. a 404 between two 200 pages)
+
+Usage:
+  python -m utils.pipeline_check
+  python -m utils.pipeline_check --statuses 200,404,200,200 --lookahead 3
+"""
+
+import re
+import sys
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PAGE_PATTERN = re.compile(r'[?&]page=(\d+)')
+
+# Bodies the PC profile classifies as a product page / a (not blocked) error
+# page; padded past BLOCK_SIGNATURES['min_bytes']
+PADDING = b' ' * 60000
+PRODUCT_BODY = b'<ul id="product-list"><li class="search-product">' + PADDING
+ERROR_BODY = b'<html><body>Not Found</body></html>' + PADDING
+
+
+class ScriptedResponse:
+    """Minimal curl-cffi response (status + body, streamable)"""
+
+    def __init__(self, url, status_code):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {}
+        self.content = PRODUCT_BODY if status_code == 200 else ERROR_BODY
+
+    def iter_content(self):
+        yield self.content
+
+    def close(self):
+        pass
+
+
+def crawl(statuses, lookahead, output_dir):
+    """
+    One crawl over scripted responses
+
+    Args:
+        statuses: HTTP status per page (page 1 first)
+        lookahead: 1 = sequential, >1 = pipelined
+
+    Returns:
+        list: (page, status, success, blocked) per page result
+    """
+    from modules.crawler import Crawler
+    from modules.file_manager import FileManager
+
+    crawler = Crawler('pc', db=object(), cache=False,
+                      file_manager=FileManager(output_dir, async_writes=False, archive=False))
+    crawler.data = {'chrome_version': '142.0.0.0'}
+
+    def fetch(url, headers, stream=False):
+        match = PAGE_PATTERN.search(url)
+        page_num = int(match.group(1)) if match else 1
+        return ScriptedResponse(url, statuses[page_num - 1]), False
+
+    crawler.fetch = fetch
+    results = crawler.crawl_pages('노트북', len(statuses), lookahead)
+    return [(r['page'], r.get('status'), r['success'], r.get('blocked', False)) for r in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sequential vs pipelined crawl on scripted responses')
+    parser.add_argument('--statuses', default='200,404,200', help='Comma-separated status per page')
+    parser.add_argument('--lookahead', type=int, default=3, help='Pipelined prefetch window')
+    args = parser.parse_args()
+
+    statuses = [int(s) for s in args.statuses.split(',')]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        sequential = crawl(statuses, 1, output_dir)
+        pipelined = crawl(statuses, max(2, args.lookahead), output_dir)
+
+    print("\n" + "=" * 60)
+    print(f"Statuses: {statuses}")
+    print(f"  Sequential: {sequential}")
+    print(f"  Pipelined:  {pipelined}")
+    print("=" * 60)
+    if sequential != pipelined:
+        print("❌ Sequential and pipelined results differ")
+        return 1
+    print("Same pages in both modes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
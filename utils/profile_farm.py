@@ -0,0 +1,275 @@
+"""
+Chrome Profile Farm - Isolated profile directories for concurrent harvests
+- One directory per harvest: <root>/<chrome version>/<name>-<pid>-<n>,
+  so dozens of headless collections never share a profile
+- Profiles are cloned from a template (PROFILE_FARM['template_dir']/<version>
+  or /<major>); without one a minimal profile that skips first-run is written.
+  Cookies, storage and caches are never copied, each clone is a new identity
+- Root on tmpfs (/dev/shm) when available: profile I/O stays in memory
+- Owner file (.farm.json: pid, created, last used) per profile; gc() removes
+  profiles whose owner process is gone, or that were abandoned after a
+  collection timeout, once untouched for max_age
+
+Usage:
+  python -m utils.profile_farm status          # Profiles per version, size, owners
+  python -m utils.profile_farm gc              # Remove stale profiles
+  python -m utils.profile_farm gc --max-age 0  # Remove every profile of dead owners
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import itertools
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Load config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import PROFILE_FARM
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+TMPFS_DIR = Path('/dev/shm')
+OWNER_FILE = '.farm.json'
+
+# Profile state that makes up an identity or is rebuilt anyway: never cloned
+TEMPLATE_IGNORE = shutil.ignore_patterns(
+    'Cookies', 'Cookies-journal', 'Network', 'Local Storage', 'Session Storage', 'Sessions',
+    'IndexedDB', 'Service Worker', 'Cache', 'Code Cache', 'GPUCache', 'Web Data', 'Web Data-journal',
+    'History', 'History-journal', 'Singleton*', OWNER_FILE
+)
+
+# Minimal profile: no first-run UI, no restore prompt
+MINIMAL_PREFERENCES = {
+    'browser': {'has_seen_welcome_page': True, 'check_default_browser': False},
+    'profile': {'exit_type': 'Normal', 'exited_cleanly': True},
+    'session': {'restore_on_startup': 5},
+}
+
+
+def farm_enabled():
+    """PROFILE_FARM['enabled'], or Linux when unset"""
+    enabled = PROFILE_FARM['enabled']
+    return sys.platform.startswith('linux') if enabled is None else enabled
+
+
+def pid_alive(pid):
+    """True if a process with this pid exists (this host)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class ProfileFarm:
+    """Checkout / release / GC of cloned Chrome profile directories"""
+
+    _counter = itertools.count(1)
+    _lock = threading.Lock()
+
+    def __init__(self, root=None, settings=None):
+        """
+        Args:
+            root: Farm directory (default: PROFILE_FARM['root'], tmpfs if available)
+            settings: PROFILE_FARM overrides
+        """
+        self.settings = {**PROFILE_FARM, **(settings or {})}
+        root = root or self.settings['root']
+        if root is None:
+            if self.settings['tmpfs'] and TMPFS_DIR.is_dir() and os.access(TMPFS_DIR, os.W_OK):
+                root = TMPFS_DIR / 'coupang-profiles'
+            else:
+                root = PROJECT_ROOT / 'user' / 'farm'
+        self.root = Path(root)
+        self.template_root = PROJECT_ROOT / self.settings['template_dir']
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def template_for(self, chrome_info):
+        """
+        Template profile for a Chrome version (exact version, then major)
+
+        Returns:
+            Path: Template directory, or None (minimal profile is written)
+        """
+        version = chrome_info['version']
+        for name in (version, version.split('.')[0]):
+            path = self.template_root / name
+            if path.is_dir():
+                return path
+        return None
+
+    def _write_minimal(self, profile_dir):
+        (profile_dir / 'Default').mkdir(parents=True, exist_ok=True)
+        (profile_dir / 'First Run').touch()
+        with open(profile_dir / 'Default' / 'Preferences', 'w', encoding='utf-8') as f:
+            json.dump(MINIMAL_PREFERENCES, f)
+        with open(profile_dir / 'Local State', 'w', encoding='utf-8') as f:
+            json.dump({'browser': {'enabled_labs_experiments': []}}, f)
+
+    def _write_owner(self, profile_dir, created=None, abandoned=False):
+        now = time.time()
+        with open(profile_dir / OWNER_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'created': created or now, 'last_used': now,
+                       'abandoned': abandoned}, f)
+
+    def _read_owner(self, profile_dir):
+        try:
+            with open(profile_dir / OWNER_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def checkout(self, chrome_info, name='harvest'):
+        """
+        Clone a fresh profile for one collection
+
+        Args:
+            chrome_info: ChromeDetector version dict
+            name: Prefix of the profile directory (e.g. the user folder)
+
+        Returns:
+            Path: Profile directory (pass as user_data_dir)
+        """
+        with self._lock:
+            n = next(self._counter)
+        profile_dir = self.root / chrome_info['version'] / f"{name}-{os.getpid()}-{n}"
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+        template = self.template_for(chrome_info)
+        if template:
+            shutil.copytree(template, profile_dir, symlinks=True, ignore=TEMPLATE_IGNORE)
+        else:
+            self._write_minimal(profile_dir)
+        self._write_owner(profile_dir)
+        return profile_dir
+
+    def release(self, profile_dir, keep=False):
+        """
+        End a collection: delete the profile, or keep it for reuse / debugging
+
+        Args:
+            keep: Leave the directory (gc() removes it after max_age)
+        """
+        profile_dir = Path(profile_dir)
+        if keep:
+            owner = self._read_owner(profile_dir) or {}
+            self._write_owner(profile_dir, owner.get('created'))
+        else:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def abandon(self, profile_dir):
+        """
+        Give up a profile Chrome may still be using (e.g. collection timeout)
+
+        The directory is left in place; gc() removes it after max_age even
+        while this process is still running.
+        """
+        profile_dir = Path(profile_dir)
+        owner = self._read_owner(profile_dir) or {}
+        try:
+            self._write_owner(profile_dir, owner.get('created'), abandoned=True)
+        except OSError:
+            pass
+
+    @contextmanager
+    def profile(self, chrome_info, name='harvest', keep=False):
+        """checkout() ... release() around one collection"""
+        profile_dir = self.checkout(chrome_info, name)
+        try:
+            yield profile_dir
+        finally:
+            self.release(profile_dir, keep)
+
+    def profiles(self):
+        """
+        Every profile in the farm
+
+        Returns:
+            list: [{'path', 'version', 'pid', 'alive', 'abandoned', 'last_used'}]
+        """
+        result = []
+        for version_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            for profile_dir in sorted(p for p in version_dir.iterdir() if p.is_dir()):
+                owner = self._read_owner(profile_dir) or {}
+                pid = owner.get('pid')
+                last_used = owner.get('last_used')
+                result.append({
+                    'path': profile_dir,
+                    'version': version_dir.name,
+                    'pid': pid,
+                    'alive': bool(pid) and pid_alive(pid),
+                    'abandoned': owner.get('abandoned', False),
+                    'last_used': profile_dir.stat().st_mtime if last_used is None else last_used,
+                })
+        return result
+
+    def gc(self, max_age=None):
+        """
+        Remove profiles of dead owners and abandoned profiles untouched for max_age seconds
+
+        Returns:
+            int: Profiles removed
+        """
+        max_age = self.settings['max_age'] if max_age is None else max_age
+        cutoff = time.time() - max_age
+        removed = 0
+
+        for entry in self.profiles():
+            if (entry['alive'] and not entry['abandoned']) or entry['last_used'] > cutoff:
+                continue
+            shutil.rmtree(entry['path'], ignore_errors=True)
+            removed += 1
+
+        # Empty version directories
+        for version_dir in self.root.iterdir():
+            if version_dir.is_dir() and not any(version_dir.iterdir()):
+                version_dir.rmdir()
+
+        return removed
+
+
+def dir_size(path):
+    """Total file size under a directory (bytes)"""
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file() and not f.is_symlink())
+
+
+def main():
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description='Chrome profile farm')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status', help='Profiles per version')
+    gc_parser = sub.add_parser('gc', help='Remove stale profiles')
+    gc_parser.add_argument('--max-age', type=int, default=None, help='Seconds since last use')
+    args = parser.parse_args()
+
+    farm = ProfileFarm()
+
+    if args.command == 'gc':
+        print(f"[ProfileFarm] {farm.gc(args.max_age)} stale profile(s) removed from {farm.root}")
+        return 0
+
+    entries = farm.profiles()
+    print("\n" + "=" * 60)
+    print(f"Profile farm: {farm.root} ({'enabled' if farm_enabled() else 'disabled'})")
+    print("=" * 60)
+    for entry in entries:
+        owner = f"pid {entry['pid']} {'running' if entry['alive'] else 'gone'}" if entry['pid'] else 'no owner'
+        if entry['abandoned']:
+            owner += ' (abandoned)'
+        print(f"  {entry['version']:<18} {entry['path'].name:<28} {dir_size(entry['path']) / 1024:>9,.0f} KB  "
+              f"{owner:<18} {datetime.fromtimestamp(entry['last_used']):%Y-%m-%d %H:%M}")
+    print(f"\n{len(entries)} profile(s)")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+CLI Startup Benchmark
+- Measures cold-start wall time of each entry point's cheap path
+  (--help / usage error), each run in a fresh interpreter
+- Reports the slowest imports via `python -X importtime`
+
+Usage:
+  python -m utils.startup_bench
+  python -m utils.startup_bench --runs 20 --top 15
+  python -m utils.startup_bench --script main-mobile.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Entry point -> arguments that exercise the fast path (no DB/network)
+ENTRY_POINTS = {
+    'main-pc.py': ['--help'],
+    'main-mobile.py': ['--help'],
+    'curlcffi.py': [],
+    'curlcffi-mobile.py': [],
+}
+
+
+def time_startup(script, args, runs=10):
+    """
+    Run script in fresh interpreters and time each run
+
+    Args:
+        script: Entry point file name (relative to project root)
+        args: CLI arguments
+        runs: Number of runs
+
+    Returns:
+        dict: {'median': float, 'min': float, 'max': float, 'returncode': int} (ms)
+    """
+    samples = []
+    returncode = None
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, script] + args,
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+        returncode = result.returncode
+
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'returncode': returncode
+    }
+
+
+def import_profile(script, args, top=10):
+    """
+    Collect slowest top-level imports of one run via -X importtime
+
+    Args:
+        script: Entry point file name
+        args: CLI arguments
+        top: Number of entries to return
+
+    Returns:
+        list: [(module, cumulative_ms), ...] sorted slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', script] + args,
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            _, cumulative_us, name = line.split(':', 1)[1].split('|')
+        except ValueError:
+            continue
+        # Only top-level imports (nested ones are indented)
+        name = name[1:]
+        if name.startswith(' '):
+            continue
+        entries.append((name.strip(), int(cumulative_us) / 1000))
+
+    entries.sort(key=lambda e: e[1], reverse=True)
+    return entries[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure CLI cold-start time')
+    parser.add_argument('--runs', type=int, default=10, help='Runs per entry point (default: 10)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to show (default: 10)')
+    parser.add_argument('--script', type=str, default=None, help='Benchmark only this entry point')
+    args = parser.parse_args()
+
+    scripts = {args.script: ENTRY_POINTS.get(args.script, ['--help'])} if args.script else ENTRY_POINTS
+
+    # Interpreter baseline (python -c pass)
+    baseline = time_startup('-c', ['pass'], args.runs)['median']
+
+    print("\n" + "=" * 60)
+    print("CLI Startup Benchmark")
+    print("=" * 60)
+    print(f"Python: {sys.version.split()[0]}  Runs: {args.runs}  Baseline: {baseline:.1f} ms")
+
+    for script, script_args in scripts.items():
+        stats = time_startup(script, script_args, args.runs)
+        print(f"\n[{script} {' '.join(script_args)}]".rstrip() if script_args else f"\n[{script}]")
+        print(f"  Median: {stats['median']:.1f} ms (+{stats['median'] - baseline:.1f} ms over baseline)")
+        print(f"  Min/Max: {stats['min']:.1f} / {stats['max']:.1f} ms  Exit code: {stats['returncode']}")
+
+        profile = import_profile(script, script_args, args.top)
+        if profile:
+            print(f"  Slowest imports:")
+            for name, ms in profile:
+                print(f"    {ms:8.1f} ms  {name}")
+
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())